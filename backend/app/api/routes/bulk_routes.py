@@ -0,0 +1,53 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from ...core.dependencies import (
+    BulkServiceDep,
+    SettingsDep,
+    validate_user_exists
+)
+from ...models.user import User
+
+router = APIRouter(
+    prefix="/bulk",
+    tags=["bulk"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+@router.post("/import", response_class=StreamingResponse)
+async def import_records(
+    request: Request,
+    bulk_service: BulkServiceDep,
+    settings: SettingsDep
+):
+    """Import users (with CV profiles) and cover letters from an NDJSON body.
+    
+    Each line is a `user` record (`name`, `email`, optional `cv_profile`) or a
+    `cover_letter` record naming its owner by `user_email`. One NDJSON report
+    line is streamed back per input line (`created` or `error`), followed by a
+    `complete` line with totals.
+    """
+    body = await bulk_service.spool_request_body(request.stream())
+    
+    async def report_lines():
+        with body:
+            async for line in bulk_service.import_records(body, settings):
+                yield line
+    
+    return StreamingResponse(report_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/export/{user_id}", response_class=StreamingResponse)
+async def export_user(
+    user: Annotated[User, Depends(validate_user_exists)],
+    bulk_service: BulkServiceDep,
+    settings: SettingsDep
+):
+    """Stream a user's data as NDJSON in the format accepted by `POST /bulk/import`"""
+    return StreamingResponse(
+        bulk_service.export_user_records(user.id, settings),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="user-{user.id}.ndjson"'}
+    )
@@ -1,18 +1,20 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends
+from typing import Annotated, Literal, Optional, Union
+from fastapi import APIRouter, Depends, Query, Response
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 
 from ...core.dependencies import (
     SessionDep,
+    LoaderDep,
     CoverLetterServiceDep,
-    UserServiceDep,
-    CVServiceDep,
     SettingsDep,
+    LLMClientDep,
+    GenerationJobServiceDep,
     validate_cover_letter_exists,
     validate_user_exists
 )
 from ...schemas import cover_letter as cover_letter_schemas
-from ...models.cover_letter import CoverLetter
+from ...schemas import generation_job as generation_job_schemas
 from ...models.user import User
 
 router = APIRouter(
@@ -22,30 +24,127 @@ router = APIRouter(
 )
 
 
-@router.post("/generate", response_model=cover_letter_schemas.CoverLetterResponse)
+@router.post(
+    "/generate", 
+    response_model=Union[
+        cover_letter_schemas.CoverLetterGenerateResponse,
+        generation_job_schemas.GenerationJobResponse
+    ],
+    responses={202: {"model": generation_job_schemas.GenerationJobResponse}}
+)
 async def generate_cover_letter(
     request: cover_letter_schemas.CoverLetterGenerate,
+    response: Response,
     db: SessionDep,
     cover_letter_service: CoverLetterServiceDep,
-    user_service: UserServiceDep,
-    cv_service: CVServiceDep,
-    settings: SettingsDep
+    loader: LoaderDep,
+    generation_job_service: GenerationJobServiceDep,
+    settings: SettingsDep,
+    llm_client: LLMClientDep,
+    mode: Literal["sync", "async"] = "sync"
 ):
-    """Generate a new cover letter based on CV profile and job description"""
-    user = user_service.get_user(db, user_id=request.user_id)
+    """Generate a new cover letter based on CV profile and job description.
+    
+    With `mode=async` the generation is queued and a job is returned immediately
+    (202); poll `GET /cover-letters/jobs/{job_id}` for the result.
+    """
+    user = await loader.user(request.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    cv_profile = cv_service.get_cv_profile_by_user(db, user_id=request.user_id)
+    cv_profile = await loader.cv_profile_by_user(request.user_id)
     if not cv_profile:
         raise HTTPException(status_code=404, detail="CV profile not found for user")
     
+    if mode == "async":
+        response.status_code = 202
+        return await generation_job_service.create_job(db, request=request)
+    
     return await cover_letter_service.generate_cover_letter(
         db=db, 
         request=request, 
         settings=settings,
         cv_profile=cv_profile,
-        user=user
+        user=user,
+        llm_client=llm_client
+    )
+
+
+@router.post("/batch", response_class=StreamingResponse)
+async def generate_cover_letters_batch(
+    request: cover_letter_schemas.CoverLetterBatchGenerate,
+    db: SessionDep,
+    cover_letter_service: CoverLetterServiceDep,
+    loader: LoaderDep,
+    settings: SettingsDep,
+    llm_client: LLMClientDep
+):
+    """Generate cover letters for many jobs for one user, streaming NDJSON results.
+    
+    One line is sent per job as it finishes (`generated` or `error`), followed by a
+    `complete` line with the ids of the letters saved in a single transaction.
+    """
+    user = await loader.user(request.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    cv_profile = await loader.cv_profile_by_user(request.user_id)
+    if not cv_profile:
+        raise HTTPException(status_code=404, detail="CV profile not found for user")
+    
+    lines = await cover_letter_service.generate_cover_letters_batch(
+        request=request, 
+        settings=settings,
+        cv_profile=cv_profile,
+        user=user,
+        llm_client=llm_client
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.get("/jobs/{job_id}", response_model=generation_job_schemas.GenerationJobResponse)
+async def get_generation_job(
+    job_id: int,
+    db: SessionDep,
+    generation_job_service: GenerationJobServiceDep
+):
+    """Get the status of a queued generation job, with its cover letter once done"""
+    job = await generation_job_service.get_job(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job
+
+
+@router.post("/generate/stream", response_class=StreamingResponse)
+async def generate_cover_letter_stream(
+    request: cover_letter_schemas.CoverLetterGenerate,
+    db: SessionDep,
+    cover_letter_service: CoverLetterServiceDep,
+    loader: LoaderDep,
+    settings: SettingsDep,
+    llm_client: LLMClientDep
+):
+    """Generate a new cover letter, streaming tokens as Server-Sent Events"""
+    user = await loader.user(request.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    cv_profile = await loader.cv_profile_by_user(request.user_id)
+    if not cv_profile:
+        raise HTTPException(status_code=404, detail="CV profile not found for user")
+    
+    events = await cover_letter_service.stream_cover_letter(
+        db=db,
+        request=request, 
+        settings=settings,
+        cv_profile=cv_profile,
+        user=user,
+        llm_client=llm_client
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
@@ -53,35 +152,77 @@ async def generate_cover_letter(
 async def get_user_cover_letters(
     user: Annotated[User, Depends(validate_user_exists)],
     db: SessionDep,
-    cover_letter_service: CoverLetterServiceDep
+    cover_letter_service: CoverLetterServiceDep,
+    settings: SettingsDep,
+    limit: Annotated[Optional[int], Query(ge=1, description="Page size (capped by the server)")] = None,
+    cursor: Annotated[Optional[str], Query(description="`next_cursor` from the previous page")] = None,
+    company: Annotated[Optional[str], Query(max_length=100, description="Company name contains")] = None,
+    job_title: Annotated[Optional[str], Query(max_length=100, description="Job title contains")] = None,
+    total: Literal["exact", "approximate"] = "exact",
+    view: Literal["full", "summary"] = "full",
+    snippet_length: Annotated[int, Query(ge=0, le=1500, description="Snippet characters in the summary view")] = 0
 ):
-    """Get all cover letters for a user"""
-    cover_letters = cover_letter_service.get_cover_letters_by_user(db, user_id=user.id)
+    """Get a user's cover letters, newest first, one page at a time.
+    
+    Follow `next_cursor` for older letters. `total=approximate` stops counting at a
+    server-defined cap, which keeps the count cheap for users with many letters.
+    `view=summary` leaves out the job description and letter body.
+    """
+    cover_letters = await cover_letter_service.get_cover_letters_by_user(
+        db, 
+        user_id=user.id,
+        limit=min(limit or settings.cover_letter_page_size, settings.cover_letter_max_page_size),
+        cursor=cursor,
+        company=company,
+        job_title=job_title,
+        count_cap=settings.cover_letter_count_cap if total == "approximate" else None,
+        view=view,
+        snippet_length=snippet_length
+    )
     return cover_letters
 
 
+@router.get("/user/{user_id}/search", response_model=cover_letter_schemas.CoverLetterSearchResponse)
+async def search_user_cover_letters(
+    user: Annotated[User, Depends(validate_user_exists)],
+    db: SessionDep,
+    cover_letter_service: CoverLetterServiceDep,
+    settings: SettingsDep,
+    q: Annotated[str, Query(min_length=1, max_length=200, description="Words to search for")],
+    limit: Annotated[Optional[int], Query(ge=1, description="Page size (capped by the server)")] = None,
+    offset: Annotated[int, Query(ge=0, le=10000, description="`next_offset` from the previous page")] = 0
+):
+    """Search a user's cover letters by title, job, company, job description and content.
+    
+    Results are ranked by relevance, with matched terms highlighted.
+    """
+    return await cover_letter_service.search_cover_letters(
+        db,
+        user_id=user.id,
+        query=q,
+        limit=min(limit or settings.cover_letter_page_size, settings.cover_letter_max_page_size),
+        offset=offset,
+        count_cap=settings.cover_letter_count_cap
+    )
+
+
 @router.get("/{cover_letter_id}", response_model=cover_letter_schemas.CoverLetterResponse)
 async def get_cover_letter(
-    cover_letter: Annotated[CoverLetter, Depends(validate_cover_letter_exists)],
-    db: SessionDep,
-    cover_letter_service: CoverLetterServiceDep
+    cover_letter: Annotated[cover_letter_schemas.CoverLetterResponse, Depends(validate_cover_letter_exists)]
 ):
     """Get a specific cover letter by ID"""
-    result = cover_letter_service.get_cover_letter(db, cover_letter_id=cover_letter.id)
-    if not result:
-        raise HTTPException(status_code=404, detail="Cover letter not found")
-    return result
+    return cover_letter
 
 
 @router.put("/{cover_letter_id}", response_model=cover_letter_schemas.CoverLetterResponse)
 async def update_cover_letter(
-    cover_letter: Annotated[CoverLetter, Depends(validate_cover_letter_exists)],
+    cover_letter: Annotated[cover_letter_schemas.CoverLetterResponse, Depends(validate_cover_letter_exists)],
     cover_letter_update: cover_letter_schemas.CoverLetterUpdate,
     db: SessionDep,
     cover_letter_service: CoverLetterServiceDep
 ):
     """Update a cover letter"""
-    updated_cover_letter = cover_letter_service.update_cover_letter(
+    updated_cover_letter = await cover_letter_service.update_cover_letter(
         db=db, 
         cover_letter_id=cover_letter.id, 
         cover_letter_update=cover_letter_update
@@ -91,14 +232,37 @@ async def update_cover_letter(
     return updated_cover_letter
 
 
+@router.post("/{cover_letter_id}/refine", response_model=cover_letter_schemas.CoverLetterRefineResponse)
+async def refine_cover_letter(
+    cover_letter: Annotated[cover_letter_schemas.CoverLetterResponse, Depends(validate_cover_letter_exists)],
+    request: cover_letter_schemas.CoverLetterRefine,
+    db: SessionDep,
+    cover_letter_service: CoverLetterServiceDep,
+    settings: SettingsDep,
+    llm_client: LLMClientDep
+):
+    """Revise a cover letter by a short instruction (e.g. "make it more formal") and save it in place.
+    
+    Only the current letter and the instruction are sent to the model, so a refinement
+    costs far fewer tokens than generating the letter again.
+    """
+    return await cover_letter_service.refine_cover_letter(
+        db=db,
+        cover_letter=cover_letter,
+        request=request,
+        settings=settings,
+        llm_client=llm_client
+    )
+
+
 @router.delete("/{cover_letter_id}")
 async def delete_cover_letter(
-    cover_letter: Annotated[CoverLetter, Depends(validate_cover_letter_exists)],
+    cover_letter: Annotated[cover_letter_schemas.CoverLetterResponse, Depends(validate_cover_letter_exists)],
     db: SessionDep,
     cover_letter_service: CoverLetterServiceDep
 ):
     """Delete a cover letter"""
-    success = cover_letter_service.delete_cover_letter(db=db, cover_letter_id=cover_letter.id)
+    success = await cover_letter_service.delete_cover_letter(db=db, cover_letter_id=cover_letter.id)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete cover letter")
     return {"message": "Cover letter deleted successfully"}
@@ -109,12 +273,12 @@ async def create_cover_letter(
     cover_letter_data: cover_letter_schemas.CoverLetterCreate,
     db: SessionDep,
     cover_letter_service: CoverLetterServiceDep,
-    user_service: UserServiceDep
+    loader: LoaderDep
 ):
     """Create a new cover letter manually"""
     # Validate user exists
-    user = user_service.get_user(db, user_id=cover_letter_data.user_id)
+    user = await loader.user(cover_letter_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return cover_letter_service.create_cover_letter(db=db, cover_letter=cover_letter_data) 
\ No newline at end of file
+    return await cover_letter_service.create_cover_letter(db=db, cover_letter=cover_letter_data) 
\ No newline at end of file
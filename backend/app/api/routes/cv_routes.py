@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from ...core.dependencies import (
     SessionDep,
+    LoaderDep,
     CVServiceDep,
     validate_cv_profile_exists,
     validate_user_exists
@@ -24,7 +25,7 @@ async def create_cv_profile(
     cv_service: CVServiceDep
 ):
     """Create CV profile from manual data entry"""
-    return cv_service.create_cv_profile(db=db, cv_profile=cv_profile)
+    return await cv_service.create_cv_profile(db=db, cv_profile=cv_profile)
 
 
 @router.get("/profile/{profile_id}", response_model=cv_schemas.CVProfile)
@@ -40,11 +41,10 @@ async def get_cv_profile(
 @router.get("/profile/user/{user_id}", response_model=cv_schemas.CVProfile)
 async def get_cv_profile_by_user(
     user: Annotated[object, Depends(validate_user_exists)],
-    db: SessionDep,
-    cv_service: CVServiceDep
+    loader: LoaderDep
 ):
     """Get CV profile by user ID"""
-    cv_profile = cv_service.get_cv_profile_by_user(db, user_id=user.id)
+    cv_profile = await loader.cv_profile_by_user(user.id)
     if not cv_profile:
         raise HTTPException(status_code=404, detail="CV profile not found for user")
     return cv_profile
@@ -58,7 +58,7 @@ async def update_cv_profile(
     cv_service: CVServiceDep
 ):
     """Update CV profile"""
-    return cv_service.update_cv_profile(
+    return await cv_service.update_cv_profile(
         db=db, 
         cv_profile=cv_profile, 
         cv_update=cv_update
@@ -72,7 +72,7 @@ async def delete_cv_profile(
     cv_service: CVServiceDep
 ):
     """Delete CV profile"""
-    success = cv_service.delete_cv_profile(db=db, cv_profile=cv_profile)
+    success = await cv_service.delete_cv_profile(db=db, cv_profile=cv_profile)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete CV profile")
     return {"message": "CV profile deleted successfully"}
@@ -3,10 +3,13 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from ...core.dependencies import (
     SessionDep,
+    SettingsDep,
+    TokenUsageServiceDep,
     UserServiceDep,
     validate_user_exists
 )
 from ...schemas import user as user_schemas
+from ...schemas.token_usage import TokenUsageResponse
 from ...models.user import User
 
 router = APIRouter(
@@ -25,7 +28,7 @@ async def create_user(
     """Create a new user"""
     # Check if user already exists (this will be handled by the service)
     try:
-        return user_service.create_user(db=db, user=user)
+        return await user_service.create_user(db=db, user=user)
     except HTTPException:
         raise HTTPException(status_code=400, detail="Email already registered")
     except Exception as e:
@@ -40,6 +43,17 @@ async def get_user(
     return user
 
 
+@router.get("/{user_id}/usage", response_model=TokenUsageResponse)
+async def get_user_token_usage(
+    user: Annotated[User, Depends(validate_user_exists)],
+    db: SessionDep,
+    settings: SettingsDep,
+    token_usage_service: TokenUsageServiceDep
+):
+    """Get the user's generation token usage and quota for this month"""
+    return await token_usage_service.get_usage(db, user.id, settings)
+
+
 @router.put("/{user_id}", response_model=user_schemas.User)
 async def update_user(
     user: Annotated[User, Depends(validate_user_exists)],
@@ -49,7 +63,7 @@ async def update_user(
 ):
     """Update user information"""
     try:
-        updated_user = user_service.update_user(
+        updated_user = await user_service.update_user(
             db=db, 
             user_id=user.id, 
             user_update=user_update
@@ -71,7 +85,7 @@ async def delete_user(
 ):
     """Delete user and all related data"""
     try:
-        success = user_service.delete_user(db=db, user_id=user.id)
+        success = await user_service.delete_user(db=db, user_id=user.id)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to delete user")
         return {"message": "User deleted successfully"}
@@ -87,5 +101,5 @@ async def list_users(
     user_service: UserServiceDep
 ):
     """List all users (for development/admin purposes)"""
-    users = user_service.get_users(db)
+    users = await user_service.get_users(db)
     return users
\ No newline at end of file
@@ -0,0 +1,135 @@
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Iterator
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(HTTPException):
+    """Raised without calling the model while the circuit is open; maps to 503"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=503,
+            detail="Cover letter generation is temporarily unavailable, please retry later",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+
+class CircuitBreaker:
+    """Circuit breaker for an unreliable upstream.
+
+    Opens after `failure_threshold` consecutive failures, or when the failure rate over
+    the last `window_size` calls reaches `error_rate_threshold` (once `min_calls` have
+    been seen). While open, calls fail immediately. After `open_seconds` up to
+    `half_open_max_calls` probe calls are let through: a success closes the circuit,
+    a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        error_rate_threshold: float,
+        window_size: int,
+        min_calls: int,
+        open_seconds: float,
+        half_open_max_calls: int,
+        is_failure: Callable[[BaseException], bool]
+    ):
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.is_failure = is_failure
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.rejected_calls = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """Guard one upstream call, recording its outcome"""
+        self.check()
+        probing = self.state == STATE_HALF_OPEN
+        if probing:
+            self._probes_in_flight += 1
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self._on_failure()
+            raise
+        else:
+            self._on_success()
+        finally:
+            if probing:
+                self._probes_in_flight -= 1
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if a call would be rejected right now"""
+        if self.state == STATE_OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                self.rejected_calls += 1
+                raise CircuitOpenError(retry_after=remaining)
+            self.state = STATE_HALF_OPEN
+            logger.info("LLM circuit half-open; probing upstream")
+
+        if self.state == STATE_HALF_OPEN and self._probes_in_flight >= self.half_open_max_calls:
+            self.rejected_calls += 1
+            raise CircuitOpenError(retry_after=1)
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": round(self.error_rate, 3),
+            "rejected_calls": self.rejected_calls,
+        }
+
+    def _on_success(self) -> None:
+        self.consecutive_failures = 0
+        self._outcomes.append(True)
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_CLOSED
+            self._outcomes.clear()
+            logger.info("LLM circuit closed")
+
+    def _on_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._outcomes.append(False)
+        if self.state == STATE_HALF_OPEN:
+            self._open()
+        elif self.state == STATE_CLOSED and (
+            self.consecutive_failures >= self.failure_threshold
+            or (len(self._outcomes) >= self.min_calls and self.error_rate >= self.error_rate_threshold)
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        logger.warning(
+            f"LLM circuit opened for {self.open_seconds}s "
+            f"({self.consecutive_failures} consecutive failures, error rate {self.error_rate:.0%})"
+        )
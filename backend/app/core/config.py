@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,16 +6,110 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     app_name: str = "CV Generator API"
     api_v1_str: str = "/api/v1"
+    debug_headers: bool = False  # add X-DB-Query-Count and similar headers to responses
     
     # Database
     database_url: str = "sqlite:///./cv_generator.db"
     
+    # SQLite tuning ("tuned" enables WAL, a single writer connection and a read pool)
+    sqlite_profile: Literal["default", "tuned"] = "default"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536  # page cache per connection
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # bytes of the database file memory-mapped
+    sqlite_read_pool_size: int = 8
+    sqlite_write_timeout: float = 30.0  # seconds a write waits for the writer connection
+    
     # CORS
     allowed_hosts: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000", "http://127.0.0.1:5500", "http://localhost:5500"]
     
     # Google API Key for Gemini
     google_api_key: str
     
+    # LLM client
+    llm_provider: Literal["gemini", "fake"] = "gemini"
+    llm_model: str = "gemini-2.5-flash"
+    llm_fast_model: str = ""  # model for requests with short job descriptions; empty disables routing
+    llm_fast_model_max_chars: int = 1500  # longest job description routed to the fast model
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0  # seconds an idle connection is kept open
+    
+    # Fake LLM provider (LLM_PROVIDER=fake) for offline, reproducible load tests
+    fake_llm_latency_distribution: Literal["fixed", "uniform", "exponential", "lognormal"] = "lognormal"
+    fake_llm_latency_ms: float = 800.0  # median time to the first token
+    fake_llm_latency_spread: float = 0.5  # lognormal sigma, or relative half-width for uniform
+    fake_llm_slow_fraction: float = 0.0  # share of calls taking fake_llm_slow_latency_ms instead
+    fake_llm_slow_latency_ms: float = 5000.0
+    fake_llm_stream_chunk_ms: float = 20.0  # pause between streamed words
+    fake_llm_error_rate: float = 0.0  # share of calls failing with a retryable 503
+    fake_llm_seed: int = 0
+    
+    # LLM rate limiting (0 disables the per-minute limits)
+    llm_requests_per_minute: int = 600
+    llm_tokens_per_minute: int = 1_000_000
+    llm_max_in_flight: int = 64
+    llm_max_queue_depth: int = 256  # waiting calls beyond this fail fast with 429
+    llm_quota_retry_after: int = 30  # Retry-After seconds sent when Gemini reports quota errors
+    
+    # LLM timeouts, retries and hedging
+    llm_attempt_timeout: float = 30.0  # seconds per attempt
+    llm_total_timeout: float = 60.0  # seconds per call, across all retries
+    llm_max_retries: int = 2
+    llm_backoff_base: float = 0.5  # seconds, doubled per retry with full jitter
+    llm_backoff_max: float = 8.0
+    llm_hedge_enabled: bool = False
+    llm_hedge_delay: float = 0.0  # fixed hedge delay in seconds; 0 uses the observed percentile
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_samples: int = 20  # attempts observed before adaptive hedging starts
+    
+    # LLM circuit breaker
+    llm_breaker_failure_threshold: int = 5  # consecutive failures that open the circuit
+    llm_breaker_error_rate: float = 0.5  # failure rate over the window that opens the circuit
+    llm_breaker_window: int = 20  # recent calls considered for the failure rate
+    llm_breaker_min_calls: int = 10
+    llm_breaker_open_seconds: float = 30.0  # time before half-open probing starts
+    llm_breaker_half_open_calls: int = 1  # probe calls allowed while half-open
+    
+    # Generation cache
+    generation_cache_enabled: bool = True
+    generation_cache_ttl_seconds: int = 7 * 24 * 3600
+    generation_cache_max_entries: int = 1024  # in-memory LRU size
+    generation_cache_persist: bool = True  # keep a database tier that survives restarts
+    generation_cache_db_max_entries: int = 100_000
+    generation_cache_prune_interval: int = 100  # database tier stores between prunes
+    
+    # Read-through cache for users and CV profiles
+    entity_cache_enabled: bool = True
+    entity_cache_backend: Literal["memory", "redis"] = "memory"  # redis shares it across workers
+    entity_cache_redis_url: str = "redis://localhost:6379/0"
+    entity_cache_ttl_seconds: int = 300
+    entity_cache_max_entries: int = 10_000  # per process, memory backend only
+    
+    # Prompt token budget and per-user accounting
+    llm_prompt_token_budget: int = 3000  # estimated prompt tokens; larger prompts are compacted (0 disables)
+    llm_user_monthly_token_quota: int = 0  # model tokens per user per calendar month (0 disables)
+    
+    # CV trimming: above this many estimated tokens, prompts keep only the CV entries
+    # most relevant to the job
+    cv_trim_enabled: bool = True
+    cv_prompt_token_budget: int = 800
+    
+    # Background generation jobs
+    generation_workers: int = 4  # max jobs calling the model at once
+    generation_db_concurrency: int = 4  # generations doing database work at once (0 disables)
+    
+    # Batch generation
+    batch_max_concurrency: int = 8  # max model calls in flight per batch
+    
+    # Bulk import and export
+    bulk_import_chunk_size: int = 500  # lines validated and inserted per transaction
+    bulk_export_batch_size: int = 500  # cover letters fetched per round trip while exporting
+    
+    # Cover letter listing
+    cover_letter_page_size: int = 20  # default page size
+    cover_letter_max_page_size: int = 100
+    cover_letter_count_cap: int = 1000  # rows counted at most for approximate totals
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
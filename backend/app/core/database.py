@@ -1,32 +1,174 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from functools import lru_cache
 
-from .config import get_settings
+from .config import get_settings, Settings
+from .query_counter import install_query_counter
+
+# Async driver used for each backend when DATABASE_URL names a sync one; the
+# PostgreSQL and MySQL drivers come with the `postgres` and `mysql` extras
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+# Session.info flag set once a transaction has written through the writer connection
+_WRITER_BOUND = "bound_to_writer"
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a database URL onto its async driver (URLs already using one are kept)"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.get_driver_name() != ASYNC_DRIVERS[backend]:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+def is_sqlite_tuned(settings: Settings) -> bool:
+    """Whether the tuned SQLite profile applies to the configured database"""
+    return settings.sqlite_profile == "tuned" and make_url(settings.database_url).get_backend_name() == "sqlite"
+
+
+def _set_sqlite_pragmas(dbapi_connection, settings: Settings, read_only: bool = False) -> None:
+    """Apply the tuned profile's pragmas to a new SQLite connection"""
+    pragmas = [
+        f"busy_timeout = {settings.sqlite_busy_timeout_ms}",
+        f"cache_size = -{settings.sqlite_cache_size_kib}",
+        f"mmap_size = {settings.sqlite_mmap_size}",
+        "temp_store = MEMORY",
+    ]
+    if read_only:
+        # Anything routed to the read pool by mistake fails loudly instead of contending for the lock
+        pragmas.append("query_only = ON")
+    else:
+        # WAL lets readers run alongside the writer; NORMAL skips the fsync on every commit
+        pragmas += ["journal_mode = WAL", "synchronous = NORMAL"]
+
+    cursor = dbapi_connection.cursor()
+    for pragma in pragmas:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+def _listen_for_pragmas(sync_engine, settings: Settings, read_only: bool = False) -> None:
+    event.listen(
+        sync_engine,
+        "connect",
+        lambda dbapi_connection, _: _set_sqlite_pragmas(dbapi_connection, settings, read_only)
+    )
+
 
 # Create engine factory with settings dependency
 @lru_cache()
 def get_engine():
-    """Get SQLAlchemy engine with settings dependency"""
+    """Get the synchronous SQLAlchemy engine used for schema management and scripts"""
     settings = get_settings()
-    return create_engine(
+    sync_engine = create_engine(
         settings.database_url,
         connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
     )
+    if is_sqlite_tuned(settings):
+        _listen_for_pragmas(sync_engine, settings)
+    return sync_engine
+
+
+@lru_cache()
+def get_async_engine():
+    """Get the async engine used for writes (and for reads unless SQLite is tuned).
+
+    With the tuned SQLite profile this engine holds a single connection, so writes
+    queue for it in order instead of failing with "database is locked".
+    """
+    settings = get_settings()
+    url = get_async_database_url(settings.database_url)
+    if not is_sqlite_tuned(settings):
+        return create_async_engine(url)
+
+    writer_engine = create_async_engine(
+        url,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.sqlite_write_timeout
+    )
+    _listen_for_pragmas(writer_engine.sync_engine, settings)
+    return writer_engine
+
+
+@lru_cache()
+def get_async_read_engine():
+    """Get the async engine used for reads: a read-only pool when SQLite is tuned"""
+    settings = get_settings()
+    if not is_sqlite_tuned(settings):
+        return get_async_engine()
+
+    read_engine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        pool_size=settings.sqlite_read_pool_size,
+        max_overflow=0
+    )
+    _listen_for_pragmas(read_engine.sync_engine, settings, read_only=True)
+    return read_engine
+
 
-# Get engine instance
+class RoutingSession(Session):
+    """Session that runs plain reads on the read pool and everything else on the writer.
+
+    SELECTs are reads, as are raw statements marked with the `read_only` execution
+    option. Once a transaction has written, its later reads also use the writer so
+    they see its own uncommitted changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if clause is None and mapper is None and not self._flushing:
+            # Asked without a statement (e.g. for the dialect): nothing runs, so don't pin the writer
+            return async_engine.sync_engine
+        is_read = clause is not None and (
+            getattr(clause, "is_select", False) or clause.get_execution_options().get("read_only", False)
+        )
+        if is_read and not self._flushing and not self.info.get(_WRITER_BOUND):
+            return async_read_engine.sync_engine
+        self.info[_WRITER_BOUND] = True
+        return async_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer_binding(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITER_BOUND, None)
+
+
+# Get engine instances
 engine = get_engine()
+async_engine = get_async_engine()
+async_read_engine = get_async_read_engine()
+install_query_counter(async_engine, async_read_engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Objects stay usable after commit; lazy loads would need IO outside an await
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession if is_sqlite_tuned(get_settings()) else Session,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections on shutdown"""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
@@ -1,21 +1,28 @@
-from typing import Annotated
+from typing import Annotated, Any, Awaitable, Callable, Dict, Optional, Tuple
 from fastapi import Depends, HTTPException, Path
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .database import get_db
 from .config import get_settings, Settings
-from ..services import cv_service, user_service, cover_letter_service
+from .llm import get_llm_client, LLMClient
+from ..services import (
+    bulk_service, cv_service, user_service, cover_letter_service, generation_job_service, token_usage_service
+)
 from ..models.user import User
 from ..models.cv_profile import CVProfile
 from ..models.cover_letter import CoverLetter
+from ..schemas.cover_letter import CoverLetterResponse
 
 
 # Database session dependency
-SessionDep = Annotated[Session, Depends(get_db)]
+SessionDep = Annotated[AsyncSession, Depends(get_db)]
 
 # Settings dependency
 SettingsDep = Annotated[Settings, Depends(get_settings)]
 
+# Shared LLM client dependency
+LLMClientDep = Annotated[LLMClient, Depends(get_llm_client)]
+
 
 # Service dependencies
 def get_cv_service():
@@ -33,20 +40,85 @@ def get_cover_letter_service():
     return cover_letter_service
 
 
+def get_generation_job_service():
+    """Dependency to get generation job service module"""
+    return generation_job_service
+
+
+def get_bulk_service():
+    """Dependency to get bulk import/export service module"""
+    return bulk_service
+
+
+def get_token_usage_service():
+    """Dependency to get token usage service module"""
+    return token_usage_service
+
+
 # Type annotations for service dependencies
 CVServiceDep = Annotated[type(cv_service), Depends(get_cv_service)]
 UserServiceDep = Annotated[type(user_service), Depends(get_user_service)]
 CoverLetterServiceDep = Annotated[type(cover_letter_service), Depends(get_cover_letter_service)]
+GenerationJobServiceDep = Annotated[type(generation_job_service), Depends(get_generation_job_service)]
+BulkServiceDep = Annotated[type(bulk_service), Depends(get_bulk_service)]
+TokenUsageServiceDep = Annotated[type(token_usage_service), Depends(get_token_usage_service)]
+
+
+class RequestLoader:
+    """Loads entities for one request, fetching each at most once.
+    
+    Validation dependencies and route handlers share the loader, so an entity
+    checked by a dependency is not queried again by the handler. Missing
+    entities are remembered too.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._loaded: Dict[Tuple[str, int], Any] = {}
+
+    async def user(self, user_id: int) -> Optional[User]:
+        return await self._load("user", user_id, lambda: user_service.get_user(self.db, user_id=user_id))
+
+    async def cv_profile(self, profile_id: int) -> Optional[CVProfile]:
+        return await self._load("cv_profile", profile_id, lambda: cv_service.get_cv_profile(self.db, profile_id=profile_id))
+
+    async def cv_profile_by_user(self, user_id: int) -> Optional[CVProfile]:
+        user = self._loaded.get(("user", user_id))
+        if user is not None:
+            # Loaded together with the user
+            return user.cv_profile
+        return await self._load(
+            "cv_profile_by_user", 
+            user_id, 
+            lambda: cv_service.get_cv_profile_by_user(self.db, user_id=user_id)
+        )
+
+    async def cover_letter(self, cover_letter_id: int) -> Optional[CoverLetter]:
+        # Holding the model (not a response) keeps it in the session's identity map,
+        # which only references objects weakly, so services updating it skip the query
+        return await self._load("cover_letter", cover_letter_id, lambda: self.db.get(CoverLetter, cover_letter_id))
+
+    async def _load(self, kind: str, key: int, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if (kind, key) not in self._loaded:
+            self._loaded[(kind, key)] = await fetch()
+        return self._loaded[(kind, key)]
+
+
+def get_request_loader(db: SessionDep) -> RequestLoader:
+    """Dependency to get the loader shared by everything handling this request"""
+    return RequestLoader(db)
+
+
+LoaderDep = Annotated[RequestLoader, Depends(get_request_loader)]
 
 
 # Validation dependencies
 async def validate_user_exists(
     user_id: Annotated[int, Path()], 
-    db: SessionDep, 
-    user_svc: UserServiceDep
+    loader: LoaderDep
 ) -> User:
     """Dependency to validate user exists and return user object"""
-    user = user_svc.get_user(db, user_id=user_id)
+    user = await loader.user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -54,11 +126,10 @@ async def validate_user_exists(
 
 async def validate_cv_profile_exists(
     profile_id: Annotated[int, Path()], 
-    db: SessionDep, 
-    cv_svc: CVServiceDep
+    loader: LoaderDep
 ) -> CVProfile:
     """Dependency to validate CV profile exists and return profile object"""
-    cv_profile = cv_svc.get_cv_profile(db, profile_id=profile_id)
+    cv_profile = await loader.cv_profile(profile_id)
     if not cv_profile:
         raise HTTPException(status_code=404, detail="CV profile not found")
     return cv_profile
@@ -66,23 +137,21 @@ async def validate_cv_profile_exists(
 
 async def validate_cover_letter_exists(
     cover_letter_id: Annotated[int, Path()], 
-    db: SessionDep, 
-    cl_svc: CoverLetterServiceDep
-) -> CoverLetter:
+    loader: LoaderDep
+) -> CoverLetterResponse:
     """Dependency to validate cover letter exists and return cover letter object"""
-    cover_letter = cl_svc.get_cover_letter(db, cover_letter_id=cover_letter_id)
+    cover_letter = await loader.cover_letter(cover_letter_id)
     if not cover_letter:
         raise HTTPException(status_code=404, detail="Cover letter not found")
-    return cover_letter
+    return CoverLetterResponse.model_validate(cover_letter)
 
 
 async def validate_user_has_cv_profile(
     user_id: Annotated[int, Path()], 
-    db: SessionDep, 
-    cv_svc: CVServiceDep
+    loader: LoaderDep
 ) -> CVProfile:
     """Dependency to validate user has a CV profile and return it"""
-    cv_profile = cv_svc.get_cv_profile_by_user(db, user_id=user_id)
+    cv_profile = await loader.cv_profile_by_user(user_id)
     if not cv_profile:
         raise HTTPException(status_code=404, detail="CV profile not found for user")
     return cv_profile
@@ -91,11 +160,10 @@ async def validate_user_has_cv_profile(
 # For request body validation (when user_id comes from request, not path)
 async def validate_user_has_cv_profile_from_request(
     request_user_id: int,
-    db: SessionDep, 
-    cv_svc: CVServiceDep
+    loader: LoaderDep
 ) -> CVProfile:
     """Dependency to validate user has a CV profile using user_id from request body"""
-    cv_profile = cv_svc.get_cv_profile_by_user(db, user_id=request_user_id)
+    cv_profile = await loader.cv_profile_by_user(request_user_id)
     if not cv_profile:
         raise HTTPException(status_code=404, detail="CV profile not found for user")
     return cv_profile
@@ -0,0 +1,254 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Type
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .cache import LRUCache
+from .config import get_settings, Settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # only needed for ENTITY_CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+# Stores an entry only if its key has not been invalidated since the version was read
+_SET_IF_VERSION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[2] then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class MemoryBackend:
+    """Cache backend local to this process.
+
+    Only safe with a single worker process: other processes keep their own copies,
+    and invalidations made in one never reach the others. Use the redis backend
+    when running several workers.
+    """
+
+    def __init__(self, settings: Settings):
+        self._cache = LRUCache(
+            max_entries=settings.entity_cache_max_entries,
+            ttl_seconds=settings.entity_cache_ttl_seconds
+        )
+        self._versions = LRUCache(
+            max_entries=settings.entity_cache_max_entries,
+            ttl_seconds=settings.entity_cache_ttl_seconds
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    async def get_version(self, key: str) -> str:
+        return self._versions.get(key) or "0"
+
+    async def set_if_version(self, key: str, value: str, version_key: str, version: str) -> None:
+        if (self._versions.get(version_key) or "0") == version:
+            self._cache.set(key, value)
+
+    async def invalidate(self, keys: Dict[str, str]) -> None:
+        for key, version_key in keys.items():
+            self._cache.delete(key)
+            self._versions.set(version_key, str(int(self._versions.get(version_key) or "0") + 1))
+
+    async def close(self) -> None:
+        self._cache.clear()
+        self._versions.clear()
+
+
+class RedisBackend:
+    """Cache backend shared by every worker process through Redis"""
+
+    def __init__(self, settings: Settings):
+        if redis is None:
+            raise RuntimeError("ENTITY_CACHE_BACKEND=redis requires the redis package")
+        self.ttl_seconds = settings.entity_cache_ttl_seconds
+        self._client = redis.Redis.from_url(settings.entity_cache_redis_url)
+        self._set_if_version = self._client.register_script(_SET_IF_VERSION_SCRIPT)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._client.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    async def get_version(self, key: str) -> str:
+        value = await self._client.get(key)
+        return value.decode("utf-8") if value is not None else "0"
+
+    async def set_if_version(self, key: str, value: str, version_key: str, version: str) -> None:
+        await self._set_if_version(keys=[key, version_key], args=[value, version, self.ttl_seconds])
+
+    async def invalidate(self, keys: Dict[str, str]) -> None:
+        async with self._client.pipeline(transaction=True) as pipeline:
+            for key, version_key in keys.items():
+                pipeline.delete(key)
+                pipeline.incr(version_key)
+                # Outlives any read that started before the invalidation
+                pipeline.expire(version_key, self.ttl_seconds)
+            await pipeline.execute()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+BACKENDS = {
+    "memory": MemoryBackend,
+    "redis": RedisBackend,
+}
+
+
+class EntityCache:
+    """Read-through cache of database rows, stored as JSON of their column values.
+
+    Every invalidation bumps the key's version. A reader takes the version before it
+    queries the database and `set` stores the row only if the version is unchanged,
+    so a row read before a concurrent write cannot be cached after its invalidation.
+
+    Backend errors are logged and treated as misses, so an unavailable cache
+    only costs the database query it would have saved.
+    """
+
+    def __init__(self, namespace: str, backend):
+        self.namespace = namespace
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Get a cached entry, counting the hit or miss"""
+        try:
+            value = await self.backend.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Entity cache read failed ({self.namespace}): {str(e)}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value, object_hook=_decode_value)
+
+    async def version(self, key: Hashable) -> Optional[str]:
+        """Version to pass to `set`, taken before the row is read from the database"""
+        try:
+            return await self.backend.get_version(self._version_key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Entity cache read failed ({self.namespace}): {str(e)}")
+            return None
+
+    async def set(self, key: Hashable, entry: Dict[str, Any], version: Optional[str]) -> None:
+        """Store an entry read at `version`, unless the key was invalidated since"""
+        if version is None:
+            return
+        try:
+            await self.backend.set_if_version(
+                self._key(key), json.dumps(entry, default=_encode_value), self._version_key(key), version
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Entity cache write failed ({self.namespace}): {str(e)}")
+
+    async def invalidate(self, *keys: Hashable) -> None:
+        """Drop entries after the rows they were read from changed"""
+        self.invalidations += len(keys)
+        try:
+            await self.backend.invalidate({self._key(key): self._version_key(key) for key in keys})
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Entity cache invalidation failed ({self.namespace}): {str(e)}")
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+    def _key(self, key: Hashable) -> str:
+        return f"entity:{self.namespace}:{key}"
+
+    def _version_key(self, key: Hashable) -> str:
+        return f"entity:{self.namespace}:{key}:version"
+
+
+# Entity types cached, each keyed by user ID
+USER_CACHE = "users"
+CV_PROFILE_CACHE = "cv_profiles"
+
+# One cache per entity type, built from settings on first use
+_caches: Dict[str, EntityCache] = {}
+_backend = None
+
+
+def get_entity_cache(namespace: str) -> Optional[EntityCache]:
+    """Get the cache for an entity type, or None when entity caching is disabled"""
+    global _backend
+    settings = get_settings()
+    if not settings.entity_cache_enabled:
+        return None
+
+    if namespace not in _caches:
+        if _backend is None:
+            _backend = BACKENDS[settings.entity_cache_backend](settings)
+        _caches[namespace] = EntityCache(namespace, _backend)
+    return _caches[namespace]
+
+
+def entity_cache_snapshot() -> dict:
+    """Hit and miss counters per entity type"""
+    return {namespace: cache.snapshot() for namespace, cache in _caches.items()}
+
+
+async def close_entity_caches() -> None:
+    """Release the cache backend on shutdown"""
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+    _backend = None
+    _caches.clear()
+
+
+def to_entry(instance) -> Optional[Dict[str, Any]]:
+    """Column values of a loaded row, or None if some are not loaded"""
+    state = inspect(instance)
+    columns = [attr.key for attr in state.mapper.column_attrs]
+    if state.unloaded.intersection(columns):
+        return None
+    return {key: getattr(instance, key) for key in columns}
+
+
+def from_entry(model: Type, entry: Dict[str, Any], **relationships):
+    """Rebuild a detached row from cached column values and already built relationships"""
+    instance = model(**entry)
+    make_transient_to_detached(instance)
+    for key, value in relationships.items():
+        set_committed_value(instance, key, value)
+    return instance
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _decode_value(value: dict) -> Any:
+    if len(value) == 1 and "$datetime" in value:
+        return datetime.fromisoformat(value["$datetime"])
+    return value
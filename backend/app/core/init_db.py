@@ -4,6 +4,9 @@ from sqlalchemy.orm import sessionmaker
 
 from .database import Base, engine
 from .config import get_settings
+from .migrations import run_migrations
+from .search_index import create_search_index, drop_search_index
+from .. import models  # noqa: F401  (registers the tables on Base.metadata)
 
 
 def init_db() -> None:
@@ -15,6 +18,15 @@ def init_db() -> None:
         # Create all tables defined in the models
         Base.metadata.create_all(bind=engine)
         
+        # Upgrade tables created by earlier versions of the models
+        run_migrations(engine)
+        
+        # create_all skips indexes on tables that already exist
+        create_missing_indexes()
+        
+        # Full-text search index, kept in sync by triggers
+        create_search_index(engine)
+        
         print("✓ Database tables created successfully!")
         print(f"✓ Database location: {settings.database_url}")
         
@@ -31,17 +43,26 @@ def init_db() -> None:
         raise
 
 
+def create_missing_indexes() -> None:
+    """Create indexes added to models after their tables were created"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
 def reset_db() -> None:
     """Reset the database by dropping and recreating all tables"""
     try:
         print("⚠ Resetting database - this will delete all data!")
         
         # Drop all tables
+        drop_search_index(engine)
         Base.metadata.drop_all(bind=engine)
         print("✓ All tables dropped")
         
         # Recreate all tables
         Base.metadata.create_all(bind=engine)
+        create_search_index(engine)
         print("✓ All tables recreated")
         
     except Exception as e:
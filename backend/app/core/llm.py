@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+from .config import Settings, get_settings
+from .llm_providers import LLMOutput, LLMProvider, create_llm_provider
+from .rate_limit import LLMRateLimiter
+from .tokens import TokenUsage, estimate_tokens
+from .resilience import LLMTimeoutError, ResilienceMetrics, call_with_resilience, is_retryable
+from .circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Output budget assumed when admitting a call against the tokens-per-minute limit
+EXPECTED_OUTPUT_TOKENS = 256
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Errors that indicate the model service is unhealthy (counted by the circuit breaker)"""
+    return isinstance(error, LLMTimeoutError) or is_retryable(error)
+
+
+def estimate_call_tokens(prompt: str) -> int:
+    """Rough token cost of a call, including the reply"""
+    return estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS
+
+
+def _fill_usage(usage: TokenUsage, output: LLMOutput, prompt: str, text: str) -> None:
+    """Copy the token counts a response reported, estimating any that are missing"""
+    usage.prompt_tokens = output.prompt_tokens or estimate_tokens(prompt)
+    usage.output_tokens = output.output_tokens or estimate_tokens(text)
+
+
+class LLMClient:
+    """Process-wide model client over the provider selected in settings.
+    
+    Every model call passes a circuit breaker, is admitted through a shared rate
+    limiter and runs under the timeout, retry and hedging policy from settings.
+    """
+
+    def __init__(self, settings: Settings, provider: Optional[LLMProvider] = None):
+        self.settings = settings
+        self.provider = provider or create_llm_provider(settings)
+        self.model = self.provider.qualify_model(settings.llm_model)
+        self.fast_model = self.provider.qualify_model(settings.llm_fast_model) if settings.llm_fast_model else None
+        self.limiter = LLMRateLimiter(
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute,
+            max_in_flight=settings.llm_max_in_flight,
+            max_queue_depth=settings.llm_max_queue_depth,
+        )
+        self.metrics = ResilienceMetrics()
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            error_rate_threshold=settings.llm_breaker_error_rate,
+            window_size=settings.llm_breaker_window,
+            min_calls=settings.llm_breaker_min_calls,
+            open_seconds=settings.llm_breaker_open_seconds,
+            half_open_max_calls=settings.llm_breaker_half_open_calls,
+            is_failure=is_upstream_failure,
+        )
+
+    def route_model(self, text: str) -> str:
+        """Model for a request whose variable-size input is `text`: the fast model when
+        one is configured and the text is within `llm_fast_model_max_chars`"""
+        if self.fast_model and len(text) <= self.settings.llm_fast_model_max_chars:
+            return self.fast_model
+        return self.model
+
+    async def generate(
+        self, 
+        prompt: str, 
+        model: Optional[str] = None, 
+        user_id: Optional[int] = None,
+        usage: Optional[TokenUsage] = None,
+        response_schema: Optional[type] = None
+    ) -> str:
+        """Generate text for a prompt and return the stripped response text.
+        
+        When `usage` is given it is filled with the call's token counts. With a
+        `response_schema` (a pydantic model) the model is asked for JSON matching it.
+        """
+        model = model or self.model
+        tokens = estimate_call_tokens(prompt)
+
+        async def attempt() -> LLMOutput:
+            async with self.limiter.acquire(user_id, tokens):
+                return await self.provider.generate(prompt, model, response_schema)
+
+        with self.breaker.call():
+            output = await call_with_resilience(attempt, self.settings, self.metrics, self._can_hedge)
+        # Only the attempt that won is charged
+        text = output.text.strip()
+        if usage is not None:
+            _fill_usage(usage, output, prompt, text)
+        return text
+
+    async def stream(
+        self, 
+        prompt: str, 
+        model: Optional[str] = None, 
+        user_id: Optional[int] = None,
+        usage: Optional[TokenUsage] = None
+    ) -> AsyncIterator[str]:
+        """Generate text for a prompt, yielding text chunks as the model produces them.
+        
+        Opening the stream is retried under the resilience policy; once text has been
+        sent to the client the stream is not restarted. When `usage` is given it is
+        filled with the call's token counts once the stream ends.
+        """
+        model = model or self.model
+        with self.breaker.call():
+            async with self.limiter.acquire(user_id, estimate_call_tokens(prompt)):
+                async for chunk in self._stream(prompt, model, usage):
+                    yield chunk
+
+    async def _stream(self, prompt: str, model: str, usage: Optional[TokenUsage]) -> AsyncIterator[str]:
+        """Open the upstream stream under the resilience policy and yield its text.
+        
+        Each chunk must arrive within `llm_attempt_timeout` and the whole stream within
+        `llm_total_timeout`, otherwise LLMTimeoutError is raised.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.settings.llm_total_timeout
+        response_stream = await call_with_resilience(
+            lambda: self.provider.open_stream(prompt, model), self.settings, self.metrics, lambda: False
+        )
+        chunks = aiter(response_stream)
+        text = []
+        reported = LLMOutput("")
+        try:
+            while True:
+                # Only the wait for the next chunk is timed, never the consumer's time between yields
+                timeout = min(self.settings.llm_attempt_timeout, deadline - loop.time())
+                try:
+                    async with asyncio.timeout(timeout):
+                        chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    break
+                except TimeoutError as e:
+                    self.metrics.attempt_timeouts += 1
+                    raise LLMTimeoutError() from e
+                # Token counts arrive with the final chunk
+                if chunk.prompt_tokens or chunk.output_tokens:
+                    reported = chunk
+                if chunk.text:
+                    text.append(chunk.text)
+                    yield chunk.text
+        finally:
+            close = getattr(chunks, "aclose", None)
+            if close is not None:
+                await close()
+        if usage is not None:
+            _fill_usage(usage, reported, prompt, "".join(text))
+
+    def _can_hedge(self) -> bool:
+        """Only hedge when the limiter has spare capacity, so hedges never add to a backlog"""
+        return self.limiter.queue_depth == 0 and self.limiter.in_flight < self.limiter.max_in_flight
+
+    async def aclose(self) -> None:
+        """Close the provider's connections"""
+        await self.provider.aclose()
+
+
+_llm_client: Optional[LLMClient] = None
+
+
+def init_llm_client(settings: Settings) -> LLMClient:
+    """Create the shared LLM client (called once at application startup)"""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient(settings)
+        logger.info(f"LLM client initialized for {settings.llm_provider} model {settings.llm_model}")
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    """Close the shared LLM client (called at application shutdown)"""
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.aclose()
+        _llm_client = None
+        logger.info("LLM client closed")
+
+
+def get_llm_client() -> LLMClient:
+    """Get the shared LLM client, creating it on first use outside the app lifespan"""
+    if _llm_client is None:
+        return init_llm_client(get_settings())
+    return _llm_client
@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import ssl
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, NamedTuple, Optional, get_args, get_origin
+
+import certifi
+import httpx
+from google import genai
+from google.genai import errors, types
+from pydantic import BaseModel
+
+from .config import Settings
+from .rate_limit import RateLimitExceeded
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Items the fake provider puts in each list of a structured response
+FAKE_LIST_ITEMS = 5
+
+FAKE_LETTER_TEMPLATE = (
+    "Dear Hiring Manager,\n\n"
+    "I am excited to apply for this role. My experience building reliable software, working closely "
+    "with product and design, and delivering measurable results matches what your team is looking for. "
+    "I would bring a pragmatic, collaborative approach and a habit of leaving systems better than I found them.\n\n"
+    "Thank you for considering my application. I would welcome the chance to discuss how I can help.\n\n"
+    "Sincerely,\nCandidate {reference}"
+)
+
+
+class LLMOutput(NamedTuple):
+    """Text from a model, with the token counts the provider reported (None when unknown)"""
+    text: str
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+class LLMProvider(ABC):
+    """A model backend. `LLMClient` adds rate limiting, retries, hedging and the circuit breaker."""
+
+    name = "base"
+
+    def qualify_model(self, model: str) -> str:
+        """Model name used for calls and cache keys, so providers never share cached letters"""
+        return f"{self.name}:{model}"
+
+    @abstractmethod
+    async def generate(self, prompt: str, model: str, response_schema: Optional[type] = None) -> LLMOutput:
+        """Generate the full response to a prompt"""
+
+    @abstractmethod
+    async def open_stream(self, prompt: str, model: str) -> AsyncIterator[LLMOutput]:
+        """Open a streamed response; token counts, if any, come with the last chunk"""
+
+    async def aclose(self) -> None:
+        """Release the provider's connections"""
+
+
+def _default_ssl_context() -> ssl.SSLContext:
+    """The context google-genai would build itself; a custom transport bypasses it"""
+    return ssl.create_default_context(
+        cafile=os.environ.get("SSL_CERT_FILE", certifi.where()),
+        capath=os.environ.get("SSL_CERT_DIR"),
+    )
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini over a pooled, keep-alive HTTP transport"""
+
+    name = "gemini"
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        )
+        # The SDK has no public close, so the provider owns the transports (and
+        # their connection pools) it hands to the SDK's httpx clients
+        ssl_context = _default_ssl_context()
+        self._transport = httpx.HTTPTransport(verify=ssl_context, limits=limits)
+        self._async_transport = httpx.AsyncHTTPTransport(verify=ssl_context, limits=limits)
+        self._client = genai.Client(
+            api_key=settings.google_api_key,
+            http_options=types.HttpOptions(
+                client_args={"transport": self._transport},
+                async_client_args={"transport": self._async_transport},
+            ),
+        )
+
+    def qualify_model(self, model: str) -> str:
+        # Unqualified, so cache keys from before providers existed stay valid
+        return model
+
+    async def generate(self, prompt: str, model: str, response_schema: Optional[type] = None) -> LLMOutput:
+        config = None
+        if response_schema is not None:
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=response_schema
+            )
+        try:
+            response = await self._client.aio.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=config
+            )
+        except errors.APIError as e:
+            self._raise_if_quota_exceeded(e)
+            raise
+        return _gemini_output(response.text or "", getattr(response, "usage_metadata", None))
+
+    async def open_stream(self, prompt: str, model: str) -> AsyncIterator[LLMOutput]:
+        try:
+            response_stream = await self._client.aio.models.generate_content_stream(
+                model=model,
+                contents=prompt
+            )
+        except errors.APIError as e:
+            self._raise_if_quota_exceeded(e)
+            raise
+        return (
+            _gemini_output(chunk.text or "", getattr(chunk, "usage_metadata", None))
+            async for chunk in response_stream
+        )
+
+    def _raise_if_quota_exceeded(self, error: errors.APIError) -> None:
+        """Surface upstream quota errors as 429s instead of generic failures"""
+        if error.code == 429:
+            logger.warning(f"Gemini quota exceeded: {error.message}")
+            raise RateLimitExceeded(
+                retry_after=self.settings.llm_quota_retry_after,
+                detail="Generation quota exceeded, please retry later"
+            ) from error
+
+    async def aclose(self) -> None:
+        await self._async_transport.aclose()
+        self._transport.close()
+
+
+def _gemini_output(text: str, usage_metadata) -> LLMOutput:
+    return LLMOutput(
+        text,
+        getattr(usage_metadata, "prompt_token_count", None),
+        getattr(usage_metadata, "candidates_token_count", None)
+    )
+
+
+class FakeLLMProvider(LLMProvider):
+    """In-process model for offline load tests.
+
+    Replies are derived from the prompt, so runs are reproducible; latency, streaming
+    pace and injected failures follow the `fake_llm_*` settings. Failures are 503s,
+    which the retry policy and circuit breaker treat like real upstream errors.
+    """
+
+    name = "fake"
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._random = random.Random(settings.fake_llm_seed)
+        self.calls = 0
+
+    async def generate(self, prompt: str, model: str, response_schema: Optional[type] = None) -> LLMOutput:
+        await self._respond()
+        if response_schema is not None:
+            text = json.dumps(_fake_instance(response_schema, prompt))
+        else:
+            text = _fake_letter(prompt)
+        return LLMOutput(text, estimate_tokens(prompt), estimate_tokens(text))
+
+    async def open_stream(self, prompt: str, model: str) -> AsyncIterator[LLMOutput]:
+        await self._respond()
+        return self._stream_words(prompt)
+
+    async def _stream_words(self, prompt: str) -> AsyncIterator[LLMOutput]:
+        text = _fake_letter(prompt)
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            await asyncio.sleep(self.settings.fake_llm_stream_chunk_ms / 1000)
+            chunk = word if index == 0 else f" {word}"
+            if index < len(words) - 1:
+                yield LLMOutput(chunk)
+            else:
+                yield LLMOutput(chunk, estimate_tokens(prompt), estimate_tokens(text))
+
+    async def _respond(self) -> None:
+        """Wait out a simulated latency, then fail at the configured error rate"""
+        self.calls += 1
+        await asyncio.sleep(self._latency())
+        if self._random.random() < self.settings.fake_llm_error_rate:
+            raise errors.ServerError(503, {"error": {"message": "Simulated model failure", "status": "UNAVAILABLE"}})
+
+    def _latency(self) -> float:
+        """Seconds to the first token, drawn from the configured distribution"""
+        settings = self.settings
+        if self._random.random() < settings.fake_llm_slow_fraction:
+            return settings.fake_llm_slow_latency_ms / 1000
+
+        median = settings.fake_llm_latency_ms / 1000
+        spread = settings.fake_llm_latency_spread
+        distribution = settings.fake_llm_latency_distribution
+        if distribution == "fixed" or median <= 0:
+            return max(0.0, median)
+        if distribution == "uniform":
+            return self._random.uniform(median * max(0.0, 1 - spread), median * (1 + spread))
+        if distribution == "exponential":
+            return self._random.expovariate(math.log(2) / median)
+        return self._random.lognormvariate(math.log(median), spread)
+
+
+def _fake_letter(seed: str) -> str:
+    return FAKE_LETTER_TEMPLATE.format(reference=_fake_reference(seed))
+
+
+def _fake_reference(seed: str) -> str:
+    return hashlib.sha256(seed.encode("utf-8")).hexdigest()[:8]
+
+
+def _fake_instance(schema: type, seed: str) -> dict:
+    """Values for every field of a pydantic model; `content` fields get a letter"""
+    values = {}
+    for name, field in schema.model_fields.items():
+        values[name] = _fake_value(field.annotation, name, f"{seed}/{name}")
+    return values
+
+
+def _fake_value(annotation, name: str, seed: str):
+    if get_origin(annotation) is list:
+        [item] = get_args(annotation)
+        return [_fake_value(item, name, f"{seed}/{index}") for index in range(FAKE_LIST_ITEMS)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _fake_instance(annotation, seed)
+    if annotation is bool:
+        return False
+    if annotation in (int, float):
+        return annotation(0)
+    if name == "content":
+        return _fake_letter(seed)
+    return f"{name} {_fake_reference(seed)}"
+
+
+def create_llm_provider(settings: Settings) -> LLMProvider:
+    """Build the provider selected by `llm_provider`"""
+    if settings.llm_provider == "fake":
+        return FakeLLMProvider(settings)
+    return GeminiProvider(settings)
@@ -0,0 +1,179 @@
+from sqlalchemy import MetaData, Table, bindparam, inspect, or_, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from ..models.cover_letter import CoverLetter
+from ..models.cv_profile import CVProfile
+from ..models.job_posting import JobPosting
+from .search_index import drop_search_sync
+from ..services.cv_prompt_service import PROMPT_SUMMARY_VERSION, compile_prompt_summary
+from ..services.job_posting_service import hash_job_description
+
+# Rows moved per batch when migrating existing data
+MIGRATION_BATCH_SIZE = 1000
+
+
+def run_migrations(engine: Engine) -> None:
+    """Bring tables created by earlier versions up to the current schema"""
+    with engine.begin() as connection:
+        _move_job_descriptions_to_postings(connection)
+        _require_cover_letter_job_postings(connection)
+        _compile_cv_prompt_summaries(connection)
+        _add_missing_columns(connection, "cover_letters", {
+            "prompt_tokens": "INTEGER",
+            "output_tokens": "INTEGER",
+        })
+
+
+def _add_missing_columns(connection: Connection, table_name: str, columns: dict) -> None:
+    """Add nullable columns (name -> SQL type) that the table does not have yet"""
+    existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+    for name, column_type in columns.items():
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"))
+
+
+def _move_job_descriptions_to_postings(connection: Connection) -> None:
+    """Replace cover_letters.job_description with a reference to a shared job posting"""
+    columns = {column["name"] for column in inspect(connection).get_columns("cover_letters")}
+    if "job_description" not in columns:
+        return
+    
+    print("Migrating cover letter job descriptions to job_postings...")
+    if "job_posting_id" not in columns:
+        connection.execute(text(
+            "ALTER TABLE cover_letters ADD COLUMN job_posting_id INTEGER REFERENCES job_postings(id)"
+        ))
+    
+    posting_ids = {}
+    migrated = 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT id, job_description FROM cover_letters "
+            "WHERE job_posting_id IS NULL ORDER BY id LIMIT :batch_size"
+        ), {"batch_size": MIGRATION_BATCH_SIZE}).all()
+        if not rows:
+            break
+        
+        hashes = {row.id: hash_job_description(row.job_description) for row in rows}
+        unseen = set(hashes.values()) - posting_ids.keys()
+        if unseen:
+            posting_ids.update(connection.execute(
+                select(JobPosting.content_hash, JobPosting.id).where(JobPosting.content_hash.in_(unseen))
+            ).all())
+        
+        new_postings = {}
+        for row in rows:
+            if hashes[row.id] not in posting_ids:
+                new_postings.setdefault(hashes[row.id], row.job_description)
+        if new_postings:
+            connection.execute(
+                JobPosting.__table__.insert(),
+                [{"content_hash": content_hash, "description": description} for content_hash, description in new_postings.items()]
+            )
+            posting_ids.update(connection.execute(
+                select(JobPosting.content_hash, JobPosting.id).where(JobPosting.content_hash.in_(new_postings))
+            ).all())
+        
+        connection.execute(
+            text("UPDATE cover_letters SET job_posting_id = :posting_id WHERE id = :cover_letter_id").bindparams(
+                bindparam("posting_id"), bindparam("cover_letter_id")
+            ),
+            [{"posting_id": posting_ids[content_hash], "cover_letter_id": cover_letter_id} for cover_letter_id, content_hash in hashes.items()]
+        )
+        migrated += len(rows)
+    
+    connection.execute(text("ALTER TABLE cover_letters DROP COLUMN job_description"))
+    print(f"✓ Moved {migrated} job descriptions into {len(posting_ids)} job postings")
+
+
+def _require_cover_letter_job_postings(connection: Connection) -> None:
+    """Make cover_letters.job_posting_id NOT NULL on databases that gained it as a nullable column"""
+    column = next(
+        (column for column in inspect(connection).get_columns("cover_letters") if column["name"] == "job_posting_id"),
+        None
+    )
+    if column is None or not column["nullable"]:
+        return
+    
+    missing = connection.execute(text("SELECT COUNT(*) FROM cover_letters WHERE job_posting_id IS NULL")).scalar()
+    if missing:
+        raise RuntimeError(f"{missing} cover letters have no job posting; cannot make job_posting_id required")
+    
+    if connection.dialect.name != "sqlite":
+        connection.execute(text("ALTER TABLE cover_letters ALTER COLUMN job_posting_id SET NOT NULL"))
+        return
+    
+    # SQLite cannot change a column's constraints, so the table is rebuilt. The
+    # search triggers and view refer to it and are recreated by create_search_index.
+    drop_search_sync(connection)
+    _rebuild_sqlite_table(connection, CoverLetter.__table__)
+    print("✓ Made cover_letters.job_posting_id required")
+
+
+def _rebuild_sqlite_table(connection: Connection, table: Table) -> None:
+    """Recreate a SQLite table from its current model definition, keeping its rows and ids.
+    
+    Follows SQLite's create-copy-drop-rename procedure, so foreign keys in other
+    tables keep pointing at the table by name. Foreign key enforcement must be off,
+    which is SQLite's default, or dropping the old table would cascade.
+    """
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    columns = ", ".join(column.name for column in table.columns if column.name in existing)
+    
+    # The copy lives in its own metadata, with the tables its foreign keys refer to
+    scratch = MetaData()
+    for foreign_key in table.foreign_keys:
+        foreign_key.column.table.to_metadata(scratch)
+    rebuilt = table.to_metadata(scratch, name=f"{table.name}_rebuild")
+    
+    connection.execute(CreateTable(rebuilt))
+    connection.execute(text(f"INSERT INTO {rebuilt.name} ({columns}) SELECT {columns} FROM {table.name}"))
+    connection.execute(text(f"DROP TABLE {table.name}"))
+    connection.execute(text(f"ALTER TABLE {rebuilt.name} RENAME TO {table.name}"))
+    for index in table.indexes:
+        index.create(bind=connection)
+
+
+def _compile_cv_prompt_summaries(connection: Connection) -> None:
+    """Store prompt summaries on CV profiles saved before they existed or in an older format"""
+    _add_missing_columns(connection, "cv_profiles", {
+        "prompt_summary": "TEXT",
+        "prompt_summary_hash": "VARCHAR(64)",
+        "prompt_summary_version": "INTEGER",
+    })
+    
+    table = CVProfile.__table__
+    outdated = or_(table.c.prompt_summary_version.is_(None), table.c.prompt_summary_version != PROMPT_SUMMARY_VERSION)
+    compiled = 0
+    while True:
+        rows = connection.execute(
+            select(table).where(outdated).order_by(table.c.id).limit(MIGRATION_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        
+        updates = []
+        for row in rows:
+            profile = CVProfile(**row._asdict())
+            compile_prompt_summary(profile)
+            updates.append({
+                "profile_id": row.id,
+                "compiled_summary": profile.prompt_summary,
+                "compiled_hash": profile.prompt_summary_hash,
+                "compiled_version": profile.prompt_summary_version,
+            })
+        connection.execute(
+            table.update().where(table.c.id == bindparam("profile_id")).values(
+                prompt_summary=bindparam("compiled_summary"),
+                prompt_summary_hash=bindparam("compiled_hash"),
+                prompt_summary_version=bindparam("compiled_version"),
+                # Recompiling is not an edit to the profile
+                updated_at=table.c.updated_at
+            ),
+            updates
+        )
+        compiled += len(rows)
+    
+    if compiled:
+        print(f"✓ Compiled prompt summaries for {compiled} CV profiles")
\ No newline at end of file
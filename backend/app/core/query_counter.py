@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryCount:
+    """SQL statements executed while counting"""
+    statements: int = 0
+
+
+_current_count: ContextVar[Optional[QueryCount]] = ContextVar("query_count", default=None)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCount]:
+    """Count the SQL statements run by the current task (and tasks it starts) inside the block"""
+    count = QueryCount()
+    token = _current_count.set(count)
+    try:
+        yield count
+    finally:
+        _current_count.reset(token)
+
+
+def install_query_counter(*engines: AsyncEngine) -> None:
+    """Count statements executed through these engines"""
+    for engine in set(engines):
+        event.listen(engine.sync_engine, "before_cursor_execute", _on_execute)
+
+
+def _on_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    count = _current_count.get()
+    if count is not None:
+        count.statements += 1
@@ -0,0 +1,185 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Hashable, Optional
+
+from fastapi import HTTPException
+
+
+class RateLimitExceeded(HTTPException):
+    """Raised when a model call cannot be admitted; maps to 429 with Retry-After"""
+
+    def __init__(self, retry_after: float, detail: str = "Too many generation requests, please retry later"):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=429,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to one minute's allowance"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens")
+
+    def __init__(self, future: "asyncio.Future[None]", tokens: int):
+        self.future = future
+        self.tokens = tokens
+
+
+class LLMRateLimiter:
+    """Admission control in front of every model call.
+
+    Enforces requests-per-minute and tokens-per-minute budgets and a cap on calls
+    in flight. Waiting calls are queued per user and admitted round-robin, so one
+    heavy user cannot starve the others. When the queue is full, callers fail fast
+    with RateLimitExceeded instead of waiting.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_in_flight: int,
+        max_queue_depth: int
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_in_flight = max_in_flight
+        self.max_queue_depth = max_queue_depth
+
+        self.in_flight = 0
+        self._queued = 0
+        self._queues: "OrderedDict[Hashable, Deque[_Waiter]]" = OrderedDict()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    @asynccontextmanager
+    async def acquire(self, user_id: Optional[Hashable], tokens: int) -> AsyncIterator[None]:
+        """Hold a model-call slot for the duration of the block"""
+        await self._admit(user_id, tokens)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _admit(self, user_id: Optional[Hashable], tokens: int) -> None:
+        if self._queued == 0 and self._try_start(tokens):
+            return
+
+        if self._queued >= self.max_queue_depth:
+            raise RateLimitExceeded(retry_after=self._estimate_drain_time())
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tokens)
+        self._queues.setdefault(user_id, deque()).append(waiter)
+        self._queued += 1
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as the caller went away; hand the slot on
+                self._release()
+            else:
+                self._remove_waiter(user_id, waiter)
+            raise
+
+    def _try_start(self, tokens: int) -> bool:
+        """Start a call now if every limit allows it"""
+        if self.in_flight >= self.max_in_flight:
+            return False
+        if self._bucket_wait_time(tokens) > 0:
+            return False
+        self._consume(tokens)
+        self.in_flight += 1
+        return True
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit queued waiters round-robin across users while limits allow"""
+        while self._queues and self.in_flight < self.max_in_flight:
+            user_id, waiters = next(iter(self._queues.items()))
+            waiter = waiters[0]
+
+            wait_time = self._bucket_wait_time(waiter.tokens)
+            if wait_time > 0:
+                self._schedule_wakeup(wait_time)
+                return
+
+            waiters.popleft()
+            self._queued -= 1
+            # Move this user to the back of the rotation
+            del self._queues[user_id]
+            if waiters:
+                self._queues[user_id] = waiters
+
+            self._consume(waiter.tokens)
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    def _remove_waiter(self, user_id: Optional[Hashable], waiter: _Waiter) -> None:
+        waiters = self._queues.get(user_id)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            self._queued -= 1
+            if not waiters:
+                del self._queues[user_id]
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _bucket_wait_time(self, tokens: int) -> float:
+        wait_time = 0.0
+        if self.request_bucket:
+            wait_time = max(wait_time, self.request_bucket.wait_time(1))
+        if self.token_bucket:
+            wait_time = max(wait_time, self.token_bucket.wait_time(tokens))
+        return wait_time
+
+    def _consume(self, tokens: int) -> None:
+        if self.request_bucket:
+            self.request_bucket.consume(1)
+        if self.token_bucket:
+            self.token_bucket.consume(tokens)
+
+    def _estimate_drain_time(self) -> float:
+        """Rough time until the current queue has been admitted"""
+        if self.request_bucket:
+            return self._queued / self.request_bucket.refill_per_second
+        return 1.0
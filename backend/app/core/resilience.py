@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import math
+import random
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+import httpx
+from fastapi import HTTPException
+from google.genai import errors
+
+from .config import Settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upstream status codes worth another attempt
+RETRYABLE_STATUS_CODES = {408, 500, 502, 503, 504}
+
+
+class LLMTimeoutError(HTTPException):
+    """Raised when a model call misses its overall deadline; maps to 504"""
+
+    def __init__(self, detail: str = "Cover letter generation timed out"):
+        super().__init__(status_code=504, detail=detail)
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies (seconds) with percentile lookups"""
+
+    def __init__(self, size: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class ResilienceMetrics:
+    """Counters and latency windows for resilient model calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.attempts = 0
+        self.retries = 0
+        self.attempt_timeouts = 0
+        self.hedges_started = 0
+        self.hedge_wins = 0
+        self.latency = LatencyWindow()
+        self.attempt_latency = LatencyWindow()
+
+    def snapshot(self) -> dict:
+        def percentiles(window: LatencyWindow) -> dict:
+            return {
+                name: round(value * 1000, 1) if value is not None else None
+                for name, value in (
+                    ("p50_ms", window.percentile(0.50)),
+                    ("p95_ms", window.percentile(0.95)),
+                    ("p99_ms", window.percentile(0.99)),
+                )
+            }
+
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "attempt_timeouts": self.attempt_timeouts,
+            "hedges_started": self.hedges_started,
+            "hedge_wins": self.hedge_wins,
+            "latency": percentiles(self.latency),
+        }
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an attempt failure is transient and worth retrying"""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def backoff_delay(retry: int, settings: Settings) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(settings.llm_backoff_max, settings.llm_backoff_base * (2 ** retry)))
+
+
+def hedge_delay(settings: Settings, metrics: ResilienceMetrics) -> Optional[float]:
+    """Seconds to wait before hedging an attempt, or None when hedging is off"""
+    if not settings.llm_hedge_enabled:
+        return None
+    if settings.llm_hedge_delay > 0:
+        return settings.llm_hedge_delay
+    if len(metrics.attempt_latency) < settings.llm_hedge_min_samples:
+        return None
+    return metrics.attempt_latency.percentile(settings.llm_hedge_percentile)
+
+
+async def call_with_resilience(
+    attempt: Callable[[], Awaitable[T]],
+    settings: Settings,
+    metrics: ResilienceMetrics,
+    can_hedge: Callable[[], bool] = lambda: True
+) -> T:
+    """Run a model call with per-attempt and overall deadlines, retries and optional hedging"""
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    deadline = started_at + settings.llm_total_timeout
+    metrics.calls += 1
+
+    retry = 0
+    while True:
+        remaining = deadline - loop.time()
+        try:
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            result = await _run_attempt(
+                attempt, min(settings.llm_attempt_timeout, remaining), settings, metrics, can_hedge
+            )
+            metrics.latency.add(loop.time() - started_at)
+            return result
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                metrics.attempt_timeouts += 1
+
+            delay = backoff_delay(retry, settings)
+            if not is_retryable(e) or retry >= settings.llm_max_retries or loop.time() + delay >= deadline:
+                metrics.failures += 1
+                if isinstance(e, asyncio.TimeoutError):
+                    raise LLMTimeoutError() from e
+                raise
+
+            retry += 1
+            metrics.retries += 1
+            logger.warning(f"Retrying model call in {delay:.2f}s after {type(e).__name__}: {str(e)}")
+            await asyncio.sleep(delay)
+
+
+async def _run_attempt(
+    attempt: Callable[[], Awaitable[T]],
+    timeout: float,
+    settings: Settings,
+    metrics: ResilienceMetrics,
+    can_hedge: Callable[[], bool]
+) -> T:
+    """Run one attempt, racing a hedged duplicate if it runs past the hedge delay.
+
+    The first attempt to succeed wins and the other is cancelled, so it stops holding
+    a rate limiter slot and its result is never used.
+    """
+    primary = _start_attempt(attempt, timeout, metrics)
+
+    delay = hedge_delay(settings, metrics)
+    if delay is None or delay >= timeout:
+        return await primary
+
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done or not can_hedge():
+        return await primary
+
+    metrics.hedges_started += 1
+    hedge = _start_attempt(attempt, timeout - delay, metrics)
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                if task is hedge:
+                    metrics.hedge_wins += 1
+                return task.result()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        # Wait for the cancelled attempt to unwind so its limiter slot is free on return
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _start_attempt(
+    attempt: Callable[[], Awaitable[T]], 
+    timeout: float, 
+    metrics: ResilienceMetrics
+) -> "asyncio.Task[T]":
+    """Start an attempt under its own timeout, recording its latency when it succeeds"""
+    async def timed_attempt() -> T:
+        loop = asyncio.get_running_loop()
+        attempt_started_at = loop.time()
+        result = await asyncio.wait_for(attempt(), timeout)
+        metrics.attempt_latency.add(loop.time() - attempt_started_at)
+        return result
+
+    metrics.attempts += 1
+    return asyncio.ensure_future(timed_attempt())
+
@@ -0,0 +1,104 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# FTS5 index over cover letters. It stores only the index: the text is read back
+# from the search documents view, which joins each letter to its job posting.
+# Column sizes are not stored since results are not ranked with bm25().
+SEARCH_TABLE = "cover_letters_fts"
+SEARCH_DOCUMENTS_VIEW = "cover_letter_search_documents"
+
+# Indexed columns, in order; `owner` holds a "u<user_id>" token so a user's
+# letters are selected inside the index rather than by filtering every match
+SEARCH_COLUMNS = ("owner", "title", "job_title", "company_name", "job_description", "content")
+
+_DOCUMENT_VALUES = """
+    {row}.id,
+    'u' || {row}.user_id,
+    {row}.title,
+    {row}.job_title,
+    {row}.company_name,
+    (SELECT description FROM job_postings WHERE job_postings.id = {row}.job_posting_id),
+    {row}.content
+"""
+
+_SEARCH_INDEX_DDL = [
+    f"""
+    CREATE VIEW IF NOT EXISTS {SEARCH_DOCUMENTS_VIEW} AS
+    SELECT cover_letters.id AS id,
+           'u' || cover_letters.user_id AS owner,
+           cover_letters.title AS title,
+           cover_letters.job_title AS job_title,
+           cover_letters.company_name AS company_name,
+           job_postings.description AS job_description,
+           cover_letters.content AS content
+    FROM cover_letters JOIN job_postings ON job_postings.id = cover_letters.job_posting_id
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        {", ".join(SEARCH_COLUMNS)},
+        content='{SEARCH_DOCUMENTS_VIEW}', content_rowid='id', tokenize='porter unicode61',
+        columnsize=0
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cover_letters_fts_insert AFTER INSERT ON cover_letters BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ({_DOCUMENT_VALUES.format(row="new")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cover_letters_fts_delete AFTER DELETE ON cover_letters BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ('delete', {_DOCUMENT_VALUES.format(row="old")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cover_letters_fts_update
+    AFTER UPDATE OF user_id, title, job_title, company_name, job_posting_id, content ON cover_letters BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ('delete', {_DOCUMENT_VALUES.format(row="old")});
+        INSERT INTO {SEARCH_TABLE} (rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ({_DOCUMENT_VALUES.format(row="new")});
+    END
+    """,
+]
+
+
+def create_search_index(engine: Engine) -> None:
+    """Create the full-text index and its sync triggers (SQLite only), indexing existing letters"""
+    if engine.dialect.name != "sqlite":
+        return
+    
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE}
+        ).first()
+        for statement in _SEARCH_INDEX_DDL:
+            connection.execute(text(statement))
+        if exists:
+            return
+        
+        # Index the letters stored before the index existed
+        connection.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')"))
+        print("✓ Full-text search index built")
+
+
+def drop_search_index(engine: Engine) -> None:
+    """Drop the full-text index, its triggers and its view"""
+    if engine.dialect.name != "sqlite":
+        return
+    
+    with engine.begin() as connection:
+        drop_search_sync(connection)
+        connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+def drop_search_sync(connection: Connection) -> None:
+    """Drop the triggers and view that tie the index to cover_letters, keeping the index.
+    
+    create_search_index puts them back without reindexing.
+    """
+    for trigger in ("cover_letters_fts_insert", "cover_letters_fts_delete", "cover_letters_fts_update"):
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    connection.execute(text(f"DROP VIEW IF EXISTS {SEARCH_DOCUMENTS_VIEW}"))
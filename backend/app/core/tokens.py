@@ -0,0 +1,44 @@
+import re
+from dataclasses import dataclass
+
+# Average characters per token of English text, close enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Appended where text was cut to fit a token budget
+TRUNCATION_MARKER = " …"
+
+
+@dataclass
+class TokenUsage:
+    """Input and output tokens of a model call, as reported by the model when it does"""
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text"""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def compact_whitespace(text: str) -> str:
+    """Collapse runs of spaces within lines and drop blank lines"""
+    lines = (re.sub(r"[ \t]+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text at a word boundary so that it fits within `max_tokens`"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    
+    limit = max(0, max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER))
+    cut = text[:limit]
+    boundary = max(cut.rfind(" "), cut.rfind("\n"))
+    # Prefer a word boundary unless that would throw away most of what fits
+    if boundary > limit // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + TRUNCATION_MARKER
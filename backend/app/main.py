@@ -1,19 +1,39 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import models to ensure they are registered
 from .models import User, CVProfile, CoverLetter
 from .api import api_router
 from .core.config import get_settings
+from .core.database import dispose_engines
+from .core.entity_cache import close_entity_caches, entity_cache_snapshot
+from .core.query_counter import count_queries
+from .core.llm import init_llm_client, close_llm_client, get_llm_client
+from .services import generation_job_service
 
 # Get settings instance at startup
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown"""
+    llm_client = init_llm_client(settings)
+    await generation_job_service.start_workers(settings, llm_client)
+    yield
+    await generation_job_service.stop_workers()
+    await close_llm_client()
+    await close_entity_caches()
+    await dispose_engines()
+
+
 app = FastAPI(
     title=settings.app_name,
     description="A web application that generates personalized cover letters by analyzing user CVs and job descriptions",
     version="1.0.0",
-    openapi_url=f"{settings.api_v1_str}/openapi.json"
+    openapi_url=f"{settings.api_v1_str}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set up CORS middleware
@@ -23,8 +43,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Query-Count"],
 )
 
+
+@app.middleware("http")
+async def add_debug_headers(request: Request, call_next):
+    """Report the SQL statements a request ran before its response started"""
+    if not settings.debug_headers:
+        return await call_next(request)
+    
+    with count_queries() as query_count:
+        response = await call_next(request)
+    response.headers["X-DB-Query-Count"] = str(query_count.statements)
+    return response
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.api_v1_str)
 
@@ -36,4 +70,22 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """Model call counters, latency percentiles and hedging effectiveness"""
+    llm_client = get_llm_client()
+    return {
+        **llm_client.metrics.snapshot(),
+        "in_flight": llm_client.limiter.in_flight,
+        "queue_depth": llm_client.limiter.queue_depth,
+        "circuit": llm_client.breaker.snapshot(),
+    }
+
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """Hit and miss counters of the user and CV profile caches"""
+    return entity_cache_snapshot()
@@ -2,6 +2,10 @@
 from .user import User
 from .cv_profile import CVProfile
 from .cover_letter import CoverLetter
+from .job_posting import JobPosting
+from .generation_cache import GenerationCacheEntry
+from .generation_job import GenerationJob
+from .token_usage import UserTokenUsage
 
 # Make models available for import
-__all__ = ["User", "CVProfile", "CoverLetter"] 
\ No newline at end of file
+__all__ = ["User", "CVProfile", "CoverLetter", "JobPosting", "GenerationCacheEntry", "GenerationJob", "UserTokenUsage"] 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -14,11 +14,15 @@ class CoverLetter(Base):
     # Job and company information
     job_title = Column(String(255), nullable=True)
     company_name = Column(String(255), nullable=True)
-    job_description = Column(Text, nullable=False)
+    job_posting_id = Column(Integer, ForeignKey("job_postings.id"), nullable=False, index=True)
     
     # Generated content
     content = Column(Text, nullable=False)
     
+    # Model tokens spent producing the content (null when not generated by a model call)
+    prompt_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    
     # Metadata
     title = Column(String(255), nullable=True)  # User-defined title for the cover letter
     
@@ -26,4 +30,16 @@ class CoverLetter(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="cover_letters") 
\ No newline at end of file
+    user = relationship("User", back_populates="cover_letters")
+    # Loaded with the letter, since responses include the job description
+    job_posting = relationship("JobPosting", back_populates="cover_letters", lazy="joined")
+
+    __table_args__ = (
+        # Serves a user's newest-first listing and its keyset pagination from the index
+        Index("ix_cover_letters_user_created_id", user_id, created_at.desc(), id.desc()),
+    )
+
+    @property
+    def job_description(self) -> str:
+        """Description of the job, stored once per distinct posting"""
+        return self.job_posting.description 
\ No newline at end of file
@@ -27,6 +27,11 @@ class CVProfile(Base):
     
     projects = Column(JSON, nullable=True)
     
+    # Profile formatted for generation prompts, rebuilt whenever the profile is saved
+    prompt_summary = Column(Text, nullable=True)
+    prompt_summary_hash = Column(String(64), nullable=True)
+    prompt_summary_version = Column(Integer, nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
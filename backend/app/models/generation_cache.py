@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Text, Float, DateTime
+from sqlalchemy.sql import func
+
+from ..core.database import Base
+
+
+class GenerationCacheEntry(Base):
+    __tablename__ = "generation_cache"
+
+    # SHA-256 of the formatted CV, job fields, prompt template and model name
+    key = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=False)
+    
+    # Generated content
+    content = Column(Text, nullable=False)
+    
+    # Unix timestamp after which the entry is ignored and may be pruned
+    expires_at = Column(Float, nullable=False, index=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
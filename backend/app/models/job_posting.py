@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from ..core.database import Base
+
+
+class JobPosting(Base):
+    __tablename__ = "job_postings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # SHA-256 of the whitespace-normalized description; identical postings share a row
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)
+    # As first submitted; later letters with the same normalized text show this formatting
+    description = Column(Text, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    cover_letters = relationship("CoverLetter", back_populates="job_posting")
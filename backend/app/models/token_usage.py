@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from ..core.database import Base
+
+
+class UserTokenUsage(Base):
+    """Model tokens a user's generations consumed in one calendar month"""
+    __tablename__ = "user_token_usage"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    period = Column(String(7), primary_key=True)  # YYYY-MM (UTC)
+    
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    calls = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    user = relationship("User", back_populates="token_usage")
@@ -14,15 +14,27 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    # One-to-one relationship with CV profile
+    # One-to-one relationship with CV profile; loaded eagerly because user
+    # responses include it and async sessions cannot lazy load
     cv_profile = relationship(
         "CVProfile", 
         back_populates="user",
         cascade="all, delete-orphan",
-        uselist=False
+        uselist=False,
+        lazy="selectin"
     )
     cover_letters = relationship(
         "CoverLetter", 
         back_populates="user",
         cascade="all, delete-orphan"
+    )
+    generation_jobs = relationship(
+        "GenerationJob", 
+        back_populates="user",
+        cascade="all, delete-orphan"
+    )
+    token_usage = relationship(
+        "UserTokenUsage", 
+        back_populates="user",
+        cascade="all, delete-orphan"
     ) 
\ No newline at end of file
@@ -10,6 +10,7 @@ from .cv_profile import (
     ProjectSchema
 )
 from .cover_letter import CoverLetter, CoverLetterCreate, CoverLetterUpdate, CoverLetterGenerate
+from .generation_job import GenerationJobResponse
 
 # Rebuild models to resolve forward references
 # This is required for Pydantic v2 when using forward references
@@ -23,5 +24,7 @@ __all__ = [
     "CVProfile", "CVProfileCreate", "CVProfileUpdate",
     "SkillSchema", "ExperienceSchema", "EducationSchema", "ProjectSchema",
     # Cover Letter schemas
-    "CoverLetter", "CoverLetterCreate", "CoverLetterUpdate", "CoverLetterGenerate"
+    "CoverLetter", "CoverLetterCreate", "CoverLetterUpdate", "CoverLetterGenerate",
+    # Generation job schemas
+    "GenerationJobResponse"
 ] 
\ No newline at end of file
@@ -0,0 +1,25 @@
+from typing import Annotated, Literal, Optional, Union
+from pydantic import EmailStr, Field, TypeAdapter, constr
+
+from .user import UserCreate
+from .cv_profile import CVProfileUpdate
+from .cover_letter import CoverLetterBase
+
+
+class UserImport(UserCreate):
+    """A user to import, optionally with their CV profile"""
+    type: Literal["user"]
+    cv_profile: Optional[CVProfileUpdate] = None
+
+
+class CoverLetterImport(CoverLetterBase):
+    """A cover letter to import for a user identified by email"""
+    type: Literal["cover_letter"]
+    user_email: EmailStr
+    content: constr(max_length=1500) = Field(..., description="Cover letter content")
+
+
+# One NDJSON line of an import; export lines have the same shape (extra fields are ignored)
+ImportRecord = TypeAdapter(
+    Annotated[Union[UserImport, CoverLetterImport], Field(discriminator="type")]
+)
@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Union
 from pydantic import BaseModel, Field, ConfigDict, constr
 
+# Most letter variants one generate request can ask for
+MAX_VARIANTS = 5
+
 
 class CoverLetterBase(BaseModel):
     title: constr(min_length=3, max_length=200) = Field(..., description="Title of the cover letter")
@@ -48,6 +51,63 @@ class CoverLetterGenerate(BaseModel):
         ..., 
         description="Description of the job position to generate the cover letter for"
     )
+    force_regenerate: bool = Field(
+        False, 
+        description="Bypass the generation cache and always call the model"
+    )
+    allow_fallback: bool = Field(
+        False, 
+        description="Return a template-based letter instead of a 503 while the model is unavailable"
+    )
+    variants: int = Field(
+        1, 
+        ge=1, 
+        le=MAX_VARIANTS, 
+        description="Letters with different tone or emphasis to generate from one model call; each is saved "
+                    "as its own cover letter. More than one bypasses the generation cache"
+    )
+
+
+class CoverLetterJobSpec(BaseModel):
+    job_title: constr(min_length=2, max_length=100) = Field(..., description="Title of the job being applied for")
+    company_name: Optional[constr(max_length=100)] = Field(None, description="Name of the company")
+    job_description: constr(min_length=50, max_length=5000) = Field(
+        ..., 
+        description="Description of the job position to generate the cover letter for"
+    )
+    force_regenerate: bool = Field(
+        False, 
+        description="Bypass the generation cache and always call the model"
+    )
+    allow_fallback: bool = Field(
+        False, 
+        description="Return a template-based letter instead of a 503 while the model is unavailable"
+    )
+
+
+class CoverLetterBatchGenerate(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "user_id": 1,
+                "jobs": [
+                    {
+                        "job_title": "Senior Software Engineer",
+                        "company_name": "Tech Corp",
+                        "job_description": "We are looking for a senior software engineer with 5+ years of experience in Python and web development..."
+                    },
+                    {
+                        "job_title": "Backend Developer",
+                        "company_name": "Startup Inc",
+                        "job_description": "Join our small team building scalable APIs in Python and PostgreSQL for millions of users..."
+                    }
+                ]
+            }
+        }
+    )
+
+    user_id: int = Field(..., description="ID of the user requesting the cover letters")
+    jobs: List[CoverLetterJobSpec] = Field(..., min_length=1, max_length=200, description="Jobs to generate cover letters for")
 
 
 class CoverLetterResponse(CoverLetterBase):
@@ -55,8 +115,74 @@ class CoverLetterResponse(CoverLetterBase):
 
     id: int
     user_id: int
+    prompt_tokens: Optional[int] = Field(None, description="Model input tokens spent generating the content")
+    output_tokens: Optional[int] = Field(None, description="Model output tokens spent generating the content")
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class CoverLetterGenerateResponse(CoverLetterResponse):
+    cached: bool = Field(False, description="Whether the content was served from the generation cache")
+    coalesced: bool = Field(
+        False, 
+        description="Whether the content came from an identical generation already in flight"
+    )
+    fallback: bool = Field(
+        False, 
+        description="Whether the content is the local template used while the model is unavailable"
+    )
+    alternatives: List[CoverLetterResponse] = Field(
+        default_factory=list, 
+        description="The other saved variants when more than one was requested"
+    )
+
+
+class CoverLetterRefine(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "instruction": "Make it more formal and mention my Kubernetes experience"
+            }
+        }
+    )
+
+    instruction: constr(strip_whitespace=True, min_length=3, max_length=300) = Field(
+        ..., 
+        description="How to change the letter"
+    )
+    force_regenerate: bool = Field(
+        False, 
+        description="Bypass the generation cache and always call the model"
+    )
+
+
+class CoverLetterRefineResponse(CoverLetterResponse):
+    cached: bool = Field(False, description="Whether the refined content was served from the generation cache")
+
+
+class CoverLetterVariant(BaseModel):
+    """One letter of a multi-variant model response"""
+    emphasis: str = Field(..., description="Short label for the variant's tone or emphasis")
+    content: str = Field(..., description="The cover letter")
+
+
+class CoverLetterVariants(BaseModel):
+    """Structured output requested from the model for multi-variant generation"""
+    variants: List[CoverLetterVariant]
+
+
+class CoverLetterSummary(BaseModel):
+    """List item without the job description and letter body"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    title: Optional[str] = None
+    job_title: Optional[str] = None
+    company_name: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    snippet: Optional[str] = Field(None, description="Start of the letter, when requested with `snippet_length`")
 
 
 class CoverLetterListResponse(BaseModel):
@@ -64,6 +190,8 @@ class CoverLetterListResponse(BaseModel):
         json_schema_extra={
             "example": {
                 "total": 1,
+                "total_is_exact": True,
+                "next_cursor": None,
                 "items": [
                     {
                         "id": 1,
@@ -81,5 +209,34 @@ class CoverLetterListResponse(BaseModel):
         }
     )
 
-    total: int
-    items: List[CoverLetterResponse] 
\ No newline at end of file
+    total: int = Field(..., description="Letters matching the filters (capped when approximate)")
+    total_is_exact: bool = Field(True, description="False when the total was capped and more letters exist")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next page; null on the last page")
+    items: List[Union[CoverLetterResponse, CoverLetterSummary]] 
+
+
+class CoverLetterSearchHit(BaseModel):
+    """Search result with the matching fields highlighted"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    title: Optional[str] = None
+    job_title: Optional[str] = None
+    company_name: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    score: float = Field(..., description="Relevance; higher is a better match")
+    highlights: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Fields that matched, with matched terms wrapped in <mark></mark> (the text is not HTML-escaped); "
+                    "job_description and content are shortened to an excerpt around the matches"
+    )
+
+
+class CoverLetterSearchResponse(BaseModel):
+    query: str
+    total: int = Field(..., description="Letters matching the query (capped)")
+    total_is_exact: bool = Field(True, description="False when the total was capped and more letters match")
+    next_offset: Optional[int] = Field(None, description="Pass as `offset` to get the next page; null on the last page")
+    items: List[CoverLetterSearchHit]
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+from .cover_letter import CoverLetterResponse
+
+
+class GenerationJobResponse(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "id": 1,
+                "user_id": 1,
+                "status": "succeeded",
+                "cover_letter_id": 42,
+                "error": None,
+                "created_at": "2024-03-20T10:00:00Z",
+                "started_at": "2024-03-20T10:00:01Z",
+                "finished_at": "2024-03-20T10:00:04Z",
+                "cover_letter": None
+            }
+        }
+    )
+
+    id: int
+    user_id: int
+    status: Literal["queued", "running", "succeeded", "failed"]
+    cover_letter_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    cover_letter: Optional[CoverLetterResponse] = Field(
+        None, 
+        description="Generated cover letter, once the job has succeeded"
+    )
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class TokenUsageResponse(BaseModel):
+    user_id: int
+    period: str = Field(..., description="Calendar month (UTC) the usage is counted in, as YYYY-MM")
+    prompt_tokens: int
+    output_tokens: int
+    total_tokens: int
+    calls: int = Field(..., description="Model calls made for the user's generations")
+    quota: Optional[int] = Field(None, description="Monthly token quota, if one is enforced")
+    remaining: Optional[int] = Field(None, description="Tokens left this month, if a quota is enforced")
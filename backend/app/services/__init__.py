@@ -1,4 +1,10 @@
 # Service module exports
+from . import cv_prompt_service
 from . import cv_service
 from . import user_service  
-from . import cover_letter_service 
\ No newline at end of file
+from . import job_posting_service
+from . import cover_letter_service
+from . import generation_cache_service
+from . import token_usage_service
+from . import generation_job_service
+from . import bulk_service
@@ -0,0 +1,246 @@
+import json
+import logging
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Dict, Iterable, List, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import Settings
+from ..core.database import AsyncSessionLocal
+from ..models.cover_letter import CoverLetter
+from ..models.cv_profile import CVProfile
+from ..models.user import User
+from ..schemas.bulk import CoverLetterImport, ImportRecord, UserImport
+from ..schemas.cover_letter import CoverLetter as CoverLetterSchema
+from ..schemas.user import User as UserSchema
+from ..services import job_posting_service
+from ..services.cv_prompt_service import compile_prompt_summary
+
+logger = logging.getLogger(__name__)
+
+# Request bodies larger than this are spooled to a temporary file while importing
+IMPORT_SPOOL_MAX_BYTES = 1024 * 1024
+
+
+async def spool_request_body(chunks: AsyncIterator[bytes]) -> SpooledTemporaryFile:
+    """Buffer an uploaded NDJSON body so it can be imported while the report streams back"""
+    spool = SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_BYTES)
+    async for chunk in chunks:
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def import_records(lines: Iterable[Union[bytes, str]], settings: Settings) -> AsyncIterator[str]:
+    """Import NDJSON users (with CV profiles) and cover letters, streaming a report line per input line.
+
+    Lines are validated with the API schemas and written in chunks of
+    `bulk_import_chunk_size`, each with one batched INSERT per table and one
+    commit. A bad line gets an error report without failing its chunk; a chunk
+    the database rejects is reported as failed line by line. The last line
+    totals what was created.
+    """
+    created = {"users": 0, "cv_profiles": 0, "cover_letters": 0}
+    failed = 0
+    chunk: List[Tuple[int, Union[UserImport, CoverLetterImport]]] = []
+    reports: Dict[int, dict] = {}
+
+    async def flush():
+        nonlocal failed
+        if chunk:
+            reports.update(await _import_chunk(chunk))
+        for line_number in sorted(reports):
+            report = reports[line_number]
+            if report["status"] == "error":
+                failed += 1
+            else:
+                created["users"] += report["type"] == "user"
+                created["cv_profiles"] += "cv_profile_id" in report
+                created["cover_letters"] += report["type"] == "cover_letter"
+            yield _format_ndjson_line(report)
+        chunk.clear()
+        reports.clear()
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            chunk.append((line_number, ImportRecord.validate_json(line)))
+        except ValidationError as e:
+            reports[line_number] = _error_report(line_number, _describe_validation_error(e))
+
+        if len(chunk) >= settings.bulk_import_chunk_size:
+            async for report_line in flush():
+                yield report_line
+
+    async for report_line in flush():
+        yield report_line
+    logger.info(f"Bulk import created {created} with {failed} failed lines")
+    yield _format_ndjson_line({"status": "complete", "created": created, "failed": failed})
+
+
+async def _import_chunk(chunk: List[Tuple[int, Union[UserImport, CoverLetterImport]]]) -> Dict[int, dict]:
+    """Write one chunk of validated records in a single transaction"""
+    reports: Dict[int, dict] = {}
+    async with AsyncSessionLocal() as db:
+        try:
+            user_ids = await _insert_users(
+                db, [(line, record) for line, record in chunk if isinstance(record, UserImport)], reports
+            )
+            await _insert_cover_letters(
+                db, [(line, record) for line, record in chunk if isinstance(record, CoverLetterImport)],
+                user_ids, reports
+            )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Bulk import chunk failed: {str(e)}")
+            # The driver's message, without the statement and parameters
+            reason = str(getattr(e, "orig", None) or e)
+            for line, _ in chunk:
+                if reports.get(line, {}).get("status") != "error":
+                    reports[line] = _error_report(line, f"Failed to import: {reason}")
+    return reports
+
+
+async def _insert_users(
+    db: AsyncSession,
+    records: List[Tuple[int, UserImport]],
+    reports: Dict[int, dict]
+) -> Dict[str, int]:
+    """Insert new users and their CV profiles, returning user IDs by email"""
+    if not records:
+        return {}
+
+    taken = set(await db.scalars(
+        select(User.email).where(User.email.in_({record.email for _, record in records}))
+    ))
+    new_users = []
+    for line, record in records:
+        if record.email in taken:
+            reports[line] = _error_report(line, "User with this email already exists")
+        else:
+            taken.add(record.email)
+            new_users.append((line, record))
+    if not new_users:
+        return {}
+
+    ids = await db.scalars(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [{"name": record.name, "email": record.email} for _, record in new_users]
+    )
+    user_ids = {}
+    for (line, record), user_id in zip(new_users, ids.all()):
+        user_ids[record.email] = user_id
+        reports[line] = {"line": line, "status": "created", "type": "user", "id": user_id}
+
+    with_profiles = [(line, record) for line, record in new_users if record.cv_profile is not None]
+    if with_profiles:
+        profile_ids = await db.scalars(
+            insert(CVProfile).returning(CVProfile.id, sort_by_parameter_order=True),
+            [_build_cv_profile_row(user_ids[record.email], record) for _, record in with_profiles]
+        )
+        for (line, _), profile_id in zip(with_profiles, profile_ids.all()):
+            reports[line]["cv_profile_id"] = profile_id
+    return user_ids
+
+
+def _build_cv_profile_row(user_id: int, record: UserImport) -> dict:
+    """Column values of an imported CV profile, with its compiled prompt summary"""
+    values = {"user_id": user_id, **record.cv_profile.model_dump()}
+    cv_profile = CVProfile(**values)
+    compile_prompt_summary(cv_profile)
+    return {
+        **values,
+        "prompt_summary": cv_profile.prompt_summary,
+        "prompt_summary_hash": cv_profile.prompt_summary_hash,
+        "prompt_summary_version": cv_profile.prompt_summary_version,
+    }
+
+
+async def _insert_cover_letters(
+    db: AsyncSession,
+    records: List[Tuple[int, CoverLetterImport]],
+    user_ids: Dict[str, int],
+    reports: Dict[int, dict]
+) -> None:
+    """Insert cover letters for users created in this chunk or already stored"""
+    if not records:
+        return
+
+    unknown = {record.user_email for _, record in records} - user_ids.keys()
+    if unknown:
+        user_ids = {**user_ids, **dict((await db.execute(
+            select(User.email, User.id).where(User.email.in_(unknown))
+        )).all())}
+
+    owned = []
+    for line, record in records:
+        if record.user_email in user_ids:
+            owned.append((line, record))
+        else:
+            reports[line] = _error_report(line, "User not found")
+    if not owned:
+        return
+
+    job_postings = await job_posting_service.get_or_create_job_postings(
+        db, [record.job_description for _, record in owned]
+    )
+    ids = await db.scalars(
+        insert(CoverLetter).returning(CoverLetter.id, sort_by_parameter_order=True),
+        [
+            {
+                **record.model_dump(exclude={"type", "user_email", "job_description"}),
+                "user_id": user_ids[record.user_email],
+                "job_posting_id": job_posting.id,
+            }
+            for (_, record), job_posting in zip(owned, job_postings)
+        ]
+    )
+    for (line, _), cover_letter_id in zip(owned, ids.all()):
+        reports[line] = {"line": line, "status": "created", "type": "cover_letter", "id": cover_letter_id}
+
+
+async def export_user_records(user_id: int, settings: Settings) -> AsyncIterator[str]:
+    """Stream a user (with CV profile) and their cover letters as NDJSON import lines.
+
+    Cover letters are read in batches of `bulk_export_batch_size` from a
+    streaming cursor, so memory use does not grow with the number of letters.
+    """
+    # The request's session is released once the response starts streaming
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        if not user:
+            return
+        yield _format_ndjson_line({"type": "user", **UserSchema.model_validate(user).model_dump(mode="json")})
+
+        cover_letters = await db.stream_scalars(
+            select(CoverLetter)
+            .where(CoverLetter.user_id == user_id)
+            .order_by(CoverLetter.id)
+            .execution_options(yield_per=settings.bulk_export_batch_size)
+        )
+        async for cover_letter in cover_letters:
+            yield _format_ndjson_line({
+                "type": "cover_letter",
+                "user_email": user.email,
+                **CoverLetterSchema.model_validate(cover_letter).model_dump(mode="json")
+            })
+
+
+def _describe_validation_error(error: ValidationError) -> str:
+    """One-line summary of what is wrong with an input line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    )
+
+
+def _error_report(line: int, error: str) -> dict:
+    return {"line": line, "status": "error", "error": error}
+
+
+def _format_ndjson_line(data: dict) -> str:
+    """Format a newline-delimited JSON record"""
+    return json.dumps(data) + "\n"
@@ -1,7 +1,16 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from google import genai
+import asyncio
+import base64
+import json
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import String, cast, column, func, insert, literal, literal_column, select, table, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, noload
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException
+from pydantic import ValidationError
 import logging
 
 from ..models.cover_letter import CoverLetter
@@ -9,23 +18,120 @@ from ..schemas.cover_letter import (
     CoverLetterCreate, 
     CoverLetterUpdate, 
     CoverLetterGenerate,
+    CoverLetterBatchGenerate,
     CoverLetterResponse,
-    CoverLetterListResponse
+    CoverLetterGenerateResponse,
+    CoverLetterListResponse,
+    CoverLetterSummary,
+    CoverLetterSearchHit,
+    CoverLetterSearchResponse,
+    CoverLetterVariants,
+    CoverLetterRefine,
+    CoverLetterRefineResponse
 )
 from ..core.config import Settings
+from ..core.database import AsyncSessionLocal
+from ..core.llm import LLMClient
+from ..core.rate_limit import RateLimitExceeded
+from ..core.circuit_breaker import CircuitOpenError
+from ..core.resilience import LLMTimeoutError
+from ..core.search_index import SEARCH_COLUMNS, SEARCH_TABLE
+from ..core.tokens import TokenUsage, compact_whitespace, estimate_tokens, truncate_to_tokens
+from ..services import generation_cache_service, job_posting_service, token_usage_service
+from ..services.cv_prompt_service import CVPromptSummary, get_prompt_summary_for_job
 from ..services.cv_service import get_cv_profile_by_user
 from ..services.user_service import get_user
 
 logger = logging.getLogger(__name__)
 
+# Columns loaded for summary list items; the large text columns stay deferred
+SUMMARY_COLUMNS = (
+    CoverLetter.id,
+    CoverLetter.user_id,
+    CoverLetter.title,
+    CoverLetter.job_title,
+    CoverLetter.company_name,
+    CoverLetter.created_at,
+    CoverLetter.updated_at,
+)
+
+# Score a search hit earns for each field its words appear in
+SEARCH_WEIGHTS = {
+    "title": 10,
+    "job_title": 5,
+    "company_name": 5,
+    "job_description": 2,
+    "content": 1,
+}
+HIGHLIGHT_MARKS = ("<mark>", "</mark>")
+# Approximate length in words of the excerpts returned for long fields
+SEARCH_SNIPPET_TOKENS = 24
+
+# Model calls currently in flight, keyed by generation cache key
+_inflight_generations: Dict[str, "asyncio.Task[str]"] = {}
+
+# Generations doing database work at once, sized by generation_db_concurrency; a
+# semaphore is bound to one event loop, so the loop it was created on is kept with it
+_generation_db_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+
+class GeneratedContent(NamedTuple):
+    """Letter content and where it came from"""
+    content: str
+    cached: bool = False
+    coalesced: bool = False
+    fallback: bool = False
+    usage: Optional[TokenUsage] = None  # tokens of the model call this caller made, if any
+
+# Part of the generation cache key, so editing it invalidates cached letters
+COVER_LETTER_PROMPT_TEMPLATE = """Generate a professional cover letter based on the following CV and job description. 
+The cover letter must be less than 120 words and should be personalized, engaging, and highlight the most relevant qualifications.
+
+CV INFORMATION:
+{cv_summary}
+
+JOB DETAILS:
+Position: {position}
+Job Description: {job_description}
+
+REQUIREMENTS:
+- Maximum 120 words
+- Professional tone
+- Highlight most relevant skills and experience from the CV
+- Address the specific job requirements mentioned in the job description
+- Include a proper greeting and closing
+- Be concise but impactful
+- Focus on value proposition for the employer
+
+Generate the cover letter now:"""
+
+# Refinement only sends the current letter, so it costs a fraction of a generation
+REFINE_PROMPT_TEMPLATE = """Revise the cover letter below for the position of {position}.
+
+INSTRUCTION:
+{instruction}
+
+CURRENT COVER LETTER:
+{content}
+
+REQUIREMENTS:
+- Apply the instruction and keep everything else as it is
+- Maximum 120 words
+- Return only the revised cover letter"""
+
+# Replaces the template's last line when several variants are requested
+VARIANTS_INSTRUCTION = """Write {count} different versions of the cover letter. Each must meet all the requirements above, but give each a distinct tone or emphasis (for example formal, enthusiastic, or centred on one achievement from the CV).
+Return JSON with a "variants" list; each item has a short "emphasis" label and the letter "content"."""
+
 
 async def generate_cover_letter(
-    db: Session, 
+    db: AsyncSession, 
     request: CoverLetterGenerate, 
     settings: Settings,
     cv_profile,
-    user
-) -> CoverLetterResponse:
+    user,
+    llm_client: LLMClient
+) -> CoverLetterGenerateResponse:
     """Generate a cover letter based on CV profile and job description using LLM"""
     logger.info(f"Generating cover letter for user {request.user_id}")
     
@@ -38,297 +144,968 @@ async def generate_cover_letter(
         raise HTTPException(status_code=404, detail="User not found")
     
     try:
-        content = await generate_cover_letter_content(cv_profile, request, settings)
-        logger.info(f"Successfully generated cover letter content for user {request.user_id}")
+        cv_prompt = get_prompt_summary_for_job(cv_profile, request.job_description, settings)
+        if request.variants > 1:
+            return await _generate_cover_letter_variants(db, cv_profile, cv_prompt, request, settings, llm_client)
         
-        cover_letter_data = CoverLetterCreate(
-            user_id=request.user_id,
-            job_title=request.job_title,
-            company_name=request.company_name,
-            job_description=request.job_description,
-            content=content,
-            title=f"Cover Letter for {request.job_title or 'Position'}" + 
-                  (f" at {request.company_name}" if request.company_name else "")
+        generated = await _generate_content(
+            db, cv_profile, cv_prompt, request, settings, llm_client
         )
         
-        return create_cover_letter(db, cover_letter_data)
+        cover_letter_data = _build_cover_letter_create(request, generated.content)
+        
+        async with _generation_db_slot(settings):
+            cover_letter = await create_cover_letter(db, cover_letter_data, usage=generated.usage)
+        return CoverLetterGenerateResponse(
+            **cover_letter.model_dump(), 
+            cached=generated.cached, 
+            coalesced=generated.coalesced,
+            fallback=generated.fallback
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to generate cover letter: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate cover letter: {str(e)}")
 
 
-async def generate_cover_letter_content(cv_profile, request: CoverLetterGenerate, settings: Settings) -> str:
-    """Generate cover letter content using Google Gemini LLM"""
+async def _generate_cover_letter_variants(
+    db: AsyncSession,
+    cv_profile,
+    cv_prompt: CVPromptSummary,
+    request: CoverLetterGenerate,
+    settings: Settings,
+    llm_client: LLMClient
+) -> CoverLetterGenerateResponse:
+    """Generate `request.variants` letters with one structured-output model call and save
+    them in one transaction.
+    
+    The first variant is returned as the letter and the rest as its alternatives. The
+    call's tokens are charged to the user once and split evenly across the saved letters.
+    """
+    await token_usage_service.ensure_within_quota(db, request.user_id, settings)
+    _ensure_api_key(settings)
+    
+    prompt = _build_cover_letter_prompt(cv_prompt.text, request, settings.llm_prompt_token_budget)
+    prompt = prompt.removesuffix("Generate the cover letter now:") + VARIANTS_INSTRUCTION.format(count=request.variants)
+    
+    # End the read transaction so the pooled connection is not held through the model call
+    await db.commit()
+    
+    usage = TokenUsage()
     try:
-        cv_summary = _format_cv_for_prompt(cv_profile)
-        
-        prompt = _build_cover_letter_prompt(cv_summary, request)
-
-        # Ensure the API key is configured before attempting to call Gemini
-        if not settings.google_api_key:
-            logger.error("Google API key is missing; cannot generate cover letter content")
-            raise HTTPException(
-                status_code=500,
-                detail="Google API key is not configured on the server."
+        text = await llm_client.generate(
+            prompt, 
+            model=llm_client.route_model(request.job_description), 
+            user_id=request.user_id, 
+            usage=usage, 
+            response_schema=CoverLetterVariants
+        )
+    except CircuitOpenError:
+        if not request.allow_fallback:
+            raise
+        logger.warning(f"LLM circuit open; serving template cover letter for user {request.user_id}")
+        cover_letter = await create_cover_letter(
+            db, _build_cover_letter_create(request, _build_fallback_letter(cv_profile, request))
+        )
+        return CoverLetterGenerateResponse(**cover_letter.model_dump(), fallback=True)
+    
+    await token_usage_service.record_usage(db, request.user_id, usage)
+    try:
+        variants = [variant for variant in CoverLetterVariants.model_validate_json(text).variants if variant.content.strip()]
+    except ValidationError as e:
+        logger.error(f"Model returned malformed cover letter variants: {str(e)}")
+        variants = []
+    
+    # Structured output does not bound the letter's length, so unusable variants are dropped
+    cover_letters_data = []
+    for variant in variants:
+        try:
+            cover_letters_data.append(
+                _build_cover_letter_create(request, variant.content.strip(), emphasis=variant.emphasis)
             )
+        except ValidationError:
+            logger.warning(f"Dropped a cover letter variant for user {request.user_id} that is longer than allowed")
+    cover_letters_data = cover_letters_data[:request.variants]
+    if not cover_letters_data:
+        raise HTTPException(status_code=502, detail="The model did not return any usable cover letter variants")
+    
+    logger.info(
+        f"Generated {len(cover_letters_data)} cover letter variants for user {request.user_id} "
+        f"({usage.prompt_tokens} prompt + {usage.output_tokens} output tokens)"
+    )
+    cover_letters = await create_cover_letters(
+        db, 
+        cover_letters_data, 
+        usages=_split_usage(usage, len(cover_letters_data))
+    )
+    return CoverLetterGenerateResponse(**cover_letters[0].model_dump(), alternatives=cover_letters[1:])
+
+
+def _split_usage(usage: TokenUsage, parts: int) -> List[TokenUsage]:
+    """Share one call's tokens across the letters it produced; the first takes any remainder"""
+    shares = [
+        TokenUsage(prompt_tokens=usage.prompt_tokens // parts, output_tokens=usage.output_tokens // parts)
+        for _ in range(parts)
+    ]
+    shares[0].prompt_tokens += usage.prompt_tokens % parts
+    shares[0].output_tokens += usage.output_tokens % parts
+    return shares
+
 
-        client = genai.Client(api_key=settings.google_api_key)
+async def refine_cover_letter(
+    db: AsyncSession,
+    cover_letter: CoverLetterResponse,
+    request: CoverLetterRefine,
+    settings: Settings,
+    llm_client: LLMClient
+) -> CoverLetterRefineResponse:
+    """Revise a saved letter's content by an instruction and update it in place.
+    
+    Only the current content, the position and the instruction are sent, never the
+    CV or job description. Identical refinements are served from the generation cache.
+    """
+    if not cover_letter.content:
+        raise HTTPException(status_code=400, detail="Cover letter has no content to refine")
+    
+    logger.info(f"Refining cover letter {cover_letter.id} for user {cover_letter.user_id}")
+    company_part = f" at {cover_letter.company_name}" if cover_letter.company_name else ""
+    prompt = REFINE_PROMPT_TEMPLATE.format(
+        position=f"{cover_letter.job_title or 'the position'}{company_part}",
+        instruction=request.instruction,
+        content=cover_letter.content
+    )
+    # Only the letter is sent, so route on its length rather than the job description's
+    model = llm_client.route_model(cover_letter.content)
+    cache_key = generation_cache_service.build_refinement_key(
+        cover_letter.content, request.instruction, REFINE_PROMPT_TEMPLATE, model
+    )
+    
+    content = None
+    if not request.force_regenerate:
+        content = await generation_cache_service.get_cached_content(db, cache_key, settings)
+    cached = content is not None
+    
+    if not cached:
+        await token_usage_service.ensure_within_quota(db, cover_letter.user_id, settings)
+        _ensure_api_key(settings)
         
-        # Generate content using the client's models.generate_content method
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt
-        )
+        # End the read transaction so the pooled connection is not held through the model call
+        await db.commit()
+        
+        usage = TokenUsage()
+        
+        async def refine_and_store() -> str:
+            content = await llm_client.generate(prompt, model=model, user_id=cover_letter.user_id, usage=usage)
+            logger.info(
+                f"Refined cover letter {cover_letter.id} "
+                f"({usage.prompt_tokens} prompt + {usage.output_tokens} output tokens)"
+            )
+            await _store_and_record_usage(cache_key, model, content, cover_letter.user_id, usage, settings)
+            return content
         
-        return response.text.strip()
+        try:
+            content, _ = await _generate_single_flight(cache_key, refine_and_store)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to refine cover letter {cover_letter.id}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to refine cover letter: {str(e)}")
+    
+    try:
+        cover_letter_update = CoverLetterUpdate(content=content)
+    except ValidationError:
+        raise HTTPException(status_code=502, detail="The refined cover letter is longer than allowed")
+    
+    updated = await update_cover_letter(db, cover_letter.id, cover_letter_update)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Cover letter not found")
+    return CoverLetterRefineResponse(**updated.model_dump(), cached=cached)
+
+
+async def generate_cover_letters_batch(
+    request: CoverLetterBatchGenerate, 
+    settings: Settings,
+    cv_profile,
+    user,
+    llm_client: LLMClient
+) -> AsyncIterator[str]:
+    """Prepare a batch generation for one user and return its NDJSON result lines"""
+    logger.info(f"Generating {len(request.jobs)} cover letters in batch for user {request.user_id}")
+    
+    if not cv_profile:
+        raise HTTPException(status_code=404, detail="CV profile not found for user")
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    _ensure_api_key(settings)
+    
+    item_requests = [
+        CoverLetterGenerate(user_id=request.user_id, **job.model_dump())
+        for job in request.jobs
+    ]
+    return _generate_batch_lines(cv_profile, item_requests, settings, llm_client)
+
+
+async def _generate_batch_lines(
+    cv_profile,
+    item_requests: List[CoverLetterGenerate],
+    settings: Settings,
+    llm_client: LLMClient
+) -> AsyncIterator[str]:
+    """Fan out generations under a concurrency limit, then insert all letters at once"""
+    semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+    
+    async def generate_item(index: int, item_request: CoverLetterGenerate):
+        async with semaphore:
+            try:
+                # Only CVs over the prompt budget are trimmed, so most items share the stored summary
+                cv_prompt = get_prompt_summary_for_job(cv_profile, item_request.job_description, settings)
+                # Items run concurrently and a session must not be shared between them
+                async with AsyncSessionLocal() as db:
+                    generated = await _generate_content(
+                        db, cv_profile, cv_prompt, item_request, settings, llm_client
+                    )
+                # Built per item so one unusable letter does not sink the batch insert
+                cover_letter = _build_cover_letter_create(item_request, generated.content)
+                return index, generated, cover_letter, None
+            except ValidationError:
+                return index, None, None, "The generated cover letter is longer than allowed"
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                return index, None, None, detail
+    
+    tasks = [
+        asyncio.create_task(generate_item(index, item_request))
+        for index, item_request in enumerate(item_requests)
+    ]
+    generated = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, generated_content, cover_letter, error = await next_done
+            if error is not None:
+                yield _format_ndjson_line({"index": index, "status": "error", "error": error})
+                continue
+            
+            generated.append((index, cover_letter, generated_content.usage))
+            yield _format_ndjson_line({
+                "index": index, 
+                "status": "generated", 
+                "cached": generated_content.cached, 
+                "coalesced": generated_content.coalesced,
+                "fallback": generated_content.fallback,
+                "content": generated_content.content
+            })
         
+        # The request's session is released once the response starts streaming
+        async with AsyncSessionLocal() as db:
+            created = await create_cover_letters(
+                db, 
+                [cover_letter for _, cover_letter, _ in generated], 
+                usages=[usage for _, _, usage in generated]
+            )
+        logger.info(f"Saved {len(created)} of {len(item_requests)} batch cover letters")
+        yield _format_ndjson_line({
+            "status": "complete",
+            "succeeded": len(created),
+            "failed": len(item_requests) - len(created),
+            "cover_letters": [
+                {"index": index, "id": cover_letter.id}
+                for (index, _, _), cover_letter in zip(generated, created)
+            ]
+        })
     except Exception as e:
-        logger.error(f"Error generating content with Gemini: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to generate cover letter content: {str(e)}"
-        )
+        logger.error(f"Failed to save batch cover letters: {str(e)}")
+        yield _format_ndjson_line({"status": "error", "error": f"Failed to save cover letters: {str(e)}"})
+    finally:
+        # Stop outstanding model calls if the client goes away mid-batch
+        for task in tasks:
+            task.cancel()
 
 
-def _format_cv_for_prompt(cv_profile) -> str:
-    """Format CV profile data for the LLM prompt"""
-    cv_parts = []
+async def _generate_content(
+    db: AsyncSession,
+    cv_profile,
+    cv_prompt: CVPromptSummary,
+    request: CoverLetterGenerate,
+    settings: Settings,
+    llm_client: LLMClient
+) -> GeneratedContent:
+    """Get letter content from the cache, a (possibly shared) model call or, when the
+    model is unavailable and the request allows it, the local template fallback"""
+    cache_key = _build_generation_key(cv_prompt.hash, request, settings, llm_client)
     
-    # Basic info
-    if hasattr(cv_profile, 'full_name') and cv_profile.full_name:
-        cv_parts.append(f"Name: {cv_profile.full_name}")
+    async with _generation_db_slot(settings):
+        content = await _get_cached_content(db, cache_key, request, settings)
+        if content is not None:
+            logger.info(f"Serving cached cover letter content for user {request.user_id}")
+            return GeneratedContent(content, cached=True)
+        
+        await token_usage_service.ensure_within_quota(db, request.user_id, settings)
+        
+        # End the read transaction so the pooled connection is not held through the model call
+        await db.commit()
     
-    if hasattr(cv_profile, 'email') and cv_profile.email:
-        cv_parts.append(f"Email: {cv_profile.email}")
+    usage = TokenUsage()
     
-    if hasattr(cv_profile, 'phone') and cv_profile.phone:
-        cv_parts.append(f"Phone: {cv_profile.phone}")
+    async def generate_and_store() -> str:
+        content = await generate_cover_letter_content(
+            cv_profile, request, settings, llm_client, cv_summary=cv_prompt.text, usage=usage
+        )
+        logger.info(
+            f"Successfully generated cover letter content for user {request.user_id} "
+            f"({usage.prompt_tokens} prompt + {usage.output_tokens} output tokens)"
+        )
+        await _store_and_record_usage(
+            cache_key, llm_client.route_model(request.job_description), content, request.user_id, usage, settings
+        )
+        return content
     
-    # Professional summary
-    if hasattr(cv_profile, 'summary') and cv_profile.summary:
-        cv_parts.append(f"Professional Summary: {cv_profile.summary}")
+    try:
+        content, coalesced = await _generate_single_flight(cache_key, generate_and_store)
+    except CircuitOpenError:
+        if not request.allow_fallback:
+            raise
+        logger.warning(f"LLM circuit open; serving template cover letter for user {request.user_id}")
+        return GeneratedContent(_build_fallback_letter(cv_profile, request), fallback=True)
     
-    # Skills
-    if hasattr(cv_profile, 'skills') and cv_profile.skills:
-        skills_text = _format_skills_for_prompt(cv_profile.skills)
-        if skills_text:
-            cv_parts.append(f"Skills: {skills_text}")
+    if coalesced:
+        # The call that produced the content was made (and charged) by another request
+        logger.info(f"Coalesced cover letter generation for user {request.user_id}")
+        return GeneratedContent(content, coalesced=True)
     
-    # Experience
-    if hasattr(cv_profile, 'experience') and cv_profile.experience:
-        experience_text = _format_experience_for_prompt(cv_profile.experience)
-        if experience_text:
-            cv_parts.append(f"Work Experience: {experience_text}")
+    return GeneratedContent(content, usage=usage)
 
-    if hasattr(cv_profile, 'projects') and cv_profile.projects:
-        projects_text = _format_projects_for_prompt(cv_profile.projects)
-        if projects_text:
-            cv_parts.append(f"Projects: {projects_text}")
+
+async def _store_and_record_usage(
+    cache_key: str, 
+    model: str, 
+    content: str, 
+    user_id: int, 
+    usage: TokenUsage, 
+    settings: Settings
+) -> None:
+    """Cache a model call's content and charge its tokens to the user.
     
-    # Education
-    if hasattr(cv_profile, 'education') and cv_profile.education:
-        education_text = _format_education_for_prompt(cv_profile.education)
-        if education_text:
-            cv_parts.append(f"Education: {education_text}")
+    This runs inside the shared single-flight call on a session of its own, so the
+    result is cached and charged even if the request that started the call goes away.
+    """
+    async with _generation_db_slot(settings):
+        async with AsyncSessionLocal() as db:
+            await generation_cache_service.store_content(db, cache_key, model, content, settings)
+            await token_usage_service.record_usage(db, user_id, usage)
+
+
+@asynccontextmanager
+async def _generation_db_slot(settings: Settings):
+    """Hold one of the `generation_db_concurrency` slots for a generation's database work.
     
-    return "\n".join(cv_parts)
+    Without a bound, many concurrent generations queue enough database work to starve
+    the reads served alongside them; callers past the limit wait here instead.
+    """
+    global _generation_db_slots
+    if settings.generation_db_concurrency <= 0:
+        yield
+        return
+    loop = asyncio.get_running_loop()
+    if _generation_db_slots is None or _generation_db_slots[0] is not loop:
+        _generation_db_slots = (loop, asyncio.Semaphore(settings.generation_db_concurrency))
+    async with _generation_db_slots[1]:
+        yield
 
 
-def _format_skills_for_prompt(skills_data: List[dict]) -> str:
-    """Format skills data for the prompt"""
-    if not skills_data:
-        return ""
+async def stream_cover_letter(
+    db: AsyncSession,
+    request: CoverLetterGenerate, 
+    settings: Settings,
+    cv_profile,
+    user,
+    llm_client: LLMClient
+) -> AsyncIterator[str]:
+    """Prepare a streamed cover letter generation and return its Server-Sent Events"""
+    logger.info(f"Streaming cover letter for user {request.user_id}")
     
-    skills_by_category = {}
-    for skill in skills_data:
-        if isinstance(skill, dict):
-            category = skill.get('category', 'General')
-            if category not in skills_by_category:
-                skills_by_category[category] = []
-            
-            skill_name = skill.get('name', '')
-            proficiency = skill.get('proficiency', '')
-            if proficiency:
-                skill_name += f" ({proficiency})"
-            skills_by_category[category].append(skill_name)
-    
-    formatted_skills = []
-    for category, category_skills in skills_by_category.items():
-        if category_skills:
-            skills_list = ", ".join(category_skills)
-            formatted_skills.append(f"{category}: {skills_list}")
-    
-    return "; ".join(formatted_skills)
-
-
-def _format_experience_for_prompt(experience_data: List[dict]) -> str:
-    """Format experience data for the prompt"""
-    if not experience_data:
-        return ""
-    
-    formatted_experience = []
-    for exp in experience_data:
-        if isinstance(exp, dict):
-            title = exp.get('title', '')
-            company = exp.get('company', '')
-            start_date = exp.get('start_date', '')
-            end_date = exp.get('end_date', 'Present')
-            description = exp.get('description', '')
-            
-            exp_parts = []
-            if title:
-                exp_parts.append(title)
-            if company:
-                exp_parts.append(f"at {company}")
-            if start_date:
-                exp_parts.append(f"({start_date} - {end_date})")
-            if description:
-                exp_parts.append(f"- {description}")
-            
-            if exp_parts:
-                formatted_experience.append(" ".join(exp_parts))
-    
-    return "; ".join(formatted_experience)
-
-
-def _format_projects_for_prompt(projects_data: List[dict]) -> str:
-    """Format projects data for the prompt"""
-    if not projects_data:
-        return ""
-    
-    formatted_projects = []
-    for proj in projects_data:
-        if isinstance(proj, dict):
-            name = proj.get('name', '')
-            description = proj.get('description', '')
-            technologies = proj.get('technologies', '')
-
-            proj_parts = []
-            if name:
-                proj_parts.append(name)
-            if description:
-                proj_parts.append(f"- {description}")
-            if technologies:
-                proj_parts.append(f"Technologies: {technologies}")
-
-            if proj_parts:
-                formatted_projects.append(" ".join(proj_parts))
-    
-    return "; ".join(formatted_projects)
-
-
-def _format_education_for_prompt(education_data: List[dict]) -> str:
-    """Format education data for the prompt"""
-    if not education_data:
-        return ""
-    
-    formatted_education = []
-    for edu in education_data:
-        if isinstance(edu, dict):
-            degree = edu.get('degree', '')
-            institution = edu.get('institution', '')
-            end_date = edu.get('end_date', '')
-            grade = edu.get('grade', '')
-            
-            edu_parts = []
-            if degree:
-                edu_parts.append(degree)
-            if institution:
-                edu_parts.append(f"from {institution}")
-            if end_date:
-                edu_parts.append(f"({end_date})")
-            if grade:
-                edu_parts.append(f"Grade: {grade}")
-            
-            if edu_parts:
-                formatted_education.append(" ".join(edu_parts))
+    if not cv_profile:
+        raise HTTPException(status_code=404, detail="CV profile not found for user")
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    if request.variants > 1:
+        raise HTTPException(status_code=400, detail="Streaming generates a single letter; request variants without streaming")
+    
+    _ensure_api_key(settings)
+    
+    # Build the prompt while the request-scoped CV profile is still attached
+    cv_prompt = get_prompt_summary_for_job(cv_profile, request.job_description, settings)
+    prompt = _build_cover_letter_prompt(cv_prompt.text, request, settings.llm_prompt_token_budget)
+    cache_key = _build_generation_key(cv_prompt.hash, request, settings, llm_client)
+    
+    ready_content = None
+    cached_content = await _get_cached_content(db, cache_key, request, settings)
+    if cached_content is not None:
+        ready_content = GeneratedContent(cached_content, cached=True)
+    else:
+        # Fail (or fall back) before the stream starts while a proper status can still be sent
+        try:
+            llm_client.breaker.check()
+        except CircuitOpenError:
+            if not request.allow_fallback:
+                raise
+            ready_content = GeneratedContent(_build_fallback_letter(cv_profile, request), fallback=True)
     
-    return "; ".join(formatted_education)
+    if ready_content is None:
+        await token_usage_service.ensure_within_quota(db, request.user_id, settings)
+    
+    return _stream_cover_letter_events(
+        prompt, request, settings, llm_client, cache_key, ready_content
+    )
+
+
+async def _stream_cover_letter_events(
+    prompt: str, 
+    request: CoverLetterGenerate, 
+    settings: Settings,
+    llm_client: LLMClient,
+    cache_key: str,
+    ready_content: Optional[GeneratedContent]
+) -> AsyncIterator[str]:
+    """Yield token events as they arrive, then persist the letter and yield a done event"""
+    chunks = []
+    usage = TokenUsage()
+    try:
+        if ready_content is not None:
+            chunks.append(ready_content.content)
+            yield _format_sse_event("token", {"text": ready_content.content})
+        else:
+            model = llm_client.route_model(request.job_description)
+            async for chunk in llm_client.stream(prompt, model=model, user_id=request.user_id, usage=usage):
+                chunks.append(chunk)
+                yield _format_sse_event("token", {"text": chunk})
+        
+        content = "".join(chunks).strip()
+        
+        # The request's session is released once the response starts streaming,
+        # so the final row is written with a session owned by the stream
+        async with AsyncSessionLocal() as db:
+            if ready_content is None:
+                await generation_cache_service.store_content(
+                    db, cache_key, llm_client.route_model(request.job_description), content, settings
+                )
+                await token_usage_service.record_usage(db, request.user_id, usage)
+            cover_letter = await create_cover_letter(
+                db, 
+                _build_cover_letter_create(request, content), 
+                usage=usage if ready_content is None else None
+            )
+        
+        logger.info(f"Successfully streamed cover letter {cover_letter.id} for user {request.user_id}")
+        result = CoverLetterGenerateResponse(
+            **cover_letter.model_dump(), 
+            cached=ready_content is not None and ready_content.cached,
+            fallback=ready_content is not None and ready_content.fallback
+        )
+        yield _format_sse_event("done", result.model_dump(mode="json"))
+    except (RateLimitExceeded, CircuitOpenError) as e:
+        # Headers are already sent, so the retry hint travels in the event
+        logger.warning(f"Streamed cover letter rejected for user {request.user_id}: {e.detail}")
+        yield _format_sse_event("error", {"detail": e.detail, "retry_after": e.retry_after})
+    except LLMTimeoutError as e:
+        logger.warning(f"Streamed cover letter timed out for user {request.user_id}")
+        yield _format_sse_event("error", {"detail": e.detail, "status_code": e.status_code})
+    except Exception as e:
+        logger.error(f"Failed to stream cover letter: {str(e)}")
+        yield _format_sse_event("error", {"detail": f"Failed to generate cover letter: {str(e)}"})
+
+
+async def _generate_single_flight(
+    key: str, 
+    generate: Callable[[], Awaitable[str]]
+) -> Tuple[str, bool]:
+    """Run one model call per key; concurrent callers with the same key share its result.
+    
+    Returns the content and whether this caller joined an existing call.
+    """
+    task = _inflight_generations.get(key)
+    if task is not None:
+        # Shield so a disconnecting caller does not cancel the call for the others
+        return await asyncio.shield(task), True
+    
+    task = asyncio.ensure_future(generate())
+    _inflight_generations[key] = task
+    task.add_done_callback(lambda _: _inflight_generations.pop(key, None))
+    return await asyncio.shield(task), False
+
+
+def _build_generation_key(
+    cv_summary_hash: str, 
+    request: CoverLetterGenerate, 
+    settings: Settings, 
+    llm_client: LLMClient
+) -> str:
+    """Build the generation cache key for a request from the CV profile's stored summary hash"""
+    return generation_cache_service.build_generation_key(
+        cv_summary_hash=cv_summary_hash,
+        request=request,
+        prompt_template=COVER_LETTER_PROMPT_TEMPLATE,
+        model=llm_client.route_model(request.job_description),
+        settings=settings
+    )
+
+
+async def _get_cached_content(
+    db: AsyncSession, 
+    cache_key: str, 
+    request: CoverLetterGenerate, 
+    settings: Settings
+) -> Optional[str]:
+    """Look up cached content unless the request forces regeneration"""
+    if request.force_regenerate:
+        return None
+    return await generation_cache_service.get_cached_content(db, cache_key, settings)
+
+
+def _format_sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _format_ndjson_line(data: dict) -> str:
+    """Format a newline-delimited JSON record"""
+    return json.dumps(data) + "\n"
+
+
+def _build_cover_letter_create(
+    request: CoverLetterGenerate, 
+    content: str, 
+    emphasis: Optional[str] = None
+) -> CoverLetterCreate:
+    """Build the cover letter record for generated content, labelling a variant's title with its emphasis"""
+    title = f"Cover Letter for {request.job_title or 'Position'}" + (f" at {request.company_name}" if request.company_name else "")
+    if emphasis and emphasis.strip():
+        title = f"{title[:150]} ({emphasis.strip()[:40]})"
+    return CoverLetterCreate(
+        user_id=request.user_id,
+        job_title=request.job_title,
+        company_name=request.company_name,
+        job_description=request.job_description,
+        content=content,
+        title=title
+    )
 
 
-def _build_cover_letter_prompt(cv_summary: str, request: CoverLetterGenerate) -> str:
-    """Build the prompt for the LLM to generate the cover letter"""
+def _build_fallback_letter(cv_profile, request: CoverLetterGenerate) -> str:
+    """Build a plain template letter from the CV and job fields without calling the model"""
     company_part = f" at {request.company_name}" if request.company_name else ""
-    position_part = request.job_title or "the position"
+    paragraphs = [
+        "Dear Hiring Manager,",
+        f"I am writing to apply for the {request.job_title} position{company_part}."
+    ]
     
-    prompt = f"""Generate a professional cover letter based on the following CV and job description. 
-The cover letter must be less than 120 words and should be personalized, engaging, and highlight the most relevant qualifications.
+    experience = [exp for exp in (cv_profile.experience or []) if isinstance(exp, dict) and exp.get('title')]
+    if experience:
+        latest = experience[0]
+        company = f" at {latest['company']}" if latest.get('company') else ""
+        paragraphs[-1] += f" In my current role as {latest['title']}{company}, I have built experience directly relevant to this role."
+    
+    skills = [skill.get('name') for skill in (cv_profile.skills or []) if isinstance(skill, dict) and skill.get('name')]
+    if skills:
+        paragraphs.append(f"My skills in {', '.join(skills[:5])} would allow me to contribute from day one.")
+    
+    paragraphs.append("I would welcome the opportunity to discuss how I can help your team succeed.")
+    paragraphs.append(f"Sincerely,\n{cv_profile.full_name}" if cv_profile.full_name else "Sincerely")
+    return "\n\n".join(paragraphs)
 
-CV INFORMATION:
-{cv_summary}
 
-JOB DETAILS:
-Position: {position_part}{company_part}
-Job Description: {request.job_description}
+def _ensure_api_key(settings: Settings) -> None:
+    """Ensure the API key is configured before attempting to call Gemini"""
+    if settings.llm_provider == "gemini" and not settings.google_api_key:
+        logger.error("Google API key is missing; cannot generate cover letter content")
+        raise HTTPException(
+            status_code=500,
+            detail="Google API key is not configured on the server."
+        )
 
-REQUIREMENTS:
-- Maximum 120 words
-- Professional tone
-- Highlight most relevant skills and experience from the CV
-- Address the specific job requirements mentioned in the job description
-- Include a proper greeting and closing
-- Be concise but impactful
-- Focus on value proposition for the employer
 
-Generate the cover letter now:"""
+async def generate_cover_letter_content(
+    cv_profile, 
+    request: CoverLetterGenerate, 
+    settings: Settings,
+    llm_client: LLMClient,
+    cv_summary: Optional[str] = None,
+    usage: Optional[TokenUsage] = None
+) -> str:
+    """Generate cover letter content with the configured LLM provider, filling `usage` if given"""
+    try:
+        if cv_summary is None:
+            cv_summary = get_prompt_summary_for_job(cv_profile, request.job_description, settings).text
+        
+        prompt = _build_cover_letter_prompt(cv_summary, request, settings.llm_prompt_token_budget)
+
+        _ensure_api_key(settings)
+
+        # The shared client is async, so the event loop keeps serving other
+        # requests while the model call is in flight
+        return await llm_client.generate(
+            prompt, 
+            model=llm_client.route_model(request.job_description), 
+            user_id=request.user_id, 
+            usage=usage
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating content with the LLM: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate cover letter content: {str(e)}"
+        )
+
+
+def _build_cover_letter_prompt(cv_summary: str, request: CoverLetterGenerate, token_budget: int = 0) -> str:
+    """Build the prompt for the LLM to generate the cover letter.
     
-    return prompt
+    With a `token_budget`, a prompt estimated to be larger has its whitespace
+    compacted and then the job description and CV cut to fit. The job description
+    keeps whatever the CV leaves, but at least half of the room.
+    """
+    company_part = f" at {request.company_name}" if request.company_name else ""
+    position_part = request.job_title or "the position"
+    position = f"{position_part}{company_part}"
+    job_description = request.job_description
+    
+    prompt = COVER_LETTER_PROMPT_TEMPLATE.format(
+        cv_summary=cv_summary,
+        position=position,
+        job_description=job_description
+    )
+    if not token_budget or estimate_tokens(prompt) <= token_budget:
+        return prompt
+    
+    fixed_tokens = estimate_tokens(COVER_LETTER_PROMPT_TEMPLATE.format(cv_summary="", position=position, job_description=""))
+    available = max(0, token_budget - fixed_tokens)
+    cv_summary = compact_whitespace(cv_summary)
+    job_description = " ".join(job_description.split())
+    if estimate_tokens(cv_summary) + estimate_tokens(job_description) > available:
+        job_description = truncate_to_tokens(job_description, max(available - estimate_tokens(cv_summary), available // 2))
+        cv_summary = truncate_to_tokens(cv_summary, available - estimate_tokens(job_description))
+    
+    logger.info(f"Compacted a {estimate_tokens(prompt)}-token prompt to fit the {token_budget}-token budget")
+    return COVER_LETTER_PROMPT_TEMPLATE.format(
+        cv_summary=cv_summary,
+        position=position,
+        job_description=job_description
+    )
 
 
-def get_cover_letter(db: Session, cover_letter_id: int) -> Optional[CoverLetterResponse]:
+async def get_cover_letter(db: AsyncSession, cover_letter_id: int) -> Optional[CoverLetterResponse]:
     """Get cover letter by ID"""
-    db_cover_letter = db.query(CoverLetter).filter(CoverLetter.id == cover_letter_id).first()
+    db_cover_letter = await db.get(CoverLetter, cover_letter_id)
     if db_cover_letter:
         return CoverLetterResponse.model_validate(db_cover_letter)
     return None
 
 
-def get_cover_letters_by_user(db: Session, user_id: int) -> CoverLetterListResponse:
-    """Get cover letters by user ID with default limit"""
-    cover_letters = (
-        db.query(CoverLetter)
-        .filter(CoverLetter.user_id == user_id)
-        .order_by(CoverLetter.created_at.desc())
-        .limit(50)
-        .all()
+async def get_cover_letters_by_user(
+    db: AsyncSession, 
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    company: Optional[str] = None,
+    job_title: Optional[str] = None,
+    count_cap: Optional[int] = None,
+    view: str = "full",
+    snippet_length: int = 0
+) -> CoverLetterListResponse:
+    """Get a page of a user's cover letters, newest first.
+    
+    Pages are keyset-paginated on (created_at, id), so deep pages cost the same as
+    the first. The total is exact unless `count_cap` is given, in which case
+    counting stops after that many rows. The summary view loads only the list
+    columns, plus the first `snippet_length` characters of the letter if asked.
+    """
+    filters = [CoverLetter.user_id == user_id]
+    if company:
+        filters.append(CoverLetter.company_name.ilike(f"%{company}%"))
+    if job_title:
+        filters.append(CoverLetter.job_title.ilike(f"%{job_title}%"))
+    
+    summary = view == "summary"
+    # The cursor keeps created_at as stored, so it compares exactly like the column does
+    columns = [CoverLetter, cast(CoverLetter.created_at, String).label("stored_created_at")]
+    if summary and snippet_length:
+        # One character past the limit tells whether the snippet was truncated
+        columns.append(func.substr(CoverLetter.content, 1, snippet_length + 1).label("snippet"))
+    
+    query = select(*columns).where(*filters)
+    if summary:
+        query = query.options(load_only(*SUMMARY_COLUMNS), noload(CoverLetter.job_posting))
+    if cursor:
+        query = query.where(_after_cursor(cursor, db.bind.dialect.name))
+    
+    # One extra row tells whether there is a next page
+    result = await db.execute(
+        query
+        .order_by(CoverLetter.created_at.desc(), CoverLetter.id.desc())
+        .limit(limit + 1)
     )
+    rows = result.all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1])
+    
+    if summary:
+        items = [_build_summary(row, snippet_length) for row in rows]
+    else:
+        items = [CoverLetterResponse.model_validate(row[0]) for row in rows]
+    
+    total, total_is_exact = await _count_cover_letters(db, filters, count_cap)
     return CoverLetterListResponse(
-        total=len(cover_letters),
-        items=[CoverLetterResponse.model_validate(cl) for cl in cover_letters]
+        total=total,
+        total_is_exact=total_is_exact,
+        next_cursor=next_cursor,
+        items=items
+    )
+
+
+def _build_summary(row, snippet_length: int) -> CoverLetterSummary:
+    """Build a summary list item, marking snippets that were cut short"""
+    item = CoverLetterSummary.model_validate(row[0])
+    snippet = getattr(row, "snippet", None)
+    if snippet:
+        item.snippet = snippet[:snippet_length] + "…" if len(snippet) > snippet_length else snippet
+    return item
+
+
+async def _count_cover_letters(db: AsyncSession, filters: list, count_cap: Optional[int]) -> Tuple[int, bool]:
+    """Count matching cover letters, stopping after `count_cap` rows when given"""
+    if count_cap is None:
+        total = await db.scalar(select(func.count()).select_from(CoverLetter).where(*filters))
+        return total, True
+    
+    capped = select(CoverLetter.id).where(*filters).limit(count_cap + 1).subquery()
+    total = await db.scalar(select(func.count()).select_from(capped))
+    return min(total, count_cap), total <= count_cap
+
+
+def _encode_cursor(row) -> str:
+    """Encode the position of the last letter on a page as an opaque cursor"""
+    payload = json.dumps({"created_at": row.stored_created_at, "id": row[0].id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _after_cursor(cursor: str, dialect: str):
+    """Build the keyset condition selecting letters that come after a cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        stored_created_at = payload["created_at"]
+        datetime.fromisoformat(stored_created_at)
+        cover_letter_id = int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Compare against the cursor row's stored timestamp so ties on created_at split exactly;
+    # the encoded timestamp is only used if that row has since been deleted
+    anchor_created_at = (
+        select(CoverLetter.created_at)
+        .where(CoverLetter.id == cover_letter_id)
+        .scalar_subquery()
+    )
+    # SQLite keeps timestamps as text, in whichever format wrote them ("12:00:00" from
+    # the server default, "12:00:00.000000" from Python), so the stored text is compared as is
+    fallback_created_at = literal(stored_created_at, String)
+    if dialect != "sqlite":
+        fallback_created_at = cast(fallback_created_at, CoverLetter.created_at.type)
+    return tuple_(CoverLetter.created_at, CoverLetter.id) < tuple_(
+        func.coalesce(anchor_created_at, fallback_created_at), 
+        cover_letter_id
+    )
+
+
+async def search_cover_letters(
+    db: AsyncSession,
+    user_id: int,
+    query: str,
+    limit: int,
+    offset: int = 0,
+    count_cap: Optional[int] = None
+) -> CoverLetterSearchResponse:
+    """Full-text search over a user's cover letters, best matches first.
+    
+    Every word in the query must appear in the letter (after stemming, so "roles"
+    finds "role"); punctuation and search operators are ignored. Letters score
+    by the fields their words appear in (title highest, content lowest), and
+    ties go to the newest letter.
+    """
+    if db.bind.dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Cover letter search requires SQLite full-text search")
+    
+    words = re.findall(r"\w+", query)
+    if not words:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    
+    # Every clause starts with the owner token, so the index only walks this user's
+    # letters; bm25() is avoided because it scans every letter containing a word
+    owner = f'owner:"u{user_id}"'
+    all_words = " ".join(f'"{word}"' for word in words)
+    any_word = " OR ".join(f'"{word}"' for word in words)
+    params = {"match": f"{owner} AND {{{' '.join(SEARCH_WEIGHTS)}}}: ({all_words})"}
+    field_scores = []
+    for name, weight in SEARCH_WEIGHTS.items():
+        params[f"match_{name}"] = f"{owner} AND {name}: ({any_word})"
+        field_scores.append(
+            f"{weight} * (rowid IN (SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match_{name}))"
+        )
+    
+    result = await db.execute(
+        text(
+            f"SELECT rowid AS id, {' + '.join(field_scores)} AS score FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH :match ORDER BY score DESC, rowid DESC LIMIT :limit OFFSET :offset"
+        ).execution_options(read_only=True),
+        {**params, "limit": limit + 1, "offset": offset}
+    )
+    ranked = result.all()
+    
+    next_offset = None
+    if len(ranked) > limit:
+        ranked = ranked[:limit]
+        next_offset = offset + limit
+    
+    items = []
+    if ranked:
+        # Highlight only the letters on this page
+        fts = table(SEARCH_TABLE, column("rowid"))
+        fts_ref = literal_column(SEARCH_TABLE)
+        highlights = [
+            func.highlight(fts_ref, SEARCH_COLUMNS.index(name), *HIGHLIGHT_MARKS).label(name)
+            for name in ("title", "job_title", "company_name")
+        ] + [
+            func.snippet(fts_ref, SEARCH_COLUMNS.index(name), *HIGHLIGHT_MARKS, "…", SEARCH_SNIPPET_TOKENS).label(name)
+            for name in ("job_description", "content")
+        ]
+        result = await db.execute(
+            select(CoverLetter, *highlights)
+            .options(load_only(*SUMMARY_COLUMNS), noload(CoverLetter.job_posting))
+            .join(fts, fts.c.rowid == CoverLetter.id)
+            .where(fts_ref.match(params["match"]), CoverLetter.id.in_([row.id for row in ranked]))
+        )
+        rows = {row[0].id: row for row in result.all()}
+        items = [_build_search_hit(rows[hit.id], hit.score) for hit in ranked if hit.id in rows]
+    
+    count_query = f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"
+    if count_cap is not None:
+        count_query += f" LIMIT {count_cap + 1}"
+    total = await db.scalar(
+        text(f"SELECT count(*) FROM ({count_query})").execution_options(read_only=True),
+        {"match": params["match"]}
+    )
+    
+    return CoverLetterSearchResponse(
+        query=query,
+        total=total if count_cap is None else min(total, count_cap),
+        total_is_exact=count_cap is None or total <= count_cap,
+        next_offset=next_offset,
+        items=items
+    )
+
+
+def _build_search_hit(row, score: float) -> CoverLetterSearchHit:
+    """Build a search result, keeping highlights only for the fields that matched"""
+    highlights = {}
+    for name in SEARCH_WEIGHTS:
+        value = getattr(row, name)
+        if value and HIGHLIGHT_MARKS[0] in value:
+            highlights[name] = value
+    
+    return CoverLetterSearchHit(
+        **CoverLetterSummary.model_validate(row[0]).model_dump(exclude={"snippet"}),
+        score=score,
+        highlights=highlights
     )
 
 
-def create_cover_letter(db: Session, cover_letter: CoverLetterCreate) -> CoverLetterResponse:
-    """Create a new cover letter"""
-    db_cover_letter = CoverLetter(**cover_letter.model_dump())
+async def create_cover_letter(
+    db: AsyncSession, 
+    cover_letter: CoverLetterCreate, 
+    usage: Optional[TokenUsage] = None
+) -> CoverLetterResponse:
+    """Create a new cover letter, with the tokens of the model call that wrote it if any"""
+    data = cover_letter.model_dump()
+    [job_posting] = await job_posting_service.get_or_create_job_postings(db, [data.pop("job_description")])
+    db_cover_letter = CoverLetter(**data, **_usage_columns(usage), job_posting=job_posting)
     db.add(db_cover_letter)
-    db.commit()
-    db.refresh(db_cover_letter)
+    await db.commit()
+    await db.refresh(db_cover_letter)
     return CoverLetterResponse.model_validate(db_cover_letter)
 
 
-def update_cover_letter(
-    db: Session, 
+async def create_cover_letters(
+    db: AsyncSession, 
+    cover_letters: List[CoverLetterCreate], 
+    usages: Optional[List[Optional[TokenUsage]]] = None
+) -> List[CoverLetterResponse]:
+    """Create many cover letters with a single bulk INSERT in one transaction"""
+    if not cover_letters:
+        return []
+    
+    usages = usages or [None] * len(cover_letters)
+    job_postings = await job_posting_service.get_or_create_job_postings(
+        db, [cover_letter.job_description for cover_letter in cover_letters]
+    )
+    result = await db.scalars(
+        insert(CoverLetter).returning(CoverLetter, sort_by_parameter_order=True),
+        [
+            {
+                **cover_letter.model_dump(exclude={"job_description"}), 
+                **_usage_columns(usage), 
+                "job_posting_id": job_posting.id
+            }
+            for cover_letter, job_posting, usage in zip(cover_letters, job_postings, usages)
+        ]
+    )
+    created = []
+    for cl, job_posting in zip(result.all(), job_postings):
+        # RETURNING fills columns only; attach the posting already in hand
+        set_committed_value(cl, "job_posting", job_posting)
+        created.append(CoverLetterResponse.model_validate(cl))
+    await db.commit()
+    return created
+
+
+def _usage_columns(usage: Optional[TokenUsage]) -> dict:
+    """Token columns of a letter; every row of a bulk INSERT needs the same keys"""
+    return {
+        "prompt_tokens": usage.prompt_tokens if usage else None,
+        "output_tokens": usage.output_tokens if usage else None,
+    }
+
+
+async def update_cover_letter(
+    db: AsyncSession, 
     cover_letter_id: int, 
     cover_letter_update: CoverLetterUpdate
 ) -> Optional[CoverLetterResponse]:
     """Update an existing cover letter"""
-    db_cover_letter = db.query(CoverLetter).filter(CoverLetter.id == cover_letter_id).first()
+    db_cover_letter = await db.get(CoverLetter, cover_letter_id)
     if db_cover_letter:
         update_data = cover_letter_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_cover_letter, field, value)
-        db.commit()
-        db.refresh(db_cover_letter)
+        await db.commit()
+        await db.refresh(db_cover_letter)
         return CoverLetterResponse.model_validate(db_cover_letter)
     return None
 
 
-def delete_cover_letter(db: Session, cover_letter_id: int) -> bool:
+async def delete_cover_letter(db: AsyncSession, cover_letter_id: int) -> bool:
     """Delete a cover letter"""
-    db_cover_letter = db.query(CoverLetter).filter(CoverLetter.id == cover_letter_id).first()
+    db_cover_letter = await db.get(CoverLetter, cover_letter_id)
     if db_cover_letter:
-        db.delete(db_cover_letter)
-        db.commit()
+        await db.delete(db_cover_letter)
+        await db.commit()
         return True
     return False
\ No newline at end of file
@@ -0,0 +1,319 @@
+import math
+import re
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, NamedTuple, Set
+
+from ..core.config import Settings
+from ..core.tokens import estimate_tokens
+from ..models.cv_profile import CVProfile
+from ..services.generation_cache_service import hash_text
+
+# Bump when the formatting below changes so stored summaries are rebuilt
+PROMPT_SUMMARY_VERSION = 1
+
+# CV sections whose entries are ranked against the job and trimmed; the rest is always kept
+TRIMMED_SECTIONS = ("experience", "projects", "skills")
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words too common in CVs and job descriptions to say anything about relevance
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the their this to "
+    "we will with you your".split()
+)
+
+
+class CVPromptSummary(NamedTuple):
+    """CV text used in generation prompts, and its hash for generation cache keys"""
+    text: str
+    hash: str
+
+
+def compile_prompt_summary(cv_profile: CVProfile) -> None:
+    """Format the profile for prompts and store the result on it, before it is saved"""
+    summary = format_cv_for_prompt(cv_profile)
+    cv_profile.prompt_summary = summary
+    cv_profile.prompt_summary_hash = hash_text(summary)
+    cv_profile.prompt_summary_version = PROMPT_SUMMARY_VERSION
+
+
+def get_prompt_summary(cv_profile) -> CVPromptSummary:
+    """Get the stored prompt summary, formatting it again only if it is missing or outdated"""
+    if getattr(cv_profile, "prompt_summary_version", None) == PROMPT_SUMMARY_VERSION:
+        return CVPromptSummary(cv_profile.prompt_summary, cv_profile.prompt_summary_hash)
+    summary = format_cv_for_prompt(cv_profile)
+    return CVPromptSummary(summary, hash_text(summary))
+
+
+def get_prompt_summary_for_job(cv_profile, job_description: str, settings: Settings) -> CVPromptSummary:
+    """Get the CV text for a job's prompt, trimmed to the entries most relevant to the job
+    when the whole CV is over the prompt token budget"""
+    summary = get_prompt_summary(cv_profile)
+    if not settings.cv_trim_enabled or estimate_tokens(summary.text) <= settings.cv_prompt_token_budget:
+        return summary
+    
+    text = trim_cv_for_job(cv_profile, job_description, settings.cv_prompt_token_budget)
+    return CVPromptSummary(text, hash_text(text))
+
+
+def trim_cv_for_job(cv_profile, job_description: str, token_budget: int) -> str:
+    """Format the CV keeping only the experience, project and skill entries that rank
+    highest against the job description and fit within the token budget.
+    
+    Entries are scored with BM25 and added best first; an entry that would overflow
+    the budget is skipped so smaller ones further down can still fit. Contact
+    details, the summary and education are always kept, and kept entries stay in
+    CV order.
+    """
+    entries = [
+        (section, index, item)
+        for section in TRIMMED_SECTIONS
+        for index, item in enumerate(getattr(cv_profile, section, None) or [])
+        if isinstance(item, dict)
+    ]
+    scores = _rank_bm25(
+        _tokenize(job_description), 
+        [_tokenize(_entry_text(item)) for _, _, item in entries]
+    )
+    
+    kept: Dict[str, Set[int]] = {section: set() for section in TRIMMED_SECTIONS}
+    base_lines = format_cv_for_prompt(_with_entries(cv_profile, kept)).splitlines()
+    section_lines = {section: "" for section in TRIMMED_SECTIONS}
+    # The sort is stable, so equally relevant entries are tried in CV order (usually most recent first)
+    for position in sorted(range(len(entries)), key=lambda position: -scores[position]):
+        section, index, _ = entries[position]
+        kept[section].add(index)
+        # Adding an entry only changes its own section's line, so only that line is formatted
+        # again (line order does not matter for the size)
+        line = _format_section_line(section, _kept_entries(cv_profile, section, kept[section]))
+        lines = base_lines + [line] + [
+            other_line for other, other_line in section_lines.items() if other != section and other_line
+        ]
+        if estimate_tokens("\n".join(lines)) <= token_budget:
+            section_lines[section] = line
+        else:
+            kept[section].discard(index)
+    return format_cv_for_prompt(_with_entries(cv_profile, kept))
+
+
+def _rank_bm25(query_terms: List[str], documents: List[List[str]]) -> List[float]:
+    """BM25 score of each tokenized document for the query"""
+    if not documents:
+        return []
+    
+    frequencies = [Counter(document) for document in documents]
+    document_frequency = Counter(term for frequency in frequencies for term in frequency)
+    average_length = sum(len(document) for document in documents) / len(documents) or 1
+    idf = {
+        term: math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+        for term in set(query_terms)
+        if term in document_frequency
+    }
+    
+    scores = []
+    for document, frequency in zip(documents, frequencies):
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(document) / average_length)
+        scores.append(sum(
+            weight * frequency[term] * (BM25_K1 + 1) / (frequency[term] + length_norm)
+            for term, weight in idf.items()
+            if term in frequency
+        ))
+    return scores
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercased words without stopwords, with plural "s" endings removed"""
+    terms = []
+    for word in re.findall(r"\w+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def _entry_text(item: dict) -> str:
+    """All the text of a CV entry, used to score it"""
+    parts = []
+    for value in item.values():
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(str(element) for element in value)
+    return " ".join(parts)
+
+
+def _with_entries(cv_profile, kept: Dict[str, Set[int]]) -> SimpleNamespace:
+    """A view of the profile with only the kept entries of the trimmed sections"""
+    view = {
+        field: getattr(cv_profile, field, None) 
+        for field in ("full_name", "email", "phone", "summary", "education")
+    }
+    for section, indices in kept.items():
+        view[section] = _kept_entries(cv_profile, section, indices)
+    return SimpleNamespace(**view)
+
+
+def _kept_entries(cv_profile, section: str, indices: Set[int]) -> List[dict]:
+    return [item for index, item in enumerate(getattr(cv_profile, section, None) or []) if index in indices]
+
+
+def format_cv_for_prompt(cv_profile) -> str:
+    """Format CV profile data for the LLM prompt"""
+    cv_parts = []
+    
+    # Basic info
+    if hasattr(cv_profile, 'full_name') and cv_profile.full_name:
+        cv_parts.append(f"Name: {cv_profile.full_name}")
+    
+    if hasattr(cv_profile, 'email') and cv_profile.email:
+        cv_parts.append(f"Email: {cv_profile.email}")
+    
+    if hasattr(cv_profile, 'phone') and cv_profile.phone:
+        cv_parts.append(f"Phone: {cv_profile.phone}")
+    
+    # Professional summary
+    if hasattr(cv_profile, 'summary') and cv_profile.summary:
+        cv_parts.append(f"Professional Summary: {cv_profile.summary}")
+    
+    # Skills, experience and projects
+    for section in ("skills", "experience", "projects"):
+        if hasattr(cv_profile, section) and getattr(cv_profile, section):
+            section_line = _format_section_line(section, getattr(cv_profile, section))
+            if section_line:
+                cv_parts.append(section_line)
+    
+    # Education
+    if hasattr(cv_profile, 'education') and cv_profile.education:
+        education_text = _format_education_for_prompt(cv_profile.education)
+        if education_text:
+            cv_parts.append(f"Education: {education_text}")
+    
+    return "\n".join(cv_parts)
+
+
+def _format_section_line(section: str, items: List[dict]) -> str:
+    """Format the prompt line of a skills, experience or projects section ("" when empty)"""
+    label, format_items = {
+        "skills": ("Skills", _format_skills_for_prompt),
+        "experience": ("Work Experience", _format_experience_for_prompt),
+        "projects": ("Projects", _format_projects_for_prompt),
+    }[section]
+    text = format_items(items)
+    return f"{label}: {text}" if text else ""
+
+
+def _format_skills_for_prompt(skills_data: List[dict]) -> str:
+    """Format skills data for the prompt"""
+    if not skills_data:
+        return ""
+    
+    skills_by_category = {}
+    for skill in skills_data:
+        if isinstance(skill, dict):
+            category = skill.get('category', 'General')
+            if category not in skills_by_category:
+                skills_by_category[category] = []
+            
+            skill_name = skill.get('name', '')
+            proficiency = skill.get('proficiency', '')
+            if proficiency:
+                skill_name += f" ({proficiency})"
+            skills_by_category[category].append(skill_name)
+    
+    formatted_skills = []
+    for category, category_skills in skills_by_category.items():
+        if category_skills:
+            skills_list = ", ".join(category_skills)
+            formatted_skills.append(f"{category}: {skills_list}")
+    
+    return "; ".join(formatted_skills)
+
+
+def _format_experience_for_prompt(experience_data: List[dict]) -> str:
+    """Format experience data for the prompt"""
+    if not experience_data:
+        return ""
+    
+    formatted_experience = []
+    for exp in experience_data:
+        if isinstance(exp, dict):
+            title = exp.get('title', '')
+            company = exp.get('company', '')
+            start_date = exp.get('start_date', '')
+            end_date = exp.get('end_date', 'Present')
+            description = exp.get('description', '')
+            
+            exp_parts = []
+            if title:
+                exp_parts.append(title)
+            if company:
+                exp_parts.append(f"at {company}")
+            if start_date:
+                exp_parts.append(f"({start_date} - {end_date})")
+            if description:
+                exp_parts.append(f"- {description}")
+            
+            if exp_parts:
+                formatted_experience.append(" ".join(exp_parts))
+    
+    return "; ".join(formatted_experience)
+
+
+def _format_projects_for_prompt(projects_data: List[dict]) -> str:
+    """Format projects data for the prompt"""
+    if not projects_data:
+        return ""
+    
+    formatted_projects = []
+    for proj in projects_data:
+        if isinstance(proj, dict):
+            name = proj.get('name', '')
+            description = proj.get('description', '')
+            technologies = proj.get('technologies', '')
+
+            proj_parts = []
+            if name:
+                proj_parts.append(name)
+            if description:
+                proj_parts.append(f"- {description}")
+            if technologies:
+                proj_parts.append(f"Technologies: {technologies}")
+
+            if proj_parts:
+                formatted_projects.append(" ".join(proj_parts))
+    
+    return "; ".join(formatted_projects)
+
+
+def _format_education_for_prompt(education_data: List[dict]) -> str:
+    """Format education data for the prompt"""
+    if not education_data:
+        return ""
+    
+    formatted_education = []
+    for edu in education_data:
+        if isinstance(edu, dict):
+            degree = edu.get('degree', '')
+            institution = edu.get('institution', '')
+            end_date = edu.get('end_date', '')
+            grade = edu.get('grade', '')
+            
+            edu_parts = []
+            if degree:
+                edu_parts.append(degree)
+            if institution:
+                edu_parts.append(f"from {institution}")
+            if end_date:
+                edu_parts.append(f"({end_date})")
+            if grade:
+                edu_parts.append(f"Grade: {grade}")
+            
+            if edu_parts:
+                formatted_education.append(" ".join(edu_parts))
+    
+    return "; ".join(formatted_education)
@@ -1,25 +1,42 @@
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
+from ..core.entity_cache import CV_PROFILE_CACHE, USER_CACHE, from_entry, get_entity_cache, to_entry
 from ..models.cv_profile import CVProfile
+from ..services.cv_prompt_service import compile_prompt_summary
 from ..schemas.cv_profile import CVProfileCreate, CVProfileUpdate
 
 
-def get_cv_profile(db: Session, profile_id: int) -> Optional[CVProfile]:
+async def get_cv_profile(db: AsyncSession, profile_id: int) -> Optional[CVProfile]:
     """Get CV profile by ID"""
-    return db.query(CVProfile).filter(CVProfile.id == profile_id).first()
+    return await db.get(CVProfile, profile_id)
 
 
-def get_cv_profile_by_user(db: Session, user_id: int) -> Optional[CVProfile]:
-    """Get CV profile by user ID (one-to-one relationship)"""
-    return db.query(CVProfile).filter(CVProfile.user_id == user_id).first()
+async def get_cv_profile_by_user(db: AsyncSession, user_id: int) -> Optional[CVProfile]:
+    """Get CV profile by user ID (one-to-one relationship), reading through the entity cache"""
+    cache = get_entity_cache(CV_PROFILE_CACHE)
+    if cache is None:
+        return await db.scalar(select(CVProfile).where(CVProfile.user_id == user_id))
+    
+    entry = await cache.get(user_id)
+    if entry is not None:
+        return await db.merge(from_entry(CVProfile, entry), load=False)
+    
+    version = await cache.version(user_id)
+    db_cv_profile = await db.scalar(select(CVProfile).where(CVProfile.user_id == user_id))
+    if db_cv_profile:
+        entry = to_entry(db_cv_profile)
+        if entry:
+            await cache.set(user_id, entry, version)
+    return db_cv_profile
 
 
-def create_cv_profile(db: Session, cv_profile: CVProfileCreate) -> CVProfile:
+async def create_cv_profile(db: AsyncSession, cv_profile: CVProfileCreate) -> CVProfile:
     """Create a new CV profile (one per user)"""
     # Check if user already has a CV profile
-    if get_cv_profile_by_user(db, cv_profile.user_id):
+    if await get_cv_profile_by_user(db, cv_profile.user_id):
         raise HTTPException(
             status_code=400,
             detail="User already has a CV profile. Use update instead."
@@ -42,13 +59,15 @@ def create_cv_profile(db: Session, cv_profile: CVProfileCreate) -> CVProfile:
         cv_profile_dict['projects'] = [proj.model_dump() for proj in cv_profile.projects]
     
     db_cv_profile = CVProfile(**cv_profile_dict)
+    compile_prompt_summary(db_cv_profile)
     db.add(db_cv_profile)
-    db.commit()
-    db.refresh(db_cv_profile)
+    await db.commit()
+    await _invalidate_cached_profile(db_cv_profile.user_id)
+    await db.refresh(db_cv_profile)
     return db_cv_profile
 
 
-def update_cv_profile(db: Session, cv_profile: CVProfile, cv_update: CVProfileUpdate) -> CVProfile:
+async def update_cv_profile(db: AsyncSession, cv_profile: CVProfile, cv_update: CVProfileUpdate) -> CVProfile:
     """Update CV profile"""
     update_data = cv_update.model_dump(exclude_unset=True)
     
@@ -62,14 +81,25 @@ def update_cv_profile(db: Session, cv_profile: CVProfile, cv_update: CVProfileUp
     
     for key, value in update_data.items():
         setattr(cv_profile, key, value)
+    compile_prompt_summary(cv_profile)
     
-    db.commit()
-    db.refresh(cv_profile)
+    await db.commit()
+    await _invalidate_cached_profile(cv_profile.user_id)
+    await db.refresh(cv_profile)
     return cv_profile
 
 
-def delete_cv_profile(db: Session, cv_profile: CVProfile) -> bool:
+async def delete_cv_profile(db: AsyncSession, cv_profile: CVProfile) -> bool:
     """Delete CV profile"""
-    db.delete(cv_profile)
-    db.commit()
-    return True
\ No newline at end of file
+    await db.delete(cv_profile)
+    await db.commit()
+    await _invalidate_cached_profile(cv_profile.user_id)
+    return True
+
+
+async def _invalidate_cached_profile(user_id: int) -> None:
+    """Drop the cached profile, and the cached user that embeds it, after a write"""
+    for namespace in (CV_PROFILE_CACHE, USER_CACHE):
+        cache = get_entity_cache(namespace)
+        if cache is not None:
+            await cache.invalidate(user_id)
\ No newline at end of file
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..core.cache import LRUCache
+from ..core.config import Settings
+from ..models.generation_cache import GenerationCacheEntry
+from ..schemas.cover_letter import CoverLetterGenerate
+
+logger = logging.getLogger(__name__)
+
+# Process-wide memory tier, sized from settings on first use
+_memory_cache: Optional[LRUCache] = None
+
+# Database tier stores since it was last pruned
+_stores_since_prune = 0
+
+
+def _get_memory_cache(settings: Settings) -> LRUCache:
+    """Get the in-memory cache tier"""
+    global _memory_cache
+    if _memory_cache is None:
+        _memory_cache = LRUCache(
+            max_entries=settings.generation_cache_max_entries,
+            ttl_seconds=settings.generation_cache_ttl_seconds
+        )
+    return _memory_cache
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 hex digest of a text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def build_generation_key(
+    cv_summary_hash: str, 
+    request: CoverLetterGenerate, 
+    prompt_template: str, 
+    model: str,
+    settings: Settings
+) -> str:
+    """Build the content-addressed cache key for a generation.
+    
+    The settings that shape the prompt are part of the key, so changing them never
+    serves letters generated from differently compacted or trimmed prompts.
+    """
+    payload = json.dumps(
+        {
+            "cv": cv_summary_hash,
+            "job_title": request.job_title,
+            "company_name": request.company_name,
+            "job_description": request.job_description,
+            "prompt_template": hash_text(prompt_template),
+            "model": model,
+            "prompt_token_budget": settings.llm_prompt_token_budget,
+            "cv_trim": settings.cv_trim_enabled and settings.cv_prompt_token_budget,
+        },
+        sort_keys=True
+    )
+    return hash_text(payload)
+
+
+def build_refinement_key(content: str, instruction: str, prompt_template: str, model: str) -> str:
+    """Build the cache key for refining a letter's content with an instruction"""
+    payload = json.dumps(
+        {
+            "content": hash_text(content),
+            "instruction": instruction.strip(),
+            "prompt_template": hash_text(prompt_template),
+            "model": model,
+        },
+        sort_keys=True
+    )
+    return hash_text(payload)
+
+
+async def get_cached_content(db: AsyncSession, key: str, settings: Settings) -> Optional[str]:
+    """Get cached content from memory, falling back to the database tier"""
+    if not settings.generation_cache_enabled:
+        return None
+    
+    memory_cache = _get_memory_cache(settings)
+    content = memory_cache.get(key)
+    if content is not None:
+        return content
+    
+    if not settings.generation_cache_persist:
+        return None
+    
+    now = time.time()
+    entry = await db.scalar(
+        select(GenerationCacheEntry)
+        .where(GenerationCacheEntry.key == key, GenerationCacheEntry.expires_at > now)
+    )
+    if not entry:
+        return None
+    
+    # Promote to the memory tier for the rest of the entry's lifetime
+    memory_cache.set(key, entry.content, ttl_seconds=entry.expires_at - now)
+    return entry.content
+
+
+async def store_content(db: AsyncSession, key: str, model: str, content: str, settings: Settings) -> None:
+    """Store generated content in both cache tiers"""
+    if not settings.generation_cache_enabled:
+        return
+    
+    _get_memory_cache(settings).set(key, content)
+    
+    if not settings.generation_cache_persist:
+        return
+    
+    try:
+        await db.merge(GenerationCacheEntry(
+            key=key,
+            model=model,
+            content=content,
+            expires_at=time.time() + settings.generation_cache_ttl_seconds
+        ))
+        await db.flush()
+        await _maybe_prune_entries(db, settings)
+        await db.commit()
+    except SQLAlchemyError as e:
+        # A cache write failure must never fail the generation itself
+        await db.rollback()
+        logger.warning(f"Failed to persist generation cache entry: {str(e)}")
+
+
+async def _maybe_prune_entries(db: AsyncSession, settings: Settings) -> None:
+    """Prune the database tier once every `generation_cache_prune_interval` stores"""
+    global _stores_since_prune
+    _stores_since_prune += 1
+    if _stores_since_prune < settings.generation_cache_prune_interval:
+        return
+    _stores_since_prune = 0
+    await _prune_entries(db, settings)
+
+
+async def _prune_entries(db: AsyncSession, settings: Settings) -> None:
+    """Delete expired entries and the soonest-expiring ones beyond the size limit"""
+    await db.execute(
+        delete(GenerationCacheEntry)
+        .where(GenerationCacheEntry.expires_at <= time.time())
+        .execution_options(synchronize_session=False)
+    )
+    
+    # Walk the expires_at index to the first entry past the limit instead of counting rows
+    overflow_keys = (
+        select(GenerationCacheEntry.key)
+        .order_by(GenerationCacheEntry.expires_at.desc())
+        .offset(settings.generation_cache_db_max_entries)
+    )
+    first_overflow = await db.scalar(overflow_keys.limit(1))
+    if first_overflow is not None:
+        await db.execute(
+            delete(GenerationCacheEntry)
+            .where(GenerationCacheEntry.key.in_(overflow_keys.subquery().select()))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def clear_memory_cache() -> None:
+    """Drop the in-memory tier (the database tier is left intact)"""
+    if _memory_cache is not None:
+        _memory_cache.clear()
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+from fastapi import HTTPException
+
+from ..models.generation_job import (
+    GenerationJob,
+    JOB_STATUS_QUEUED,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_SUCCEEDED,
+    JOB_STATUS_FAILED
+)
+from ..schemas.cover_letter import CoverLetterGenerate
+from ..schemas.generation_job import GenerationJobResponse
+from ..core.config import Settings
+from ..core.database import AsyncSessionLocal
+from ..core.llm import LLMClient
+from ..core.rate_limit import RateLimitExceeded
+from ..core.circuit_breaker import CircuitOpenError
+from ..services import cover_letter_service, cv_service, user_service
+
+logger = logging.getLogger(__name__)
+
+# Job ids waiting for a worker; the database row is the source of truth
+_queue: Optional["asyncio.Queue[int]"] = None
+_workers: List[asyncio.Task] = []
+
+
+async def create_job(db: AsyncSession, request: CoverLetterGenerate) -> GenerationJobResponse:
+    """Persist a queued generation job and hand it to the worker pool"""
+    db_job = GenerationJob(
+        user_id=request.user_id,
+        status=JOB_STATUS_QUEUED,
+        request=request.model_dump()
+    )
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+
+    enqueue_job(db_job.id)
+    return GenerationJobResponse.model_validate(db_job)
+
+
+async def get_job(db: AsyncSession, job_id: int) -> Optional[GenerationJobResponse]:
+    """Get a generation job by ID, including its cover letter once it has succeeded"""
+    db_job = await db.scalar(select(GenerationJob).where(GenerationJob.id == job_id))
+    if not db_job:
+        return None
+
+    job = GenerationJobResponse.model_validate(db_job)
+    if db_job.cover_letter_id:
+        job.cover_letter = await cover_letter_service.get_cover_letter(db, cover_letter_id=db_job.cover_letter_id)
+    return job
+
+
+def enqueue_job(job_id: int) -> None:
+    """Queue a job for the workers (it stays queued in the database if they are not running)"""
+    if _queue is None:
+        logger.warning(f"Generation workers are not running; job {job_id} stays queued")
+        return
+    _queue.put_nowait(job_id)
+
+
+async def start_workers(settings: Settings, llm_client: LLMClient) -> None:
+    """Start the worker pool and requeue jobs left unfinished by a previous process"""
+    global _queue
+    _queue = asyncio.Queue()
+
+    async with AsyncSessionLocal() as db:
+        # Jobs that were running when the process stopped are retried from scratch
+        result = await db.scalars(
+            select(GenerationJob)
+            .where(GenerationJob.status.in_([JOB_STATUS_QUEUED, JOB_STATUS_RUNNING]))
+            .order_by(GenerationJob.id)
+        )
+        pending_jobs = result.all()
+        for db_job in pending_jobs:
+            db_job.status = JOB_STATUS_QUEUED
+            _queue.put_nowait(db_job.id)
+        await db.commit()
+
+    for _ in range(settings.generation_workers):
+        _workers.append(asyncio.create_task(_worker(settings, llm_client)))
+    logger.info(
+        f"Started {settings.generation_workers} generation workers "
+        f"({len(pending_jobs)} pending jobs requeued)"
+    )
+
+
+async def stop_workers() -> None:
+    """Stop the worker pool; interrupted jobs are requeued on the next start"""
+    global _queue
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+
+
+async def _worker(settings: Settings, llm_client: LLMClient) -> None:
+    """Drain the job queue one job at a time"""
+    while True:
+        job_id = await _queue.get()
+        try:
+            await _run_job(job_id, settings, llm_client)
+        except Exception as e:
+            logger.error(f"Generation job {job_id} crashed: {str(e)}")
+        finally:
+            _queue.task_done()
+
+
+async def _run_job(job_id: int, settings: Settings, llm_client: LLMClient) -> None:
+    """Run a single generation job and record its outcome"""
+    async with AsyncSessionLocal() as db:
+        db_job = await db.scalar(select(GenerationJob).where(GenerationJob.id == job_id))
+        if not db_job or db_job.status != JOB_STATUS_QUEUED:
+            return
+
+        db_job.status = JOB_STATUS_RUNNING
+        db_job.started_at = func.now()
+        await db.commit()
+
+        request = CoverLetterGenerate(**db_job.request)
+        try:
+            cover_letter = await cover_letter_service.generate_cover_letter(
+                db=db,
+                request=request,
+                settings=settings,
+                cv_profile=await cv_service.get_cv_profile_by_user(db, user_id=request.user_id),
+                user=await user_service.get_user(db, user_id=request.user_id),
+                llm_client=llm_client
+            )
+            db_job.status = JOB_STATUS_SUCCEEDED
+            db_job.cover_letter_id = cover_letter.id
+            logger.info(f"Generation job {job_id} succeeded")
+        except (RateLimitExceeded, CircuitOpenError) as e:
+            # Back off and try again later instead of failing the job
+            await db.rollback()
+            db_job.status = JOB_STATUS_QUEUED
+            db_job.started_at = None
+            await db.commit()
+            asyncio.get_running_loop().call_later(e.retry_after, enqueue_job, job_id)
+            logger.warning(f"Generation job {job_id} deferred ({e.detail}); retrying in {e.retry_after}s")
+            return
+        except HTTPException as e:
+            await db.rollback()
+            db_job.status = JOB_STATUS_FAILED
+            db_job.error = str(e.detail)
+            logger.error(f"Generation job {job_id} failed: {e.detail}")
+        except Exception as e:
+            # A database error or other unexpected failure must not leave the job running
+            await db.rollback()
+            db_job.status = JOB_STATUS_FAILED
+            db_job.error = f"Failed to generate cover letter: {str(e)}"
+            logger.error(f"Generation job {job_id} failed: {str(e)}")
+
+        db_job.finished_at = func.now()
+        await db.commit()
@@ -0,0 +1,52 @@
+import hashlib
+from typing import Dict, List
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.job_posting import JobPosting
+
+
+def hash_job_description(description: str) -> str:
+    """Content hash of a job description, ignoring differences in whitespace"""
+    normalized = " ".join(description.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+async def get_or_create_job_postings(db: AsyncSession, descriptions: List[str]) -> List[JobPosting]:
+    """Get the posting for each description, storing descriptions not seen before.
+    
+    Runs inside the caller's transaction, which is left uncommitted.
+    """
+    hashes = [hash_job_description(description) for description in descriptions]
+    postings = await _get_postings_by_hash(db, set(hashes))
+    
+    missing = {
+        content_hash: description
+        for content_hash, description in zip(hashes, descriptions)
+        if content_hash not in postings
+    }
+    if missing:
+        # Another request may store the same posting concurrently; its row wins
+        await db.execute(
+            _insert_ignoring_duplicates(db),
+            [{"content_hash": content_hash, "description": description} for content_hash, description in missing.items()]
+        )
+        postings.update(await _get_postings_by_hash(db, set(missing)))
+    
+    return [postings[content_hash] for content_hash in hashes]
+
+
+async def _get_postings_by_hash(db: AsyncSession, hashes: set) -> Dict[str, JobPosting]:
+    result = await db.scalars(select(JobPosting).where(JobPosting.content_hash.in_(hashes)))
+    return {posting.content_hash: posting for posting in result.all()}
+
+
+def _insert_ignoring_duplicates(db: AsyncSession):
+    """INSERT that skips postings whose hash is already stored"""
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(JobPosting).on_conflict_do_nothing(index_elements=["content_hash"])
+    if dialect == "postgresql":
+        return postgresql.insert(JobPosting).on_conflict_do_nothing(index_elements=["content_hash"])
+    return insert(JobPosting).prefix_with("IGNORE")
@@ -0,0 +1,104 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException
+
+from ..core.config import Settings
+from ..core.tokens import TokenUsage
+from ..models.token_usage import UserTokenUsage
+from ..schemas.token_usage import TokenUsageResponse
+
+logger = logging.getLogger(__name__)
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    """Quota period (calendar month, UTC) a moment falls in"""
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m")
+
+
+async def get_usage(db: AsyncSession, user_id: int, settings: Settings) -> TokenUsageResponse:
+    """Tokens a user has used this month, with their quota"""
+    period = current_period()
+    row = await _get_row(db, user_id, period)
+    used = (row.prompt_tokens + row.output_tokens) if row else 0
+    quota = settings.llm_user_monthly_token_quota or None
+    return TokenUsageResponse(
+        user_id=user_id,
+        period=period,
+        prompt_tokens=row.prompt_tokens if row else 0,
+        output_tokens=row.output_tokens if row else 0,
+        total_tokens=used,
+        calls=row.calls if row else 0,
+        quota=quota,
+        remaining=max(0, quota - used) if quota else None
+    )
+
+
+async def ensure_within_quota(db: AsyncSession, user_id: int, settings: Settings) -> None:
+    """Reject a model call once the user has used up this month's token quota"""
+    quota = settings.llm_user_monthly_token_quota
+    if not quota:
+        return
+
+    # One primary key lookup per call
+    row = await _get_row(db, user_id, current_period())
+    if row and row.prompt_tokens + row.output_tokens >= quota:
+        logger.warning(f"User {user_id} is over the monthly token quota of {quota}")
+        raise HTTPException(
+            status_code=429,
+            detail="Monthly generation token quota exceeded",
+            headers={"Retry-After": str(_seconds_until_next_period())}
+        )
+
+
+async def record_usage(db: AsyncSession, user_id: int, usage: TokenUsage) -> None:
+    """Add a model call's tokens to the user's monthly total and commit"""
+    values = {
+        "user_id": user_id,
+        "period": current_period(),
+        "prompt_tokens": usage.prompt_tokens,
+        "output_tokens": usage.output_tokens,
+        "calls": 1,
+    }
+    try:
+        await db.execute(_upsert_usage(db, values))
+        await db.commit()
+    except SQLAlchemyError as e:
+        # Accounting must never fail a generation that already succeeded
+        await db.rollback()
+        logger.warning(f"Failed to record token usage for user {user_id}: {str(e)}")
+
+
+async def _get_row(db: AsyncSession, user_id: int, period: str) -> Optional[UserTokenUsage]:
+    # Counters are updated with plain SQL, so a row already in the session may be stale
+    return await db.get(UserTokenUsage, (user_id, period), populate_existing=True)
+
+
+def _upsert_usage(db: AsyncSession, values: dict):
+    """Statement adding to the period's counters, creating the row on first use"""
+    increments = {
+        "prompt_tokens": UserTokenUsage.prompt_tokens + values["prompt_tokens"],
+        "output_tokens": UserTokenUsage.output_tokens + values["output_tokens"],
+        "calls": UserTokenUsage.calls + 1,
+        "updated_at": func.now(),
+    }
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(UserTokenUsage).values(**values).on_conflict_do_update(
+            index_elements=["user_id", "period"], set_=increments
+        )
+    if dialect == "postgresql":
+        return postgresql.insert(UserTokenUsage).values(**values).on_conflict_do_update(
+            index_elements=["user_id", "period"], set_=increments
+        )
+    return mysql.insert(UserTokenUsage).values(**values).on_duplicate_key_update(**increments)
+
+
+def _seconds_until_next_period() -> int:
+    now = datetime.now(timezone.utc)
+    next_period = datetime(now.year + now.month // 12, now.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int((next_period - now).total_seconds()) + 1
@@ -1,31 +1,55 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.util import identity_key
 from fastapi import HTTPException
 
+from ..core.entity_cache import CV_PROFILE_CACHE, USER_CACHE, from_entry, get_entity_cache, to_entry
+from ..models.cv_profile import CVProfile
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
 
 
-def get_user(db: Session, user_id: int) -> Optional[User]:
-    """Get user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
-
-
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """Get user by ID, with its CV profile, reading through the entity cache"""
+    cache = get_entity_cache(USER_CACHE)
+    # A user already in this session comes back from db.get without a query
+    if cache is None or identity_key(User, user_id) in db.identity_map:
+        return await db.get(User, user_id)
+    
+    entry = await cache.get(user_id)
+    if entry is not None:
+        cv_profile = from_entry(CVProfile, entry["cv_profile"]) if entry["cv_profile"] else None
+        return await db.merge(from_entry(User, entry["user"], cv_profile=cv_profile), load=False)
+    
+    version = await cache.version(user_id)
+    db_user = await db.get(User, user_id)
+    if db_user:
+        entry = {
+            "user": to_entry(db_user),
+            "cv_profile": to_entry(db_user.cv_profile) if db_user.cv_profile else None,
+        }
+        if entry["user"] and (entry["cv_profile"] or not db_user.cv_profile):
+            await cache.set(user_id, entry, version)
+    return db_user
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get user by email"""
-    return db.query(User).filter(User.email == email).first()
+    return await db.scalar(select(User).where(User.email == email))
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 50) -> List[User]:
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[User]:
     """Get list of users with pagination"""
-    return db.query(User).offset(skip).limit(limit).all()
+    result = await db.scalars(select(User).offset(skip).limit(limit))
+    return list(result.all())
 
 
-def create_user(db: Session, user: UserCreate) -> User:
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
     """Create a new user with validation"""
     # Check if user with this email already exists
-    if get_user_by_email(db, user.email):
+    if await get_user_by_email(db, user.email):
         raise HTTPException(
             status_code=400,
             detail="User with this email already exists"
@@ -34,20 +58,20 @@ def create_user(db: Session, user: UserCreate) -> User:
     try:
         db_user = User(name=user.name, email=user.email)
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Failed to create user due to data integrity constraints"
         )
 
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate) -> Optional[User]:
     """Update user information"""
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if not db_user:
         return None
     
@@ -55,7 +79,7 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
     
     # Check email uniqueness if being updated
     if "email" in update_data:
-        existing_user = get_user_by_email(db, update_data["email"])
+        existing_user = await get_user_by_email(db, update_data["email"])
         if existing_user and existing_user.id != user_id:
             raise HTTPException(
                 status_code=400,
@@ -66,50 +90,57 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
         for field, value in update_data.items():
             setattr(db_user, field, value)
         
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await _invalidate_cached_user(user_id)
+        await db.refresh(db_user)
         return db_user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Failed to update user due to data integrity constraints"
         )
 
 
-def delete_user(db: Session, user_id: int) -> bool:
+async def delete_user(db: AsyncSession, user_id: int) -> bool:
     """Delete a user and all related data (cascade)"""
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if not db_user:
         return False
     
     try:
         # Cascade relationships handle deletion of CV profile and cover letters
-        db.delete(db_user)
-        db.commit()
+        await db.delete(db_user)
+        await db.commit()
+        await _invalidate_cached_user(user_id, CV_PROFILE_CACHE)
         return True
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail="Failed to delete user"
         )
 
 
-def search_users_by_name(db: Session, name_query: str, skip: int = 0, limit: int = 100) -> List[User]:
+async def search_users_by_name(db: AsyncSession, name_query: str, skip: int = 0, limit: int = 100) -> List[User]:
     """Search users by name (case-insensitive partial match)"""
-    return (
-        db.query(User)
-        .filter(User.name.ilike(f"%{name_query}%"))
+    result = await db.scalars(
+        select(User)
+        .where(User.name.ilike(f"%{name_query}%"))
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return list(result.all())
 
 
-def verify_user_exists(db: Session, user_id: int) -> bool:
+async def verify_user_exists(db: AsyncSession, user_id: int) -> bool:
     """Verify if a user exists"""
-    return db.query(User).filter(User.id == user_id).first() is not None
+    return await db.scalar(select(User.id).where(User.id == user_id)) is not None
 
 
- 
\ No newline at end of file
+async def _invalidate_cached_user(user_id: int, *also: str) -> None:
+    """Drop the cached user (and other entities cached for the user) after a write"""
+    for namespace in (USER_CACHE, *also):
+        cache = get_entity_cache(namespace)
+        if cache is not None:
+            await cache.invalidate(user_id)
@@ -0,0 +1,84 @@
+"""Benchmark concurrent cover letter generation against a slow fake LLM.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_async_generation
+
+The fake model sleeps for a fixed latency, so if generation blocks the event
+loop throughput stays flat at ~1/latency regardless of concurrency. With the
+async LLM path throughput should grow linearly with concurrency.
+"""
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from app.core import llm  # noqa: E402
+from app.core.config import Settings  # noqa: E402
+from app.schemas.cover_letter import CoverLetterGenerate  # noqa: E402
+from app.services import cover_letter_service  # noqa: E402
+
+
+def _sample_cv_profile():
+    return SimpleNamespace(
+        full_name="Jane Doe",
+        email="jane@example.com",
+        phone=None,
+        summary="Backend engineer with 7 years of Python experience.",
+        skills=[{"name": "Python", "proficiency": "Advanced", "category": "Programming"}],
+        experience=[{"title": "Senior Engineer", "company": "Acme", "start_date": "2019"}],
+        projects=None,
+        education=None,
+    )
+
+
+async def _run(concurrency: int, total: int, settings: Settings, llm_client: llm.LLMClient) -> float:
+    request = CoverLetterGenerate(
+        user_id=1,
+        job_title="Backend Engineer",
+        company_name="Tech Corp",
+        job_description="We are looking for a backend engineer with strong Python and async experience.",
+    )
+    cv_profile = _sample_cv_profile()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await cover_letter_service.generate_cover_letter_content(cv_profile, request, settings, llm_client)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 500])
+    args = parser.parse_args()
+
+    settings = Settings(
+        google_api_key="benchmark",
+        llm_provider="fake",
+        fake_llm_latency_distribution="fixed",
+        fake_llm_latency_ms=args.latency * 1000,
+        llm_requests_per_minute=0,
+        llm_tokens_per_minute=0,
+        llm_max_in_flight=max(args.concurrency)
+    )
+    llm_client = llm.LLMClient(settings)
+
+    print(f"Fake LLM latency: {args.latency:.2f}s")
+    print(f"{'concurrency':>12} {'requests':>9} {'elapsed (s)':>12} {'req/s':>9}")
+    for concurrency in args.concurrency:
+        total = max(concurrency * 2, 4)
+        elapsed = asyncio.run(_run(concurrency, total, settings, llm_client))
+        print(f"{concurrency:>12} {total:>9} {elapsed:>12.2f} {total / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
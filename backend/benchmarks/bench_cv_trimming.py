@@ -0,0 +1,214 @@
+"""Measure prompt tokens saved by relevance-ranked CV trimming on a fixed evaluation set.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_cv_trimming --budget 800
+
+Each case pairs a senior candidate whose CV spans several specialisms with a
+job in one of them; the CV entries from that specialism are the ones a good
+letter should draw on. For every case the full prompt is compared with the
+trimmed one, and quality is reported as the share of those relevant entries
+still in the prompt (recall) and the share of kept entries that are relevant
+(precision). Keeping entries in CV order until the budget is reached is shown
+as a baseline. The evaluation set is fixed, so results are reproducible.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.core.tokens import estimate_tokens  # noqa: E402
+from app.schemas.cover_letter import CoverLetterGenerate  # noqa: E402
+from app.services.cover_letter_service import _build_cover_letter_prompt  # noqa: E402
+from app.services.cv_prompt_service import format_cv_for_prompt, trim_cv_for_job  # noqa: E402
+
+# CV entries per specialism; each candidate's CV mixes several of them
+SPECIALISMS = {
+    "backend": {
+        "job": (
+            "Senior Backend Engineer to design and scale our Python APIs. You will own FastAPI and Django "
+            "services, PostgreSQL schemas and query performance, asynchronous task queues with Celery and "
+            "Redis, and REST and gRPC interfaces used by millions of requests per day."
+        ),
+        "experience": [
+            ("Senior Backend Engineer", "Paylane", "Built the payments API in Python and FastAPI serving 4,000 requests per second; cut PostgreSQL query latency by 60% with index redesign."),
+            ("Backend Engineer", "Shipwise", "Designed REST and gRPC services for order routing; introduced Celery task queues with Redis for asynchronous fulfilment."),
+            ("Software Engineer", "Bookly", "Maintained a Django monolith and split billing into a standalone service with its own PostgreSQL database."),
+            ("Python Developer", "Tallyho", "Wrote data access layers with SQLAlchemy and tuned connection pooling for a high-traffic API."),
+        ],
+        "projects": [
+            ("ratelimitd", "Token bucket rate limiting service for APIs backed by Redis", ["Python", "Redis", "asyncio"]),
+            ("pgshard", "Tool to rebalance PostgreSQL shards with zero downtime", ["Python", "PostgreSQL"]),
+            ("queue-bench", "Benchmark suite comparing Celery, RQ and Dramatiq task queues", ["Python", "Celery"]),
+        ],
+        "skills": [("Python", "Programming"), ("FastAPI", "Frameworks"), ("Django", "Frameworks"), ("PostgreSQL", "Databases"),
+                   ("Redis", "Databases"), ("Celery", "Tools"), ("gRPC", "Protocols"), ("SQLAlchemy", "Frameworks")],
+    },
+    "data": {
+        "job": (
+            "Machine Learning Engineer to build recommendation and forecasting models. Experience with PyTorch or "
+            "TensorFlow, feature pipelines in Spark and Airflow, model evaluation, and deploying models to "
+            "production with MLflow is required. Strong statistics background preferred."
+        ),
+        "experience": [
+            ("Machine Learning Engineer", "Streamly", "Trained PyTorch recommendation models that lifted watch time by 12%; served them with MLflow model registry."),
+            ("Data Scientist", "Grocerly", "Built demand forecasting models with gradient boosting and rigorous statistical evaluation."),
+            ("Data Engineer", "Adtrack", "Ran Spark feature pipelines orchestrated with Airflow over 20 TB of event data."),
+            ("Research Assistant", "Univ. AI Lab", "Published work on TensorFlow sequence models for time series forecasting."),
+        ],
+        "projects": [
+            ("featurestore-lite", "Minimal feature store with point-in-time correct joins for model training", ["Spark", "Parquet"]),
+            ("forecast-kit", "Forecasting library wrapping statistical and neural models with backtesting", ["PyTorch", "statsmodels"]),
+            ("mlflow-deployer", "Automates promotion of MLflow models from staging to production", ["MLflow", "Docker"]),
+        ],
+        "skills": [("PyTorch", "Machine Learning"), ("TensorFlow", "Machine Learning"), ("Spark", "Data"), ("Airflow", "Data"),
+                   ("MLflow", "Machine Learning"), ("Statistics", "Analysis"), ("Pandas", "Data"), ("Forecasting", "Analysis")],
+    },
+    "frontend": {
+        "job": (
+            "Senior Frontend Engineer to lead our React and TypeScript web app. You will build accessible UI "
+            "components, improve Core Web Vitals and bundle size, manage state with Redux, and collaborate "
+            "with designers on our design system in Figma."
+        ),
+        "experience": [
+            ("Senior Frontend Engineer", "Canvasly", "Led the React and TypeScript rewrite of the editor; halved bundle size and improved Core Web Vitals."),
+            ("Frontend Developer", "Listo", "Built accessible UI components for the design system, meeting WCAG AA."),
+            ("UI Engineer", "Fintrack", "Managed complex dashboard state with Redux and wrote end-to-end tests in Cypress."),
+            ("Web Developer", "Agency Nine", "Turned Figma designs into responsive websites with CSS Grid and vanilla JavaScript."),
+        ],
+        "projects": [
+            ("a11y-lint", "Linter that flags inaccessible React component patterns", ["TypeScript", "React"]),
+            ("vitals-watch", "Browser extension reporting Core Web Vitals for any page", ["JavaScript", "Web APIs"]),
+            ("tokens-sync", "Syncs design tokens from Figma into a CSS variables package", ["TypeScript", "Figma API"]),
+        ],
+        "skills": [("React", "Frameworks"), ("TypeScript", "Programming"), ("JavaScript", "Programming"), ("Redux", "Frameworks"),
+                   ("CSS", "Web"), ("Accessibility", "Web"), ("Cypress", "Testing"), ("Figma", "Design")],
+    },
+    "devops": {
+        "job": (
+            "Site Reliability Engineer to run our Kubernetes platform on AWS. You will manage infrastructure as "
+            "code with Terraform, build CI/CD pipelines, define SLOs with Prometheus and Grafana, and lead "
+            "incident response and on-call improvements."
+        ),
+        "experience": [
+            ("Site Reliability Engineer", "Cloudnest", "Operated 40 Kubernetes clusters on AWS; defined SLOs and alerting with Prometheus and Grafana."),
+            ("DevOps Engineer", "Retailio", "Moved all infrastructure to Terraform and built CI/CD pipelines in GitHub Actions."),
+            ("Systems Engineer", "Hostright", "Automated Linux server provisioning with Ansible and led incident response rotations."),
+            ("Platform Engineer", "Datagrid", "Built an internal developer platform with Helm charts and Argo CD deployments."),
+        ],
+        "projects": [
+            ("slo-kit", "Generates Prometheus recording rules and Grafana dashboards from SLO definitions", ["Go", "Prometheus"]),
+            ("tf-drift", "Detects drift between Terraform state and live AWS resources", ["Go", "Terraform", "AWS"]),
+            ("oncall-bot", "Slack bot that pages, tracks and summarises incidents", ["Python", "PagerDuty"]),
+        ],
+        "skills": [("Kubernetes", "Infrastructure"), ("Terraform", "Infrastructure"), ("AWS", "Cloud"), ("Prometheus", "Observability"),
+                   ("Grafana", "Observability"), ("Helm", "Infrastructure"), ("Ansible", "Infrastructure"), ("Linux", "Systems")],
+    },
+}
+
+EDUCATION = [{"degree": "MSc Computer Science", "institution": "Technical University", "end_date": "2014"}]
+
+
+def _build_cases(profiles: int, seed: int) -> list:
+    """Candidates spanning three specialisms, each paired with a job in every one of them"""
+    rng = random.Random(seed)
+    cases = []
+    for candidate in range(profiles):
+        specialisms = rng.sample(sorted(SPECIALISMS), 3)
+        entries = {"experience": [], "projects": [], "skills": []}
+        for specialism in specialisms:
+            data = SPECIALISMS[specialism]
+            entries["experience"] += [
+                ({"title": title, "company": company, "start_date": "2015", "end_date": "2018", "description": description}, specialism)
+                for title, company, description in data["experience"]
+            ]
+            entries["projects"] += [
+                ({"name": name, "description": description, "technologies": technologies}, specialism)
+                for name, description, technologies in data["projects"]
+            ]
+            entries["skills"] += [
+                ({"name": name, "proficiency": "Advanced", "category": category}, specialism)
+                for name, category in data["skills"]
+            ]
+        for section in entries.values():
+            rng.shuffle(section)
+
+        profile = {
+            "full_name": f"Candidate {candidate + 1}",
+            "email": f"candidate{candidate + 1}@example.com",
+            "summary": "Senior engineer with over ten years of experience across several disciplines.",
+            "education": EDUCATION,
+            **{section: [item for item, _ in items] for section, items in entries.items()},
+        }
+        for specialism in specialisms:
+            relevant = [_marker(section, item) for section, items in entries.items() for item, owner in items if owner == specialism]
+            every = [_marker(section, item) for section, items in entries.items() for item, _ in items]
+            cases.append((profile, specialism, relevant, every))
+    return cases
+
+
+def _marker(section: str, item: dict) -> str:
+    """Text that appears in the formatted CV only when the entry is kept"""
+    if section == "experience":
+        return item["description"]
+    if section == "projects":
+        return f"{item['name']} - "
+    return f"{item['name']} ({item['proficiency']})"
+
+
+def _prompt_tokens(cv_text: str, specialism: str) -> int:
+    request = CoverLetterGenerate(user_id=1, job_title="Engineer", job_description=SPECIALISMS[specialism]["job"])
+    return estimate_tokens(_build_cover_letter_prompt(cv_text, request))
+
+
+def _quality(cv_text: str, relevant: list, every: list) -> tuple:
+    kept = [marker for marker in every if marker in cv_text]
+    kept_relevant = [marker for marker in relevant if marker in cv_text]
+    return len(kept_relevant) / len(relevant), (len(kept_relevant) / len(kept) if kept else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=800, help="CV token budget (CV_PROMPT_TOKEN_BUDGET)")
+    parser.add_argument("--profiles", type=int, default=6, help="Candidates in the evaluation set")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = {"full": [], "ranked": [], "in_order": []}
+    trim_seconds = []
+    for profile, specialism, relevant, every in _build_cases(args.profiles, args.seed):
+        job_description = SPECIALISMS[specialism]["job"]
+        full_text = format_cv_for_prompt(_Profile(profile))
+
+        start = time.perf_counter()
+        ranked_text = trim_cv_for_job(_Profile(profile), job_description, args.budget)
+        trim_seconds.append(time.perf_counter() - start)
+        # With nothing to match, every entry ties and entries are kept in CV order
+        in_order_text = trim_cv_for_job(_Profile(profile), "", args.budget)
+
+        for name, text in (("full", full_text), ("ranked", ranked_text), ("in_order", in_order_text)):
+            results[name].append((_prompt_tokens(text, specialism), *_quality(text, relevant, every)))
+
+    full_tokens = statistics.mean(tokens for tokens, _, _ in results["full"])
+    print(f"{len(results['full'])} cases, CV budget {args.budget} tokens, "
+          f"trimming takes {statistics.median(trim_seconds) * 1000:.2f} ms per prompt (median)")
+    print(f"{'prompt':>9} {'tokens':>7} {'saved':>6} {'recall':>7} {'precision':>10}")
+    for name in ("full", "ranked", "in_order"):
+        tokens = statistics.mean(tokens for tokens, _, _ in results[name])
+        recall = statistics.mean(recall for _, recall, _ in results[name])
+        precision = statistics.mean(precision for _, _, precision in results[name])
+        print(f"{name:>9} {tokens:>7.0f} {1 - tokens / full_tokens:>6.0%} {recall:>7.0%} {precision:>10.0%}")
+
+
+class _Profile:
+    """Attribute access over a profile dict, like the ORM row the service formats"""
+
+    def __init__(self, data: dict):
+        self.__dict__.update(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark how much tail latency hedged model calls remove.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_hedging
+
+The fake model answers most calls quickly but a small fraction very slowly.
+The same call sequence runs with hedging off and on, and the latency
+percentiles and the extra upstream attempts are compared.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from app.core import llm  # noqa: E402
+from app.core.config import Settings  # noqa: E402
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _run(settings: Settings, calls: int, concurrency: int):
+    llm_client = llm.LLMClient(settings)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await llm_client.generate("Write a cover letter")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies, llm_client.metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--typical", type=float, default=0.05, help="Typical latency in seconds")
+    parser.add_argument("--slow", type=float, default=1.0, help="Slow-call latency in seconds")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    args = parser.parse_args()
+
+    base = dict(
+        google_api_key="benchmark",
+        llm_requests_per_minute=0,
+        llm_tokens_per_minute=0,
+        llm_hedge_min_samples=20,
+        llm_provider="fake",
+        fake_llm_latency_distribution="uniform",
+        fake_llm_latency_ms=args.typical * 1000,
+        fake_llm_latency_spread=0.2,
+        fake_llm_slow_fraction=args.slow_fraction,
+        fake_llm_slow_latency_ms=args.slow * 1000,
+        fake_llm_seed=7,
+    )
+    print(f"{args.calls} calls, {args.slow_fraction:.0%} at {args.slow:.2f}s, the rest around {args.typical:.2f}s")
+    print(f"{'mode':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'attempts':>9} {'hedge wins':>11}")
+    for mode, hedge_enabled in (("no hedge", False), ("hedged", True)):
+        settings = Settings(**base, llm_hedge_enabled=hedge_enabled)
+        latencies, metrics = asyncio.run(_run(settings, args.calls, args.concurrency))
+        print(
+            f"{mode:>10} "
+            f"{_percentile(latencies, 0.50) * 1000:>9.0f} "
+            f"{_percentile(latencies, 0.95) * 1000:>9.0f} "
+            f"{_percentile(latencies, 0.99) * 1000:>9.0f} "
+            f"{max(latencies) * 1000:>9.0f} "
+            f"{metrics.attempts:>9} "
+            f"{metrics.hedge_wins:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark GET /cover-letters/{id} latency under concurrent generate load.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_read_latency
+
+The app runs in-process against a fresh SQLite file and a fake model. While
+`--generators` clients keep posting generate requests, a reader fetches one
+cover letter at a steady rate and its latency percentiles are reported. A
+background connection periodically holds the database write lock for
+`--lock-hold` seconds, standing in for a slow disk or a competing writer.
+Queries that block the event loop while they wait for the lock stall every
+request in the process, which shows up directly in the reader's p99.
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="bench-read-latency-")
+DB_PATH = os.path.join(_db_dir, "benchmark.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "0")
+os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "0")
+os.environ.setdefault("LLM_MAX_IN_FLIGHT", "10000")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_DISTRIBUTION", "fixed")
+
+import httpx  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.config import get_settings  # noqa: E402
+from app.core.init_db import init_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+JOB_DESCRIPTION = "We are looking for a backend engineer with strong Python and async experience."
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _hold_write_lock(stop: threading.Event, hold: float, interval: float) -> None:
+    """Repeatedly take the SQLite write lock from another connection"""
+    connection = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+    try:
+        while not stop.wait(interval):
+            connection.execute("BEGIN IMMEDIATE")
+            time.sleep(hold)
+            connection.execute("COMMIT")
+    finally:
+        connection.close()
+
+
+async def _seed(client: httpx.AsyncClient, email: str) -> tuple:
+    user = (await client.post("/api/v1/users/", json={"name": "Bench", "email": email})).json()
+    await client.post("/api/v1/cv/profile", json={
+        "user_id": user["id"],
+        "full_name": "Bench User",
+        "summary": "Backend engineer with 7 years of Python experience.",
+        "skills": [{"name": "Python", "proficiency": "Advanced", "category": "Programming"}],
+        "experience": [{"title": "Senior Engineer", "company": "Acme", "start_date": "2019"}],
+    })
+    cover_letter = (await client.post("/api/v1/cover-letters/", json={
+        "user_id": user["id"],
+        "title": "Benchmark letter",
+        "job_title": "Backend Engineer",
+        "job_description": JOB_DESCRIPTION,
+        "content": "Dear Hiring Manager, ... Sincerely, Benchmark",
+    })).json()
+    return user["id"], cover_letter["id"]
+
+
+async def _run(args, generators: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        user_id, cover_letter_id = await _seed(client, f"bench-{generators}@example.com")
+        stop_at = time.perf_counter() + args.duration
+        read_latencies = []
+        generated = 0
+
+        async def generate_forever():
+            nonlocal generated
+            body = {
+                "user_id": user_id,
+                "job_title": "Backend Engineer",
+                "company_name": "Tech Corp",
+                "job_description": JOB_DESCRIPTION,
+                "force_regenerate": True,
+            }
+            while time.perf_counter() < stop_at:
+                response = await client.post("/api/v1/cover-letters/generate", json=body)
+                response.raise_for_status()
+                generated += 1
+
+        async def read_forever():
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                response = await client.get(f"/api/v1/cover-letters/{cover_letter_id}")
+                response.raise_for_status()
+                read_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(args.read_interval)
+
+        await asyncio.gather(read_forever(), *(generate_forever() for _ in range(generators)))
+
+    return {
+        "reads": len(read_latencies),
+        "p50": _percentile(read_latencies, 0.50),
+        "p99": _percentile(read_latencies, 0.99),
+        "max": max(read_latencies),
+        "generated": generated,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--generators", type=int, nargs="+", default=[0, 50], help="Concurrent generate clients")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM latency in seconds")
+    parser.add_argument("--read-interval", type=float, default=0.01, help="Pause between reads in seconds")
+    parser.add_argument("--lock-hold", type=float, default=0.05, help="Seconds the write lock is held (0 disables)")
+    parser.add_argument("--lock-interval", type=float, default=0.25, help="Seconds between write lock holds")
+    args = parser.parse_args()
+
+    # The fake provider reads its latency from settings on every call
+    get_settings().fake_llm_latency_ms = args.latency * 1000
+    init_db()
+
+    stop = threading.Event()
+    if args.lock_hold > 0:
+        threading.Thread(
+            target=_hold_write_lock, args=(stop, args.lock_hold, args.lock_interval), daemon=True
+        ).start()
+
+    print(
+        f"Fake LLM latency: {args.latency:.2f}s, write lock held {args.lock_hold * 1000:.0f}ms "
+        f"every {args.lock_interval * 1000:.0f}ms"
+    )
+    print(f"{'generators':>11} {'reads':>7} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'generated':>10}")
+    try:
+        for generators in args.generators:
+            result = asyncio.run(_run(args, generators))
+            print(
+                f"{generators:>11} {result['reads']:>7} {result['p50'] * 1000:>9.1f} "
+                f"{result['p99'] * 1000:>9.1f} {result['max'] * 1000:>9.1f} {result['generated']:>10}"
+            )
+    finally:
+        stop.set()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Benchmark cover letter full-text search on a large SQLite database.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_search --rows 1000000
+
+A fresh database is filled with `--rows` synthetic cover letters spread over
+users with `--letters-per-user` letters each (the search index is kept in
+sync by its triggers while seeding). Searches for common and rare words then
+run through the service for random users, and latency percentiles are
+reported per query.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="bench-search-")
+DB_PATH = os.path.join(_db_dir, "benchmark.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+import app.models  # noqa: E402,F401
+from app.core.database import AsyncSessionLocal, dispose_engines  # noqa: E402
+from app.core.init_db import init_db  # noqa: E402
+from app.services import cover_letter_service, job_posting_service  # noqa: E402
+
+# Words every letter draws from; a few of them are deliberately rare
+COMMON_WORDS = (
+    "experience team engineer software python product design build scalable systems "
+    "customers data cloud services reliable testing delivery passionate collaborate "
+    "growth impact remote startup platform backend frontend api database company"
+).split()
+RARE_WORDS = ["kubernetes", "terraform", "haskell", "fintech", "robotics"]
+QUERIES = ["experience", "python engineer", "kubernetes", "haskell fintech", "remote startup platform"]
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    chosen = [rng.choice(COMMON_WORDS) for _ in range(words)]
+    if rng.random() < 0.05:
+        chosen[rng.randrange(words)] = rng.choice(RARE_WORDS)
+    return " ".join(chosen)
+
+
+def _seed(rows: int, letters_per_user: int, postings: int) -> None:
+    """Insert synthetic users, job postings and cover letters directly"""
+    rng = random.Random(7)
+    connection = sqlite3.connect(DB_PATH)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = OFF")
+    users = max(1, rows // letters_per_user)
+    connection.executemany(
+        "INSERT INTO users (id, name, email) VALUES (?, ?, ?)",
+        [(user_id, "Bench", f"bench-{user_id}@example.com") for user_id in range(1, users + 1)]
+    )
+    descriptions = [_text(rng, 80) for _ in range(postings)]
+    connection.executemany(
+        "INSERT INTO job_postings (id, content_hash, description) VALUES (?, ?, ?)",
+        [
+            (posting_id, job_posting_service.hash_job_description(description), description)
+            for posting_id, description in enumerate(descriptions, start=1)
+        ]
+    )
+
+    batch = []
+    for cover_letter_id in range(1, rows + 1):
+        batch.append((
+            cover_letter_id,
+            (cover_letter_id - 1) // letters_per_user + 1,
+            " ".join(rng.choice(COMMON_WORDS) for _ in range(4)).title(),
+            "Software Engineer",
+            rng.choice(["Acme", "Globex", "Initech", "Umbrella"]),
+            rng.randint(1, postings),
+            _text(rng, 250),
+        ))
+        if len(batch) == 10000:
+            _insert_letters(connection, batch)
+            batch = []
+            print(f"\r  seeded {cover_letter_id:,} letters", end="", flush=True)
+    _insert_letters(connection, batch)
+    connection.close()
+    print()
+
+
+def _insert_letters(connection: sqlite3.Connection, batch: list) -> None:
+    connection.executemany(
+        "INSERT INTO cover_letters (id, user_id, title, job_title, company_name, job_posting_id, content) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        batch
+    )
+    connection.commit()
+
+
+async def _run(args) -> dict:
+    rng = random.Random(11)
+    users = max(1, args.rows // args.letters_per_user)
+    latencies = {query: [] for query in QUERIES}
+    hits = {query: 0 for query in QUERIES}
+    try:
+        async with AsyncSessionLocal() as db:
+            for _ in range(args.searches):
+                for query in QUERIES:
+                    start = time.perf_counter()
+                    result = await cover_letter_service.search_cover_letters(
+                        db, user_id=rng.randint(1, users), query=query, limit=20, count_cap=1000
+                    )
+                    latencies[query].append(time.perf_counter() - start)
+                    hits[query] += result.total
+    finally:
+        await dispose_engines()
+    return {"latencies": latencies, "hits": hits}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="Cover letters to seed")
+    parser.add_argument("--letters-per-user", type=int, default=500)
+    parser.add_argument("--postings", type=int, default=5000, help="Distinct job descriptions")
+    parser.add_argument("--searches", type=int, default=50, help="Searches per query")
+    args = parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    _seed(args.rows, args.letters_per_user, args.postings)
+    print(f"Seeded {args.rows:,} letters in {time.perf_counter() - started:.0f}s "
+          f"({os.path.getsize(DB_PATH) / 2 ** 20:.0f} MiB)")
+
+    result = asyncio.run(_run(args))
+    print(f"{'query':>24} {'avg hits':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for query in QUERIES:
+        samples = result["latencies"][query]
+        print(
+            f"{query:>24} {result['hits'][query] / len(samples):>9.1f} "
+            f"{_percentile(samples, 0.50) * 1000:>9.2f} {_percentile(samples, 0.99) * 1000:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark write-heavy load on SQLite with the default and tuned profiles.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_sqlite_writes
+
+Each profile runs in its own process against a fresh database file. Concurrent
+workers create cover letters and update CV profiles through the services, with
+a share of reads mixed in, and throughput, latency percentiles and errors
+(such as "database is locked") are reported per profile.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+JOB_DESCRIPTION = "We are looking for a backend engineer with strong Python and async experience."
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _run_profile(args) -> dict:
+    # Imported here so the engines are built from this process's environment
+    import app.models  # noqa: F401
+    from app.core.database import dispose_engines
+    from app.core.init_db import init_db
+
+    init_db()
+    try:
+        return await _run_workload(args)
+    finally:
+        # Pooled aiosqlite connections keep their threads (and the process) alive
+        await dispose_engines()
+
+
+async def _run_workload(args) -> dict:
+    from app.core.database import AsyncSessionLocal
+    from app.schemas.cover_letter import CoverLetterCreate
+    from app.schemas.cv_profile import CVProfileCreate, CVProfileUpdate
+    from app.schemas.user import UserCreate
+    from app.services import cover_letter_service, cv_service, user_service
+
+    seeded = []
+    async with AsyncSessionLocal() as db:
+        for worker in range(args.concurrency):
+            user = await user_service.create_user(db, UserCreate(name="Bench", email=f"bench-{worker}@example.com"))
+            profile = await cv_service.create_cv_profile(db, CVProfileCreate(user_id=user.id, full_name="Bench User"))
+            letter = await cover_letter_service.create_cover_letter(db, CoverLetterCreate(
+                user_id=user.id, title="Seed letter", job_title="Engineer",
+                job_description=JOB_DESCRIPTION, content="Dear Hiring Manager, ..."
+            ))
+            seeded.append((user.id, profile.id, letter.id))
+
+    write_latencies, read_latencies = [], []
+    errors = Counter()
+    stop_at = time.perf_counter() + args.duration
+    rng = random.Random(7)
+
+    async def worker(user_id: int, profile_id: int, letter_id: int):
+        operation = 0
+        while time.perf_counter() < stop_at:
+            operation += 1
+            is_write = rng.random() < args.write_fraction
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    if not is_write:
+                        await cover_letter_service.get_cover_letter(db, cover_letter_id=letter_id)
+                    elif operation % 4:
+                        await cover_letter_service.create_cover_letter(db, CoverLetterCreate(
+                            user_id=user_id, title="Bench letter", job_title="Engineer",
+                            job_description=JOB_DESCRIPTION, content="Dear Hiring Manager, ..."
+                        ))
+                    else:
+                        profile = await cv_service.get_cv_profile(db, profile_id=profile_id)
+                        await cv_service.update_cv_profile(db, profile, CVProfileUpdate(summary=f"Revision {operation}"))
+            except Exception as e:
+                errors[str(e).splitlines()[0][:80]] += 1
+                continue
+            (write_latencies if is_write else read_latencies).append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(*ids) for ids in seeded))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "ops_per_second": (len(write_latencies) + len(read_latencies)) / elapsed,
+        "write_p50": _percentile(write_latencies, 0.50),
+        "write_p99": _percentile(write_latencies, 0.99),
+        "read_p99": _percentile(read_latencies, 0.99),
+        "errors": sum(errors.values()),
+        "error_kinds": dict(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=["default", "tuned"], choices=["default", "tuned"])
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per profile")
+    parser.add_argument("--write-fraction", type=float, default=0.9, help="Share of operations that write")
+    parser.add_argument("--run-profile", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_profile:
+        print(json.dumps(asyncio.run(_run_profile(args))))
+        return
+
+    print(f"{args.concurrency} workers, {args.write_fraction:.0%} writes, {args.duration:.0f}s per profile")
+    print(f"{'profile':>8} {'ops/s':>8} {'write p50 (ms)':>15} {'write p99 (ms)':>15} {'read p99 (ms)':>14} {'errors':>7}")
+    for profile in args.profiles:
+        database_path = os.path.join(tempfile.mkdtemp(prefix="bench-sqlite-writes-"), "benchmark.db")
+        env = {
+            **os.environ,
+            "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+            "DATABASE_URL": f"sqlite:///{database_path}",
+            "SQLITE_PROFILE": profile,
+        }
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sqlite_writes", "--run-profile", profile,
+             "--concurrency", str(args.concurrency), "--duration", str(args.duration),
+             "--write-fraction", str(args.write_fraction)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{profile:>8} {result['ops_per_second']:>8.1f} {result['write_p50'] * 1000:>15.1f} "
+            f"{result['write_p99'] * 1000:>15.1f} {result['read_p99'] * 1000:>14.1f} {result['errors']:>7}"
+        )
+        for error, count in result["error_kinds"].items():
+            print(f"{'':>8} {count} x {error}")
+
+
+if __name__ == "__main__":
+    main()
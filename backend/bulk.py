@@ -0,0 +1,61 @@
+"""Import or export users, CV profiles and cover letters as NDJSON.
+
+Run from the backend directory:
+
+    python bulk.py import cohort.ndjson > report.ndjson
+    python bulk.py export 12 13 > users.ndjson
+
+Import lines and the streamed report use the same format as
+`POST /api/v1/bulk/import`; export writes the lines of
+`GET /api/v1/bulk/export/{user_id}` for each user in turn.
+"""
+import argparse
+import asyncio
+import contextlib
+import sys
+
+from app.core.config import get_settings
+from app.core.database import dispose_engines
+from app.core.init_db import init_db
+from app.services import bulk_service
+
+
+async def _import(path: str) -> None:
+    with open(path, "rb") as lines:
+        async for report_line in bulk_service.import_records(lines, get_settings()):
+            sys.stdout.write(report_line)
+
+
+async def _export(user_ids: list) -> None:
+    for user_id in user_ids:
+        async for line in bulk_service.export_user_records(user_id, get_settings()):
+            sys.stdout.write(line)
+
+
+async def _run(args) -> None:
+    try:
+        if args.command == "import":
+            await _import(args.path)
+        else:
+            await _export(args.user_ids)
+    finally:
+        await dispose_engines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import an NDJSON file, writing a report line per input line")
+    import_parser.add_argument("path")
+    export_parser = commands.add_parser("export", help="Write users' data as NDJSON to stdout")
+    export_parser.add_argument("user_ids", nargs="+", type=int)
+    args = parser.parse_args()
+    
+    # Keep stdout for NDJSON only
+    with contextlib.redirect_stdout(sys.stderr):
+        init_db()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+
+# Settings and engines are created at import time, so the environment is set first
+_db_dir = tempfile.mkdtemp(prefix="cv-generator-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["GOOGLE_API_KEY"] = "test"
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ["FAKE_LLM_LATENCY_DISTRIBUTION"] = "fixed"
+os.environ["FAKE_LLM_LATENCY_MS"] = "0"
+os.environ["FAKE_LLM_STREAM_CHUNK_MS"] = "0"
+
+import itertools  # noqa: E402
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.core.config import Settings, get_settings  # noqa: E402
+from app.core.database import AsyncSessionLocal, dispose_engines  # noqa: E402
+from app.core.init_db import init_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+_emails = itertools.count()
+
+JOB_DESCRIPTION = "We are looking for a backend engineer with strong Python and async experience."
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the schema once in a fresh SQLite file"""
+    init_db()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def settings() -> Settings:
+    return get_settings()
+
+
+@pytest.fixture
+async def db():
+    """An async session; pooled connections are closed since each test has its own event loop"""
+    async with AsyncSessionLocal() as session:
+        yield session
+    await dispose_engines()
+
+
+@pytest.fixture
+async def client():
+    """An HTTP client for the app, run with its lifespan"""
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as http_client:
+        yield http_client
+
+
+@pytest.fixture
+async def user_with_cv(client) -> int:
+    """Create a user with a CV profile and return the user's ID"""
+    user = (await client.post("/api/v1/users/", json={
+        "name": "Test User", 
+        "email": f"user-{next(_emails)}@example.com"
+    })).json()
+    response = await client.post("/api/v1/cv/profile", json={
+        "user_id": user["id"],
+        "full_name": "Test User",
+        "summary": "Backend engineer with 7 years of Python experience.",
+        "skills": [{"name": "Python", "proficiency": "Advanced", "category": "Programming"}],
+        "experience": [{"title": "Senior Engineer", "company": "Acme", "start_date": "2019"}],
+    })
+    response.raise_for_status()
+    return user["id"]
+
+
+@pytest.fixture
+def job_description() -> str:
+    """A job description long enough to pass request validation"""
+    return JOB_DESCRIPTION
+
+
+@pytest.fixture
+def create_letter(client, job_description):
+    """Save a cover letter through the API and return its ID; fields override the defaults"""
+    async def create(user_id: int, title: str = "Backend Engineer at Tech Corp", **fields) -> int:
+        response = await client.post("/api/v1/cover-letters/", json={
+            "user_id": user_id,
+            "title": title,
+            "job_title": "Backend Engineer",
+            "company_name": "Tech Corp",
+            "job_description": job_description,
+            "content": "Dear Hiring Manager, I build reliable services.",
+            **fields
+        })
+        response.raise_for_status()
+        return response.json()["id"]
+    
+    return create
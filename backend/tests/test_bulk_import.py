@@ -0,0 +1,87 @@
+import json
+import itertools
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services import job_posting_service
+
+pytestmark = pytest.mark.anyio
+
+_emails = itertools.count()
+
+
+def _user(email: str) -> dict:
+    return {"type": "user", "name": "Imported User", "email": email}
+
+
+def _cover_letter(email: str, job_description: str) -> dict:
+    return {
+        "type": "cover_letter",
+        "user_email": email,
+        "title": "Imported letter",
+        "job_title": "Backend Engineer",
+        "job_description": job_description,
+        "content": "Dear Hiring Manager, ...",
+    }
+
+
+async def _import(client, lines: list) -> list:
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n"
+    response = await client.post("/api/v1/bulk/import", content=body)
+    response.raise_for_status()
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_report_has_one_line_per_input_line(client, job_description):
+    email = f"import-{next(_emails)}@example.com"
+    reports = await _import(client, [
+        _user(email),
+        "{not json",
+        "",
+        {"type": "user", "name": "No email"},
+        _user(email),
+        _cover_letter("missing@example.com", job_description),
+        _cover_letter(email, job_description),
+    ])
+    
+    *line_reports, complete = reports
+    assert [(report["line"], report["status"]) for report in line_reports] == [
+        (1, "created"), (2, "error"), (4, "error"), (5, "error"), (6, "error"), (7, "created")
+    ]
+    assert "Invalid JSON" in line_reports[1]["error"]
+    assert line_reports[2]["error"] == "user.email: Field required"
+    assert line_reports[3]["error"] == "User with this email already exists"
+    assert line_reports[4]["error"] == "User not found"
+    assert line_reports[5]["type"] == "cover_letter"
+    assert complete == {
+        "status": "complete", 
+        "created": {"users": 1, "cv_profiles": 0, "cover_letters": 1}, 
+        "failed": 4
+    }
+
+
+async def test_rejected_chunk_fails_each_of_its_lines(client, settings, monkeypatch, job_description):
+    monkeypatch.setattr(settings, "bulk_import_chunk_size", 2)
+    first, second = (f"import-{next(_emails)}@example.com" for _ in range(2))
+    
+    async def broken_postings(db, descriptions):
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+    
+    monkeypatch.setattr(job_posting_service, "get_or_create_job_postings", broken_postings)
+    reports = await _import(client, [
+        _user(first),
+        _user(second),
+        _user(first),
+        _cover_letter(second, job_description),
+    ])
+    
+    *line_reports, complete = reports
+    # The first chunk commits; the second is rolled back, keeping its own validation error
+    assert [(report["line"], report["status"]) for report in line_reports] == [
+        (1, "created"), (2, "created"), (3, "error"), (4, "error")
+    ]
+    assert line_reports[2]["error"] == "User with this email already exists"
+    assert line_reports[3]["error"] == "Failed to import: database is locked"
+    assert complete["created"] == {"users": 2, "cv_profiles": 0, "cover_letters": 0}
+    assert complete["failed"] == 2
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import circuit_breaker
+from app.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN
+)
+
+
+class UpstreamError(Exception):
+    pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def _breaker(**overrides) -> CircuitBreaker:
+    options = {
+        "failure_threshold": 3,
+        "error_rate_threshold": 0.5,
+        "window_size": 10,
+        "min_calls": 6,
+        "open_seconds": 30,
+        "half_open_max_calls": 1,
+        "is_failure": lambda error: isinstance(error, UpstreamError),
+    }
+    options.update(overrides)
+    return CircuitBreaker(**options)
+
+
+def _fail(breaker: CircuitBreaker, error: Exception = None) -> None:
+    with pytest.raises(type(error or UpstreamError())):
+        with breaker.call():
+            raise error or UpstreamError()
+
+
+def _succeed(breaker: CircuitBreaker) -> None:
+    with breaker.call():
+        pass
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    breaker = _breaker()
+    _fail(breaker)
+    _fail(breaker)
+    assert breaker.state == STATE_CLOSED
+    
+    _fail(breaker)
+    
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        _succeed(breaker)
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == "30"
+    assert breaker.rejected_calls == 1
+
+
+def test_error_rate_opens_the_circuit(clock):
+    breaker = _breaker(failure_threshold=100)
+    for _ in range(3):
+        _succeed(breaker)
+        _fail(breaker)
+    
+    assert breaker.state == STATE_OPEN
+    assert breaker.error_rate == 0.5
+
+
+def test_errors_that_are_not_upstream_failures_are_ignored(clock):
+    breaker = _breaker()
+    for _ in range(5):
+        _fail(breaker, ValueError("bad request"))
+    
+    assert breaker.state == STATE_CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        _fail(breaker)
+    
+    clock.now += 30
+    breaker.check()
+    assert breaker.state == STATE_HALF_OPEN
+    _succeed(breaker)
+    
+    assert breaker.state == STATE_CLOSED
+    assert breaker.error_rate == 0
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        _fail(breaker)
+    
+    clock.now += 30
+    _fail(breaker)
+    
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.check()
+    assert error.value.retry_after == 30
+
+
+def test_half_open_admits_a_limited_number_of_probes(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        _fail(breaker)
+    clock.now += 30
+    
+    with breaker.call():
+        assert breaker.state == STATE_HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+    
+    assert breaker.state == STATE_CLOSED
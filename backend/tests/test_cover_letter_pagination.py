@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import func, update
+
+from app.models.cover_letter import CoverLetter
+
+pytestmark = pytest.mark.anyio
+
+async def _create_letters(create_letter, user_id: int, count: int) -> list:
+    return [await create_letter(user_id, f"Letter {index}") for index in range(count)]
+
+
+async def _put_in_same_second(db, ids: list) -> None:
+    """Give letters one timestamp, written the way the server default writes it"""
+    await db.execute(update(CoverLetter).where(CoverLetter.id.in_(ids)).values(created_at=func.now()))
+    await db.commit()
+
+
+async def _page(client, user_id: int, cursor=None) -> dict:
+    params = {"limit": 2}
+    if cursor:
+        params["cursor"] = cursor
+    response = await client.get(f"/api/v1/cover-letters/user/{user_id}", params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def test_pages_split_letters_created_in_the_same_second(client, user_with_cv, db, create_letter):
+    ids = await _create_letters(create_letter, user_with_cv, 5)
+    await _put_in_same_second(db, ids)
+    
+    seen, cursor = [], None
+    while True:
+        page = await _page(client, user_with_cv, cursor)
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    
+    assert seen == sorted(ids, reverse=True)
+
+
+async def test_cursor_stays_valid_when_letters_change_between_pages(client, user_with_cv, db, create_letter):
+    ids = await _create_letters(create_letter, user_with_cv, 5)
+    await _put_in_same_second(db, ids)
+    
+    first = await _page(client, user_with_cv)
+    assert [item["id"] for item in first["items"]] == [ids[4], ids[3]]
+    
+    # A newer letter and the deletion of the cursor row must not shift the next page
+    await _create_letters(create_letter, user_with_cv, 1)
+    (await client.delete(f"/api/v1/cover-letters/{ids[3]}")).raise_for_status()
+    
+    second = await _page(client, user_with_cv, first["next_cursor"])
+    assert [item["id"] for item in second["items"]] == [ids[2], ids[1]]
+
+
+async def test_invalid_cursor_is_rejected(client, user_with_cv):
+    response = await client.get(f"/api/v1/cover-letters/user/{user_with_cv}", params={"cursor": "not-a-cursor"})
+    
+    assert response.status_code == 400
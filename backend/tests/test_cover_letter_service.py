@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.llm import get_llm_client
+from app.core.llm_providers import FakeLLMProvider, LLMOutput
+from app.schemas.cover_letter import CoverLetterGenerate
+from app.services import cover_letter_service, generation_cache_service, token_usage_service
+from app.services.cv_prompt_service import get_prompt_summary_for_job
+from app.services.cv_service import get_cv_profile_by_user
+
+pytestmark = pytest.mark.anyio
+
+async def test_single_flight_shares_one_call_between_concurrent_callers():
+    calls = 0
+    release = asyncio.Event()
+    
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "letter"
+    
+    first = asyncio.ensure_future(cover_letter_service._generate_single_flight("shared", generate))
+    second = asyncio.ensure_future(cover_letter_service._generate_single_flight("shared", generate))
+    await asyncio.sleep(0)
+    release.set()
+    
+    assert await first == ("letter", False)
+    assert await second == ("letter", True)
+    assert calls == 1
+    assert "shared" not in cover_letter_service._inflight_generations
+
+
+async def test_single_flight_call_survives_a_cancelled_leader():
+    release = asyncio.Event()
+    
+    async def generate():
+        await release.wait()
+        return "letter"
+    
+    leader = asyncio.ensure_future(cover_letter_service._generate_single_flight("cancelled", generate))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(cover_letter_service._generate_single_flight("cancelled", generate))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+    
+    assert await follower == ("letter", True)
+
+
+async def test_cancelled_leader_still_caches_and_charges_the_call(client, user_with_cv, db, settings, monkeypatch, job_description):
+    monkeypatch.setattr(settings, "fake_llm_latency_ms", 50)
+    cv_profile = await get_cv_profile_by_user(db, user_with_cv)
+    request = CoverLetterGenerate(user_id=user_with_cv, job_title="Backend Engineer", job_description=job_description)
+    cv_prompt = get_prompt_summary_for_job(cv_profile, request.job_description, settings)
+    llm_client = get_llm_client()
+    cache_key = cover_letter_service._build_generation_key(cv_prompt.hash, request, settings, llm_client)
+    
+    leader = asyncio.ensure_future(cover_letter_service._generate_content(
+        db, cv_profile, cv_prompt, request, settings, llm_client
+    ))
+    while cache_key not in cover_letter_service._inflight_generations:
+        await asyncio.sleep(0.001)
+    call = cover_letter_service._inflight_generations[cache_key]
+    leader.cancel()
+    content = await call
+    
+    assert leader.cancelled()
+    assert await generation_cache_service.get_cached_content(db, cache_key, settings) == content
+    usage = await token_usage_service.get_usage(db, user_with_cv, settings)
+    assert usage.calls == 1
+    assert usage.total_tokens > 0
+
+
+async def test_batch_saves_the_letters_that_pass_validation(client, user_with_cv, monkeypatch, job_description):
+    original_generate = FakeLLMProvider.generate
+    
+    async def generate(self, prompt, model, response_schema=None):
+        output = await original_generate(self, prompt, model, response_schema)
+        if "Overlong Engineer" in prompt:
+            return output._replace(text="x" * 1600)
+        return output
+    
+    monkeypatch.setattr(FakeLLMProvider, "generate", generate)
+    jobs = [
+        {"job_title": title, "job_description": job_description}
+        for title in ["Backend Engineer", "Overlong Engineer", "Platform Engineer", "Data Engineer"]
+    ]
+    response = await client.post("/api/v1/cover-letters/batch", json={"user_id": user_with_cv, "jobs": jobs})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    
+    errors = [line for line in lines if line.get("status") == "error"]
+    assert errors == [{"index": 1, "status": "error", "error": "The generated cover letter is longer than allowed"}]
+    complete = lines[-1]
+    assert complete["status"] == "complete"
+    assert (complete["succeeded"], complete["failed"]) == (3, 1)
+    assert sorted(letter["index"] for letter in complete["cover_letters"]) == [0, 2, 3]
+
+
+def _variants_reply(monkeypatch, contents: list) -> None:
+    async def generate(self, prompt, model, response_schema=None):
+        text = json.dumps({"variants": [
+            {"emphasis": f"Variant {index}", "content": content} for index, content in enumerate(contents)
+        ]})
+        return LLMOutput(text, 100, 100)
+    
+    monkeypatch.setattr(FakeLLMProvider, "generate", generate)
+
+
+async def test_variants_longer_than_allowed_are_dropped(client, user_with_cv, monkeypatch, job_description):
+    _variants_reply(monkeypatch, ["Dear Hiring Manager, first.", "x" * 1600, "Dear Hiring Manager, third."])
+    
+    response = await client.post("/api/v1/cover-letters/generate", json={
+        "user_id": user_with_cv, 
+        "job_title": "Backend Engineer", 
+        "job_description": job_description, 
+        "variants": 3
+    })
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["content"] == "Dear Hiring Manager, first."
+    assert [letter["content"] for letter in body["alternatives"]] == ["Dear Hiring Manager, third."]
+
+
+async def test_no_usable_variants_is_a_bad_gateway(client, user_with_cv, monkeypatch, job_description):
+    _variants_reply(monkeypatch, ["x" * 1600, "y" * 1600])
+    
+    response = await client.post("/api/v1/cover-letters/generate", json={
+        "user_id": user_with_cv, 
+        "job_title": "Backend Engineer", 
+        "job_description": job_description, 
+        "variants": 2
+    })
+    
+    assert response.status_code == 502
@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.entity_cache import CV_PROFILE_CACHE, USER_CACHE, EntityCache, MemoryBackend, get_entity_cache
+
+pytestmark = pytest.mark.anyio
+
+
+class BrokenBackend:
+    async def get(self, key):
+        raise ConnectionError("cache is down")
+
+    async def get_version(self, key):
+        raise ConnectionError("cache is down")
+
+
+async def test_updating_a_user_invalidates_the_cached_user(client, user_with_cv):
+    first = (await client.get(f"/api/v1/users/{user_with_cv}")).json()
+    assert await get_entity_cache(USER_CACHE).get(user_with_cv) is not None
+    
+    response = await client.put(f"/api/v1/users/{user_with_cv}", json={"name": "Renamed User"})
+    response.raise_for_status()
+    
+    assert await get_entity_cache(USER_CACHE).get(user_with_cv) is None
+    second = (await client.get(f"/api/v1/users/{user_with_cv}")).json()
+    assert first["name"] == "Test User"
+    assert second["name"] == "Renamed User"
+
+
+async def test_updating_a_cv_profile_invalidates_the_profile_and_the_user(client, user_with_cv):
+    profile = (await client.get(f"/api/v1/cv/profile/user/{user_with_cv}")).json()
+    await client.get(f"/api/v1/users/{user_with_cv}")
+    
+    response = await client.put(f"/api/v1/cv/profile/{profile['id']}", json={"summary": "Now a data engineer."})
+    response.raise_for_status()
+    
+    assert await get_entity_cache(CV_PROFILE_CACHE).get(user_with_cv) is None
+    assert await get_entity_cache(USER_CACHE).get(user_with_cv) is None
+    updated = (await client.get(f"/api/v1/cv/profile/user/{user_with_cv}")).json()
+    assert updated["summary"] == "Now a data engineer."
+
+
+async def test_row_read_before_an_invalidation_is_not_cached(settings):
+    cache = EntityCache("race", MemoryBackend(settings))
+    
+    # A reader takes the version and queries the row; a writer commits and invalidates
+    version = await cache.version(1)
+    await cache.invalidate(1)
+    await cache.set(1, {"name": "stale"}, version)
+    
+    assert await cache.get(1) is None
+    
+    await cache.set(1, {"name": "fresh"}, await cache.version(1))
+    assert await cache.get(1) == {"name": "fresh"}
+
+
+async def test_backend_errors_are_treated_as_misses():
+    cache = EntityCache("broken", BrokenBackend())
+    
+    assert await cache.get(1) is None
+    version = await cache.version(1)
+    assert version is None
+    await cache.set(1, {"name": "ignored"}, version)
+    
+    assert cache.snapshot()["errors"] == 2
+    assert cache.snapshot()["misses"] == 1
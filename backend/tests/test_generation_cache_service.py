@@ -0,0 +1,62 @@
+import time
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.models.generation_cache import GenerationCacheEntry
+from app.schemas.cover_letter import CoverLetterGenerate
+from app.services import generation_cache_service
+
+pytestmark = pytest.mark.anyio
+
+def _request(job_description: str) -> CoverLetterGenerate:
+    return CoverLetterGenerate(user_id=1, job_title="Backend Engineer", job_description=job_description)
+
+
+def _key(settings, job_description: str) -> str:
+    return generation_cache_service.build_generation_key(
+        "cv-hash", _request(job_description), "template", "model", settings
+    )
+
+
+def test_generation_key_changes_with_prompt_settings(settings, job_description):
+    key = _key(settings, job_description)
+    
+    assert _key(settings, job_description) == key
+    assert _key(settings.model_copy(update={"llm_prompt_token_budget": 100}), job_description) != key
+    assert _key(settings.model_copy(update={"cv_prompt_token_budget": 100}), job_description) != key
+    assert _key(settings.model_copy(update={"cv_trim_enabled": False}), job_description) != key
+
+
+async def test_prune_runs_once_per_interval(db, settings, monkeypatch):
+    settings = settings.model_copy(update={"generation_cache_prune_interval": 3})
+    pruned = []
+    
+    async def record_prune(db, settings):
+        pruned.append(True)
+    
+    monkeypatch.setattr(generation_cache_service, "_prune_entries", record_prune)
+    monkeypatch.setattr(generation_cache_service, "_stores_since_prune", 0)
+    for index in range(7):
+        await generation_cache_service.store_content(db, f"interval-{index}", "model", "content", settings)
+    
+    assert len(pruned) == 2
+
+
+async def test_prune_deletes_expired_and_soonest_expiring_entries(db, settings):
+    settings = settings.model_copy(update={"generation_cache_db_max_entries": 3})
+    await db.execute(delete(GenerationCacheEntry))
+    now = time.time()
+    db.add(GenerationCacheEntry(key="expired", model="model", content="content", expires_at=now - 1))
+    for index in range(5):
+        db.add(GenerationCacheEntry(key=f"entry-{index}", model="model", content="content", expires_at=now + 60 + index))
+    await db.flush()
+    
+    await generation_cache_service._prune_entries(db, settings)
+    await db.commit()
+    
+    keys = set(await db.scalars(select(GenerationCacheEntry.key)))
+    assert keys == {"entry-2", "entry-3", "entry-4"}
+    
+    await generation_cache_service._prune_entries(db, settings)
+    assert await db.scalar(select(func.count()).select_from(GenerationCacheEntry)) == 3
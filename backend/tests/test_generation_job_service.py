@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app.core.llm import get_llm_client
+from app.models.generation_job import GenerationJob, JOB_STATUS_FAILED, JOB_STATUS_QUEUED
+from app.services import cv_service, generation_job_service
+
+pytestmark = pytest.mark.anyio
+
+async def _queued_job(db, user_id: int, job_description: str) -> int:
+    db_job = GenerationJob(
+        user_id=user_id,
+        status=JOB_STATUS_QUEUED,
+        request={"user_id": user_id, "job_title": "Backend Engineer", "job_description": job_description}
+    )
+    db.add(db_job)
+    await db.commit()
+    return db_job.id
+
+
+async def _finished_job(db, job_id: int) -> GenerationJob:
+    return await db.scalar(
+        select(GenerationJob).where(GenerationJob.id == job_id).execution_options(populate_existing=True)
+    )
+
+
+async def test_job_fails_when_the_cv_profile_is_deleted_after_enqueue(client, user_with_cv, db, settings, job_description):
+    job_id = await _queued_job(db, user_with_cv, job_description)
+    await cv_service.delete_cv_profile(db, await cv_service.get_cv_profile_by_user(db, user_with_cv))
+    
+    await generation_job_service._run_job(job_id, settings, get_llm_client())
+    
+    db_job = await _finished_job(db, job_id)
+    assert db_job.status == JOB_STATUS_FAILED
+    assert db_job.error == "CV profile not found for user"
+    assert db_job.finished_at is not None
+
+
+async def test_job_fails_on_an_unexpected_error(client, user_with_cv, db, settings, monkeypatch, job_description):
+    job_id = await _queued_job(db, user_with_cv, job_description)
+    
+    async def broken_lookup(db, user_id):
+        raise OperationalError("SELECT", {}, Exception("disk I/O error"))
+    
+    monkeypatch.setattr(cv_service, "get_cv_profile_by_user", broken_lookup)
+    await generation_job_service._run_job(job_id, settings, get_llm_client())
+    
+    db_job = await _finished_job(db, job_id)
+    assert db_job.status == JOB_STATUS_FAILED
+    assert "disk I/O error" in db_job.error
+    assert db_job.finished_at is not None
@@ -0,0 +1,44 @@
+import pytest
+
+from app.core.llm_providers import GeminiProvider, LLMOutput, LLMProvider
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_gemini_provider_sdk_clients_use_its_transports(settings):
+    provider = GeminiProvider(settings)
+    http_options = provider._client._api_client._http_options
+    assert http_options.client_args["transport"] is provider._transport
+    assert http_options.async_client_args["transport"] is provider._async_transport
+    await provider.aclose()
+
+
+async def test_gemini_provider_aclose_closes_its_transports(settings, monkeypatch):
+    provider = GeminiProvider(settings)
+    closed = []
+    original_aclose = provider._async_transport.aclose
+    original_close = provider._transport.close
+
+    async def aclose():
+        closed.append("async")
+        await original_aclose()
+
+    def close():
+        closed.append("sync")
+        original_close()
+
+    monkeypatch.setattr(provider._async_transport, "aclose", aclose)
+    monkeypatch.setattr(provider._transport, "close", close)
+
+    await provider.aclose()
+
+    assert closed == ["async", "sync"]
+
+
+def test_providers_must_implement_generate_and_open_stream():
+    class GenerateOnly(LLMProvider):
+        async def generate(self, prompt, model, response_schema=None):
+            return LLMOutput("letter")
+    
+    with pytest.raises(TypeError):
+        GenerateOnly()
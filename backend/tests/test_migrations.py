@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.database import Base
+from app.core.migrations import run_migrations
+from app.core.search_index import SEARCH_TABLE, create_search_index
+
+LEGACY_COVER_LETTERS = """
+CREATE TABLE cover_letters (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    job_title VARCHAR(255),
+    company_name VARCHAR(255),
+    {job_column},
+    content TEXT NOT NULL,
+    title VARCHAR(255),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME
+)
+"""
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _init(engine) -> None:
+    """The init_db steps, against a given engine"""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    create_search_index(engine)
+
+
+def _job_posting_column(engine) -> dict:
+    return next(column for column in inspect(engine).get_columns("cover_letters") if column["name"] == "job_posting_id")
+
+
+def _search(connection, query: str) -> list:
+    return connection.execute(
+        text(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :query ORDER BY rowid"),
+        {"query": query}
+    ).scalars().all()
+
+
+def test_job_descriptions_move_to_shared_postings(legacy_engine):
+    with legacy_engine.begin() as connection:
+        connection.execute(text(LEGACY_COVER_LETTERS.format(job_column="job_description TEXT NOT NULL")))
+        connection.execute(text(
+            "INSERT INTO cover_letters (id, user_id, job_description, content) VALUES "
+            "(1, 1, 'Python  developer\nwanted', 'first'), "
+            "(2, 1, 'Python developer wanted', 'second'), "
+            "(3, 1, 'Rust developer wanted', 'third')"
+        ))
+    
+    _init(legacy_engine)
+    
+    assert not _job_posting_column(legacy_engine)["nullable"]
+    with legacy_engine.connect() as connection:
+        columns = {column["name"] for column in inspect(connection).get_columns("cover_letters")}
+        assert "job_description" not in columns
+        rows = connection.execute(text(
+            "SELECT cover_letters.id, job_postings.description FROM cover_letters "
+            "JOIN job_postings ON job_postings.id = cover_letters.job_posting_id ORDER BY cover_letters.id"
+        )).all()
+        # Descriptions differing only in whitespace share the posting stored first
+        assert rows == [(1, "Python  developer\nwanted"), (2, "Python  developer\nwanted"), (3, "Rust developer wanted")]
+        assert _search(connection, "python") == [1, 2]
+
+
+def test_nullable_job_posting_id_is_rebuilt_as_required(legacy_engine):
+    with legacy_engine.begin() as connection:
+        connection.execute(text(LEGACY_COVER_LETTERS.format(job_column="job_posting_id INTEGER REFERENCES job_postings(id)")))
+    Base.metadata.create_all(bind=legacy_engine)
+    create_search_index(legacy_engine)
+    with legacy_engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO job_postings (id, content_hash, description) VALUES (1, 'hash', 'Python developer wanted')"
+        ))
+        connection.execute(text(
+            "INSERT INTO cover_letters (id, user_id, job_posting_id, content, title) VALUES "
+            "(5, 1, 1, 'first', 'Letter five'), (9, 1, 1, 'second', 'Letter nine')"
+        ))
+        connection.execute(text(
+            "INSERT INTO generation_jobs (id, user_id, status, request, cover_letter_id) VALUES (1, 1, 'succeeded', '{}', 9)"
+        ))
+    assert _job_posting_column(legacy_engine)["nullable"]
+    
+    _init(legacy_engine)
+    
+    assert not _job_posting_column(legacy_engine)["nullable"]
+    indexes = {index["name"] for index in inspect(legacy_engine).get_indexes("cover_letters")}
+    assert {"ix_cover_letters_user_created_id", "ix_cover_letters_job_posting_id"} <= indexes
+    with legacy_engine.begin() as connection:
+        assert connection.execute(text("SELECT id FROM cover_letters ORDER BY id")).scalars().all() == [5, 9]
+        assert connection.execute(text("SELECT cover_letter_id FROM generation_jobs")).scalar() == 9
+        assert _search(connection, "nine") == [9]
+        
+        # The sync triggers are back on the rebuilt table
+        connection.execute(text("UPDATE cover_letters SET title = 'Renamed' WHERE id = 9"))
+        connection.execute(text("DELETE FROM cover_letters WHERE id = 5"))
+        assert _search(connection, "nine") == []
+        assert _search(connection, "renamed") == [9]
+        assert _search(connection, "five") == []
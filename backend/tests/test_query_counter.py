@@ -0,0 +1,59 @@
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.core import database
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def debug_headers(settings, monkeypatch):
+    monkeypatch.setattr(settings, "debug_headers", True)
+
+
+@pytest.fixture
+def statements():
+    """SQL statements run through the app's engines while the test runs"""
+    executed = []
+    
+    def record(connection, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+    
+    engines = {database.async_engine.sync_engine, database.async_read_engine.sync_engine}
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _reads_from(statements: list, table_name: str) -> list:
+    return [
+        statement for statement in statements
+        if statement.lstrip().upper().startswith("SELECT") and re.search(rf"\bFROM {table_name}\b", statement)
+    ]
+
+
+async def test_get_cover_letter_runs_one_query(client, user_with_cv, create_letter, debug_headers):
+    letter_id = await create_letter(user_with_cv)
+    
+    response = await client.get(f"/api/v1/cover-letters/{letter_id}")
+    
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "1"
+
+
+async def test_generate_loads_the_user_and_cv_profile_once(client, user_with_cv, job_description, settings, monkeypatch, statements):
+    # With the entity cache on, the loads would not reach the database at all
+    monkeypatch.setattr(settings, "entity_cache_enabled", False)
+    
+    response = await client.post("/api/v1/cover-letters/generate", json={
+        "user_id": user_with_cv,
+        "job_title": "Backend Engineer",
+        "job_description": job_description,
+    })
+    
+    assert response.status_code == 200
+    assert len(_reads_from(statements, "users")) == 1
+    assert len(_reads_from(statements, "cv_profiles")) == 1
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.core.rate_limit import LLMRateLimiter, RateLimitExceeded, TokenBucket
+
+pytestmark = pytest.mark.anyio
+
+
+def _limiter(**overrides) -> LLMRateLimiter:
+    options = {"requests_per_minute": 0, "tokens_per_minute": 0, "max_in_flight": 1, "max_queue_depth": 10}
+    options.update(overrides)
+    return LLMRateLimiter(**options)
+
+
+def test_token_bucket_refills_at_its_per_minute_rate():
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0
+    
+    bucket.consume(60)
+    
+    assert bucket.wait_time(1) == pytest.approx(1.0, abs=0.05)
+    # Requests larger than the bucket wait for a full bucket instead of forever
+    assert bucket.wait_time(600) == pytest.approx(60.0, abs=0.05)
+
+
+async def test_waiting_calls_are_admitted_round_robin_across_users():
+    limiter = _limiter()
+    admitted = []
+    release = asyncio.Event()
+    
+    async def call(user_id, name):
+        async with limiter.acquire(user_id, tokens=1):
+            admitted.append(name)
+            await release.wait()
+    
+    holder = asyncio.ensure_future(call("holder", "holder"))
+    await asyncio.sleep(0)
+    calls = [
+        asyncio.ensure_future(call(user_id, name))
+        for user_id, name in [("heavy", "heavy-1"), ("heavy", "heavy-2"), ("heavy", "heavy-3"), ("light", "light-1")]
+    ]
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 4
+    
+    release.set()
+    await asyncio.gather(holder, *calls)
+    
+    assert admitted == ["holder", "heavy-1", "light-1", "heavy-2", "heavy-3"]
+    assert limiter.in_flight == 0
+
+
+async def test_full_queue_fails_fast_with_retry_after():
+    limiter = _limiter(requests_per_minute=60, max_queue_depth=1)
+    limiter.request_bucket.consume(60)
+    waiter = asyncio.ensure_future(limiter._admit("user", 1))
+    await asyncio.sleep(0)
+    
+    with pytest.raises(RateLimitExceeded) as error:
+        await limiter._admit("user", 1)
+    
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "1"
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+
+async def test_token_budget_delays_admission_until_refilled():
+    limiter = _limiter(tokens_per_minute=6000, max_in_flight=10)
+    limiter.token_bucket.consume(6000)
+    
+    started = asyncio.get_running_loop().time()
+    async with limiter.acquire("user", tokens=10):
+        waited = asyncio.get_running_loop().time() - started
+    
+    assert waited == pytest.approx(0.1, abs=0.05)
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = _limiter()
+    async with limiter.acquire("holder", tokens=1):
+        waiter = asyncio.ensure_future(limiter._admit("user", 1))
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+        
+        waiter.cancel()
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 0
+    
+    assert limiter.in_flight == 0
@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+from google.genai import errors
+
+from app.core.llm import LLMClient
+from app.core.llm_providers import FakeLLMProvider, LLMOutput
+from app.core.resilience import LLMTimeoutError, ResilienceMetrics, call_with_resilience
+from app.core.tokens import TokenUsage
+from app.schemas.cover_letter import CoverLetterGenerate
+from app.services import cover_letter_service
+
+pytestmark = pytest.mark.anyio
+
+def _server_error() -> errors.ServerError:
+    return errors.ServerError(503, {"error": {"message": "Unavailable", "status": "UNAVAILABLE"}})
+
+
+@pytest.fixture
+def fast_settings(settings):
+    return settings.model_copy(update={
+        "llm_backoff_base": 0.001,
+        "llm_backoff_max": 0.001,
+        "llm_requests_per_minute": 0,
+        "llm_tokens_per_minute": 0,
+    })
+
+
+async def test_transient_errors_are_retried(fast_settings):
+    metrics = ResilienceMetrics()
+    outcomes = [_server_error(), _server_error(), "letter"]
+    
+    async def attempt():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    assert await call_with_resilience(attempt, fast_settings, metrics) == "letter"
+    assert metrics.attempts == 3
+    assert metrics.retries == 2
+
+
+async def test_retries_stop_after_the_limit(fast_settings):
+    metrics = ResilienceMetrics()
+    
+    async def attempt():
+        raise _server_error()
+    
+    with pytest.raises(errors.ServerError):
+        await call_with_resilience(attempt, fast_settings.model_copy(update={"llm_max_retries": 1}), metrics)
+    assert metrics.attempts == 2
+    assert metrics.failures == 1
+
+
+async def test_non_retryable_errors_fail_immediately(fast_settings):
+    metrics = ResilienceMetrics()
+    
+    async def attempt():
+        raise errors.ClientError(400, {"error": {"message": "Bad request", "status": "INVALID_ARGUMENT"}})
+    
+    with pytest.raises(errors.ClientError):
+        await call_with_resilience(attempt, fast_settings, metrics)
+    assert metrics.attempts == 1
+
+
+async def test_overall_deadline_maps_to_504(fast_settings):
+    settings = fast_settings.model_copy(update={"llm_attempt_timeout": 0.02, "llm_total_timeout": 0.05})
+    metrics = ResilienceMetrics()
+    
+    async def attempt():
+        await asyncio.sleep(1)
+    
+    with pytest.raises(LLMTimeoutError) as error:
+        await call_with_resilience(attempt, settings, metrics)
+    assert error.value.status_code == 504
+    assert metrics.attempt_timeouts >= 1
+
+
+async def test_winning_hedge_cancels_the_primary(fast_settings):
+    settings = fast_settings.model_copy(update={"llm_hedge_enabled": True, "llm_hedge_delay": 0.01})
+    metrics = ResilienceMetrics()
+    primary_cancelled = asyncio.Event()
+    calls = 0
+    
+    async def attempt():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+            return "primary"
+        return "hedge"
+    
+    assert await call_with_resilience(attempt, settings, metrics) == "hedge"
+    await asyncio.wait_for(primary_cancelled.wait(), 0.1)
+    assert metrics.hedges_started == 1
+    assert metrics.hedge_wins == 1
+
+
+class _HedgedProvider(FakeLLMProvider):
+    """Slow first call, fast second call, each reporting its own token counts"""
+
+    async def generate(self, prompt, model, response_schema=None):
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(1)
+            return LLMOutput("primary", 1000, 1000)
+        return LLMOutput("hedge", 10, 20)
+
+
+async def test_only_the_winning_attempt_is_charged(fast_settings):
+    settings = fast_settings.model_copy(update={"llm_hedge_enabled": True, "llm_hedge_delay": 0.01})
+    llm_client = LLMClient(settings, provider=_HedgedProvider(settings))
+    usage = TokenUsage()
+    
+    assert await llm_client.generate("prompt", usage=usage) == "hedge"
+    
+    assert (usage.prompt_tokens, usage.output_tokens) == (10, 20)
+    assert llm_client.limiter.in_flight == 0
+
+
+async def test_stream_times_out_waiting_for_a_chunk(fast_settings):
+    settings = fast_settings.model_copy(update={"fake_llm_stream_chunk_ms": 200, "llm_attempt_timeout": 0.05})
+    llm_client = LLMClient(settings, provider=FakeLLMProvider(settings))
+    
+    with pytest.raises(LLMTimeoutError):
+        async for _ in llm_client.stream("prompt"):
+            pass
+    assert llm_client.limiter.in_flight == 0
+
+
+async def test_stream_times_out_at_the_overall_deadline(fast_settings):
+    settings = fast_settings.model_copy(update={"fake_llm_stream_chunk_ms": 20, "llm_total_timeout": 0.1})
+    llm_client = LLMClient(settings, provider=FakeLLMProvider(settings))
+    chunks = []
+    
+    with pytest.raises(LLMTimeoutError):
+        async for chunk in llm_client.stream("prompt"):
+            chunks.append(chunk)
+    assert 0 < len(chunks) < 10
+
+
+async def test_stream_timeout_is_sent_as_a_504_error_event(fast_settings, job_description):
+    settings = fast_settings.model_copy(update={"fake_llm_stream_chunk_ms": 200, "llm_attempt_timeout": 0.05})
+    llm_client = LLMClient(settings, provider=FakeLLMProvider(settings))
+    request = CoverLetterGenerate(user_id=1, job_title="Backend Engineer", job_description=job_description)
+    
+    events = [
+        event async for event in cover_letter_service._stream_cover_letter_events(
+            "prompt", request, settings, llm_client, "cache-key", None
+        )
+    ]
+    
+    assert len(events) == 1
+    assert events[0].startswith("event: error\n")
+    data = json.loads(events[0].split("data: ", 1)[1])
+    assert data["status_code"] == 504
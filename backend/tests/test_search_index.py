@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import database
+from app.core.search_index import SEARCH_TABLE
+from app.schemas.user import UserCreate
+from app.services import cover_letter_service, user_service
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def tuned_sessions(settings, monkeypatch):
+    """Sessions routed as under SQLITE_PROFILE=tuned: one writer connection and a read pool"""
+    monkeypatch.setattr(settings, "sqlite_profile", "tuned")
+    monkeypatch.setattr(settings, "sqlite_write_timeout", 1)
+    writer = database.get_async_engine.__wrapped__()
+    reader = database.get_async_read_engine.__wrapped__()
+    monkeypatch.setattr(database, "async_engine", writer)
+    monkeypatch.setattr(database, "async_read_engine", reader)
+    yield async_sessionmaker(
+        bind=writer, 
+        sync_session_class=database.RoutingSession, 
+        autoflush=False, 
+        expire_on_commit=False
+    )
+    await writer.dispose()
+    await reader.dispose()
+
+
+async def _indexed_ids(db, user_id: int, word: str) -> list:
+    """Letters the full-text index holds for a user and a word, read from the index itself"""
+    result = await db.execute(
+        text(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match ORDER BY rowid"),
+        {"match": f'owner:"u{user_id}" AND "{word}"'}
+    )
+    return result.scalars().all()
+
+
+async def _search(client, user_id: int, query: str) -> list:
+    response = await client.get(f"/api/v1/cover-letters/user/{user_id}/search", params={"q": query})
+    response.raise_for_status()
+    return [hit["id"] for hit in response.json()["items"]]
+
+
+async def test_inserted_letters_are_searchable(client, user_with_cv, create_letter):
+    letter_id = await create_letter(
+        user_with_cv, "Platform application", 
+        job_description="Join our platform team to run Kubernetes clusters for hundreds of services."
+    )
+    
+    assert await _search(client, user_with_cv, "platform") == [letter_id]
+    # The job description comes from the shared posting
+    assert await _search(client, user_with_cv, "kubernetes") == [letter_id]
+    assert await _search(client, user_with_cv, "services") == [letter_id]
+
+
+async def test_updates_replace_the_indexed_text(client, user_with_cv, create_letter):
+    letter_id = await create_letter(user_with_cv, "Original heading")
+    
+    response = await client.put(f"/api/v1/cover-letters/{letter_id}", json={
+        "title": "Revised heading",
+        "content": "Dear Hiring Manager, I tune databases."
+    })
+    response.raise_for_status()
+    
+    assert await _search(client, user_with_cv, "original") == []
+    assert await _search(client, user_with_cv, "revised") == [letter_id]
+    assert await _search(client, user_with_cv, "databases") == [letter_id]
+    assert await _search(client, user_with_cv, "reliable") == []
+
+
+async def test_deleted_letters_leave_the_index(client, user_with_cv, create_letter, db):
+    kept_id = await create_letter(user_with_cv, "Kept application")
+    deleted_id = await create_letter(user_with_cv, "Deleted application")
+    
+    (await client.delete(f"/api/v1/cover-letters/{deleted_id}")).raise_for_status()
+    
+    assert await _search(client, user_with_cv, "application") == [kept_id]
+    assert await _indexed_ids(db, user_with_cv, "deleted") == []
+
+
+async def test_deleting_a_user_removes_their_letters_from_the_index(client, user_with_cv, create_letter, db):
+    letter_ids = [
+        await create_letter(user_with_cv, "Cascade application"),
+        await create_letter(user_with_cv, "Cascade follow-up"),
+    ]
+    assert await _indexed_ids(db, user_with_cv, "cascade") == letter_ids
+    
+    (await client.delete(f"/api/v1/users/{user_with_cv}")).raise_for_status()
+    
+    assert await _indexed_ids(db, user_with_cv, "cascade") == []
+
+
+async def test_tuned_search_runs_on_the_read_pool(client, user_with_cv, create_letter, tuned_sessions):
+    letter_id = await create_letter(user_with_cv, "Python Platform Engineer")
+    
+    async with tuned_sessions() as search_db, tuned_sessions() as write_db:
+        results = await cover_letter_service.search_cover_letters(search_db, user_with_cv, "python", limit=10)
+        assert [hit.id for hit in results.items] == [letter_id]
+        
+        # The open search session must not hold the only writer connection
+        user = await user_service.create_user(
+            write_db, UserCreate(name="Writer", email=f"writer-{user_with_cv}@example.com")
+        )
+        assert user.id is not None
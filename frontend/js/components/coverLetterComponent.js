@@ -46,7 +46,12 @@ class CoverLetterComponent {
         try {
             this.setGenerateButtonLoading(true);
             
-            const coverLetter = await apiService.generateCoverLetter(generateData);
+            // Show the letter as it is generated, then store the saved version
+            let partialContent = '';
+            const coverLetter = await apiService.generateCoverLetterStream(generateData, (text) => {
+                partialContent += text;
+                this.displayLetter({ content: partialContent });
+            });
             appState.setCurrentCoverLetter(coverLetter);
             UIHelpers.showAlert('Cover letter generated successfully!', 'success');
             
@@ -105,7 +110,11 @@ class CoverLetterComponent {
             UIHelpers.showLoading('Loading cover letter history...');
             
             const currentUser = appState.getCurrentUser();
-            const response = await apiService.getUserCoverLetters(currentUser.id);
+            const response = await apiService.getUserCoverLetters(currentUser.id, {
+                limit: 50,
+                view: 'summary',
+                snippet_length: 200
+            });
             this.displayHistory(response.items || []);
             
         } catch (error) {
@@ -140,7 +149,7 @@ class CoverLetterComponent {
                     Created: ${DataHelpers.formatDate(letter.created_at)}
                 </div>
                 <div class="preview">
-                    ${letter.content.substring(0, 200)}...
+                    ${letter.snippet || ''}
                 </div>
                 <div class="history-actions">
                     <button type="button" class="btn btn-primary" data-action="view" data-letter-id="${letter.id}">View</button>
@@ -89,6 +89,55 @@ class ApiService {
         });
     }
 
+    async generateCoverLetterStream(generateData, onToken) {
+        const response = await fetch(`${this.baseUrl}/cover-letters/generate/stream`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(generateData)
+        });
+
+        if (!response.ok) {
+            const text = await response.text();
+            let errorMessage = `HTTP error! status: ${response.status}`;
+            try {
+                errorMessage = JSON.parse(text)?.detail || errorMessage;
+            } catch (e) {
+                // Not a JSON error, keep the status message
+            }
+            throw new Error(errorMessage);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // Server-Sent Events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                const event = frame.match(/^event: (.*)$/m)?.[1];
+                const data = JSON.parse(frame.match(/^data: (.*)$/m)?.[1] || '{}');
+
+                if (event === 'token') {
+                    onToken?.(data.text);
+                } else if (event === 'done') {
+                    return data;
+                } else if (event === 'error') {
+                    throw new Error(data.detail);
+                }
+            }
+        }
+
+        throw new Error('Stream ended before the cover letter was completed');
+    }
+
     async getCoverLetter(letterId) {
         return this.request(`/cover-letters/${letterId}`);
     }
@@ -106,8 +155,12 @@ class ApiService {
         });
     }
 
-    async getUserCoverLetters(userId) {
-        return this.request(`/cover-letters/user/${userId}`);
+    async getUserCoverLetters(userId, params = {}) {
+        // params: limit, cursor (next_cursor of the previous page), company, job_title, total, view, snippet_length
+        const query = new URLSearchParams(
+            Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+        ).toString();
+        return this.request(`/cover-letters/user/${userId}${query ? `?${query}` : ''}`);
     }
 }
 